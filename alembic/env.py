@@ -11,6 +11,10 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from app.models.comment import Comment
 from app.models.post import Post
 from app.models.user import User
+from app.models.job import Job
+from app.models.moderation_verdict import ModerationVerdict
+from app.models.comment_daily_stats import CommentDailyStats
+from app.models.follow import Follow
 from app.core.db import Base  # ← это важно
 
 # Build DATABASE_URL from .env
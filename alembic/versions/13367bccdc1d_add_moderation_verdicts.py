@@ -0,0 +1,36 @@
+"""Add moderation verdicts cache
+
+Revision ID: 13367bccdc1d
+Revises: a6d68605ab0b
+Create Date: 2026-10-17 10:41:05.502716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '13367bccdc1d'
+down_revision: Union[str, None] = 'a6d68605ab0b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('moderation_verdicts',
+    sa.Column('text_hash', sa.String(length=64), nullable=False),
+    sa.Column('is_toxic', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('text_hash')
+    )
+    op.create_index(op.f('ix_moderation_verdicts_expires_at'), 'moderation_verdicts', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_moderation_verdicts_expires_at'), table_name='moderation_verdicts')
+    op.drop_table('moderation_verdicts')
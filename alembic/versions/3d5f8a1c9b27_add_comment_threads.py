@@ -0,0 +1,76 @@
+"""Add comment threads: parent_id and materialized path
+
+Revision ID: 3d5f8a1c9b27
+Revises: 7c0a9e4f3d21
+Create Date: 2026-10-17 21:04:12.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d5f8a1c9b27'
+down_revision: Union[str, None] = '7c0a9e4f3d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('comments', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('comments_parent_id_fkey', 'comments', 'comments', ['parent_id'], ['id'], ondelete='CASCADE')
+    op.add_column('comments', sa.Column('path', postgresql.ARRAY(sa.Integer()), nullable=True))
+
+    op.execute("""
+    CREATE OR REPLACE FUNCTION comment_set_path() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        parent_path integer[];
+        parent_post_id integer;
+    BEGIN
+        IF NEW.parent_id IS NULL THEN
+            NEW.path := ARRAY[NEW.id];
+            RETURN NEW;
+        END IF;
+        SELECT path, post_id INTO parent_path, parent_post_id FROM comments WHERE id = NEW.parent_id;
+        IF parent_post_id IS DISTINCT FROM NEW.post_id THEN
+            RAISE EXCEPTION 'parent comment % is not on post %', NEW.parent_id, NEW.post_id
+                USING ERRCODE = 'foreign_key_violation';
+        END IF;
+        NEW.path := parent_path || NEW.id;
+        RETURN NEW;
+    END
+    $$
+    """)
+    op.execute("""
+    CREATE TRIGGER comments_set_path
+    BEFORE INSERT ON comments
+    FOR EACH ROW EXECUTE FUNCTION comment_set_path()
+    """)
+
+    # Every existing comment is top-level. Rewrites the table once.
+    op.execute("UPDATE comments SET path = ARRAY[id] WHERE path IS NULL")
+    op.alter_column('comments', 'path', existing_type=postgresql.ARRAY(sa.Integer()), nullable=False)
+
+    # Build without blocking writes on large tables
+    with op.get_context().autocommit_block():
+        op.create_index('ix_comments_post_id_roots', 'comments', ['post_id', 'id'], unique=False,
+                        postgresql_where=sa.text('parent_id IS NULL'), postgresql_concurrently=True)
+        op.create_index('ix_comments_parent_id_id', 'comments', ['parent_id', 'id'], unique=False,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_comments_parent_id_id', table_name='comments', postgresql_concurrently=True)
+        op.drop_index('ix_comments_post_id_roots', table_name='comments', postgresql_concurrently=True)
+    op.execute("DROP TRIGGER IF EXISTS comments_set_path ON comments")
+    op.execute("DROP FUNCTION IF EXISTS comment_set_path()")
+    op.drop_column('comments', 'path')
+    op.drop_constraint('comments_parent_id_fkey', 'comments', type_='foreignkey')
+    op.drop_column('comments', 'parent_id')
@@ -0,0 +1,145 @@
+"""Add post comment counters; statement-level comment triggers
+
+Revision ID: 7c0a9e4f3d21
+Revises: 5b8e2d7c41f9
+Create Date: 2026-10-17 18:21:54.306127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c0a9e4f3d21'
+down_revision: Union[str, None] = '5b8e2d7c41f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _comment_change_triggers(name: str, function: str) -> list[str]:
+    return [
+        f"""
+        CREATE TRIGGER {name}_{event_name.lower()}
+        AFTER {event_name} ON comments
+        REFERENCING {tables}
+        FOR EACH STATEMENT EXECUTE FUNCTION {function}()
+        """
+        for event_name, tables in (
+            ("INSERT", "NEW TABLE AS new_rows"),
+            ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+            ("DELETE", "OLD TABLE AS old_rows"),
+        )
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Constant defaults: no table rewrite. Existing posts start at 0 until reconciled.
+    op.add_column('posts', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('blocked_comment_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+    CREATE OR REPLACE FUNCTION comment_changes(op text) RETURNS text
+    LANGUAGE sql IMMUTABLE AS $$
+        SELECT CASE op
+            WHEN 'INSERT' THEN 'SELECT post_id, created_at, is_blocked IS TRUE AS is_blocked, 1 AS sign FROM new_rows'
+            WHEN 'DELETE' THEN 'SELECT post_id, created_at, is_blocked IS TRUE AS is_blocked, -1 AS sign FROM old_rows'
+            ELSE 'SELECT post_id, created_at, is_blocked IS TRUE AS is_blocked, -1 AS sign FROM old_rows '
+                 'UNION ALL SELECT post_id, created_at, is_blocked IS TRUE, 1 FROM new_rows'
+        END
+    $$
+    """)
+
+    # The row-level rollup triggers upsert once per comment, which turns quadratic
+    # when one statement writes many comments on the same day
+    op.execute("DROP TRIGGER IF EXISTS comments_daily_stats_update ON comments")
+    op.execute("DROP TRIGGER IF EXISTS comments_daily_stats_insert_delete ON comments")
+    op.execute("""
+    CREATE OR REPLACE FUNCTION comment_daily_stats_apply() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        EXECUTE format($sql$
+            INSERT INTO comment_daily_stats AS s (day, total_comments, blocked_comments)
+            SELECT day, sum(sign), COALESCE(sum(sign) FILTER (WHERE is_blocked), 0)
+            FROM (SELECT (created_at AT TIME ZONE 'UTC')::date AS day, is_blocked, sign FROM (%s) c) d
+            GROUP BY day
+            HAVING sum(sign) <> 0 OR COALESCE(sum(sign) FILTER (WHERE is_blocked), 0) <> 0
+            ON CONFLICT (day) DO UPDATE SET
+                total_comments = s.total_comments + EXCLUDED.total_comments,
+                blocked_comments = s.blocked_comments + EXCLUDED.blocked_comments
+        $sql$, comment_changes(TG_OP));
+        RETURN NULL;
+    END
+    $$
+    """)
+    for statement in _comment_change_triggers("comments_daily_stats", "comment_daily_stats_apply"):
+        op.execute(statement)
+
+    op.execute("""
+    CREATE OR REPLACE FUNCTION post_comment_counts_apply() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        EXECUTE format($sql$
+            UPDATE posts p SET
+                comment_count = p.comment_count + d.total,
+                blocked_comment_count = p.blocked_comment_count + d.blocked
+            FROM (
+                SELECT post_id, sum(sign) AS total, COALESCE(sum(sign) FILTER (WHERE is_blocked), 0) AS blocked
+                FROM (%s) c
+                GROUP BY post_id
+            ) d
+            WHERE p.id = d.post_id AND (d.total <> 0 OR d.blocked <> 0)
+        $sql$, comment_changes(TG_OP));
+        RETURN NULL;
+    END
+    $$
+    """)
+    for statement in _comment_change_triggers("comments_post_counts", "post_comment_counts_apply"):
+        op.execute(statement)
+    # Existing posts are counted afterwards with: python -m app.reconcile_counts
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event_name in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER IF EXISTS comments_post_counts_{event_name} ON comments")
+        op.execute(f"DROP TRIGGER IF EXISTS comments_daily_stats_{event_name} ON comments")
+    op.execute("DROP FUNCTION IF EXISTS post_comment_counts_apply()")
+    op.execute("""
+    CREATE OR REPLACE FUNCTION comment_daily_stats_apply() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            INSERT INTO comment_daily_stats AS s (day, total_comments, blocked_comments)
+            VALUES ((OLD.created_at AT TIME ZONE 'UTC')::date, -1, -(COALESCE(OLD.is_blocked, false))::int)
+            ON CONFLICT (day) DO UPDATE SET
+                total_comments = s.total_comments + EXCLUDED.total_comments,
+                blocked_comments = s.blocked_comments + EXCLUDED.blocked_comments;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO comment_daily_stats AS s (day, total_comments, blocked_comments)
+            VALUES ((NEW.created_at AT TIME ZONE 'UTC')::date, 1, (COALESCE(NEW.is_blocked, false))::int)
+            ON CONFLICT (day) DO UPDATE SET
+                total_comments = s.total_comments + EXCLUDED.total_comments,
+                blocked_comments = s.blocked_comments + EXCLUDED.blocked_comments;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """)
+    op.execute("""
+    CREATE TRIGGER comments_daily_stats_insert_delete
+    AFTER INSERT OR DELETE ON comments
+    FOR EACH ROW EXECUTE FUNCTION comment_daily_stats_apply()
+    """)
+    op.execute("""
+    CREATE TRIGGER comments_daily_stats_update
+    AFTER UPDATE OF is_blocked, created_at ON comments
+    FOR EACH ROW
+    WHEN (OLD.is_blocked IS DISTINCT FROM NEW.is_blocked OR OLD.created_at IS DISTINCT FROM NEW.created_at)
+    EXECUTE FUNCTION comment_daily_stats_apply()
+    """)
+    op.execute("DROP FUNCTION IF EXISTS comment_changes(text)")
+    op.drop_column('posts', 'blocked_comment_count')
+    op.drop_column('posts', 'comment_count')
@@ -0,0 +1,44 @@
+"""Add follows and the home feed index
+
+Revision ID: 8e2b6c4d0a13
+Revises: 3d5f8a1c9b27
+Create Date: 2026-10-17 22:37:48.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2b6c4d0a13'
+down_revision: Union[str, None] = '3d5f8a1c9b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('follows',
+    sa.Column('follower_id', sa.Integer(), nullable=False),
+    sa.Column('followee_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['followee_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['follower_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('follower_id', 'followee_id')
+    )
+    op.create_index('ix_follows_followee_id', 'follows', ['followee_id'], unique=False)
+
+    # Build without blocking writes on large tables
+    with op.get_context().autocommit_block():
+        op.create_index('ix_posts_feed', 'posts', ['user_id', 'created_at', 'id'], unique=False,
+                        postgresql_where=sa.text('is_blocked IS NOT TRUE'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_posts_feed', table_name='posts', postgresql_concurrently=True)
+    op.drop_index('ix_follows_followee_id', table_name='follows')
+    op.drop_table('follows')
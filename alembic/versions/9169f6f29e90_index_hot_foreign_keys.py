@@ -0,0 +1,35 @@
+"""Index hot foreign keys
+
+Revision ID: 9169f6f29e90
+Revises: a43249e3e721
+Create Date: 2026-10-17 13:05:12.640388
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9169f6f29e90'
+down_revision: Union[str, None] = 'a43249e3e721'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # posts.user_id and comments.post_id are leading columns of the keyset indexes (a43249e3e721)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_comments_user_id', 'comments', ['user_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_comments_created_at', 'comments', ['created_at'], unique=False, postgresql_include=['is_blocked'], postgresql_concurrently=True)
+        # Duplicates the primary key index
+        op.drop_index('ix_users_id', table_name='users', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_id', 'users', ['id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_comments_created_at', table_name='comments', postgresql_concurrently=True)
+        op.drop_index('ix_comments_user_id', table_name='comments', postgresql_concurrently=True)
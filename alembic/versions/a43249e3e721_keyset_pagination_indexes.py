@@ -0,0 +1,42 @@
+"""Keyset pagination indexes
+
+Revision ID: a43249e3e721
+Revises: 13367bccdc1d
+Create Date: 2026-10-17 12:20:33.917412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a43249e3e721'
+down_revision: Union[str, None] = '13367bccdc1d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing posts get the migration time; there is no better creation time to recover
+    op.add_column('posts', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+    # Keyset cursors need a total order, so created_at can no longer be NULL
+    op.execute("UPDATE comments SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column('comments', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+
+    # Build without blocking writes on large tables
+    with op.get_context().autocommit_block():
+        op.create_index('ix_posts_user_id_created_at_id', 'posts', ['user_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_comments_post_id_created_at_id', 'comments', ['post_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_comments_post_id_created_at_id', table_name='comments', postgresql_concurrently=True)
+        op.drop_index('ix_posts_user_id_created_at_id', table_name='posts', postgresql_concurrently=True)
+    op.alter_column('comments', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=True)
+    op.drop_column('posts', 'created_at')
@@ -0,0 +1,55 @@
+"""Leave the current day out of the comment_daily_stats triggers
+
+Revision ID: b4c7e1d9f2a6
+Revises: 8e2b6c4d0a13
+Create Date: 2026-10-17 23:41:06.518233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4c7e1d9f2a6'
+down_revision: Union[str, None] = '8e2b6c4d0a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _daily_stats_function(where: str) -> str:
+    return f"""
+    CREATE OR REPLACE FUNCTION comment_daily_stats_apply() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        EXECUTE format($sql$
+            INSERT INTO comment_daily_stats AS s (day, total_comments, blocked_comments)
+            SELECT day, sum(sign), COALESCE(sum(sign) FILTER (WHERE is_blocked), 0)
+            FROM (
+                SELECT (created_at AT TIME ZONE 'UTC')::date AS day, is_blocked, sign FROM (%s) c
+                {where}
+            ) d
+            GROUP BY day
+            HAVING sum(sign) <> 0 OR COALESCE(sum(sign) FILTER (WHERE is_blocked), 0) <> 0
+            ON CONFLICT (day) DO UPDATE SET
+                total_comments = s.total_comments + EXCLUDED.total_comments,
+                blocked_comments = s.blocked_comments + EXCLUDED.blocked_comments
+        $sql$, comment_changes(TG_OP));
+        RETURN NULL;
+    END
+    $$
+    """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every new comment lands on the current day, so upserting its row serialized all
+    # comment writes. The close_comment_stats job writes each day once it is over.
+    op.execute(_daily_stats_function(
+        "WHERE created_at < date_trunc('day', statement_timestamp() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(_daily_stats_function(""))
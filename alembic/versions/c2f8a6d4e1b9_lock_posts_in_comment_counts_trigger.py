@@ -0,0 +1,84 @@
+"""Lock posts in id order in the comment counts trigger
+
+Revision ID: c2f8a6d4e1b9
+Revises: b4c7e1d9f2a6
+Create Date: 2026-10-18 00:12:37.094518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f8a6d4e1b9'
+down_revision: Union[str, None] = 'b4c7e1d9f2a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # UPDATE ... FROM locked posts in whatever order the join produced them and could
+    # deadlock with reconcile_batch, which locks in id order. Updates that move no
+    # count now return before the aggregate.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION post_comment_counts_apply() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' THEN
+            IF NOT EXISTS (
+                SELECT 1 FROM old_rows o JOIN new_rows n USING (id)
+                WHERE (o.post_id, o.is_blocked IS TRUE) IS DISTINCT FROM (n.post_id, n.is_blocked IS TRUE)
+            ) THEN
+                RETURN NULL;
+            END IF;
+        END IF;
+        EXECUTE format($sql$
+            SELECT 1 FROM posts
+            WHERE id IN (
+                SELECT post_id FROM (%s) c
+                GROUP BY post_id
+                HAVING sum(sign) <> 0 OR COALESCE(sum(sign) FILTER (WHERE is_blocked), 0) <> 0
+            )
+            ORDER BY id
+            FOR NO KEY UPDATE
+        $sql$, comment_changes(TG_OP));
+        EXECUTE format($sql$
+            UPDATE posts p SET
+                comment_count = p.comment_count + d.total,
+                blocked_comment_count = p.blocked_comment_count + d.blocked
+            FROM (
+                SELECT post_id, sum(sign) AS total, COALESCE(sum(sign) FILTER (WHERE is_blocked), 0) AS blocked
+                FROM (%s) c
+                GROUP BY post_id
+            ) d
+            WHERE p.id = d.post_id AND (d.total <> 0 OR d.blocked <> 0)
+        $sql$, comment_changes(TG_OP));
+        RETURN NULL;
+    END
+    $$
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+    CREATE OR REPLACE FUNCTION post_comment_counts_apply() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        EXECUTE format($sql$
+            UPDATE posts p SET
+                comment_count = p.comment_count + d.total,
+                blocked_comment_count = p.blocked_comment_count + d.blocked
+            FROM (
+                SELECT post_id, sum(sign) AS total, COALESCE(sum(sign) FILTER (WHERE is_blocked), 0) AS blocked
+                FROM (%s) c
+                GROUP BY post_id
+            ) d
+            WHERE p.id = d.post_id AND (d.total <> 0 OR d.blocked <> 0)
+        $sql$, comment_changes(TG_OP));
+        RETURN NULL;
+    END
+    $$
+    """)
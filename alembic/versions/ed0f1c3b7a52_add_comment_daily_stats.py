@@ -0,0 +1,71 @@
+"""Add comment daily stats rollup
+
+Revision ID: ed0f1c3b7a52
+Revises: 9169f6f29e90
+Create Date: 2026-10-17 14:02:37.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ed0f1c3b7a52'
+down_revision: Union[str, None] = '9169f6f29e90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('comment_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('total_comments', sa.Integer(), nullable=False),
+    sa.Column('blocked_comments', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.execute("""
+    CREATE OR REPLACE FUNCTION comment_daily_stats_apply() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            INSERT INTO comment_daily_stats AS s (day, total_comments, blocked_comments)
+            VALUES ((OLD.created_at AT TIME ZONE 'UTC')::date, -1, -(COALESCE(OLD.is_blocked, false))::int)
+            ON CONFLICT (day) DO UPDATE SET
+                total_comments = s.total_comments + EXCLUDED.total_comments,
+                blocked_comments = s.blocked_comments + EXCLUDED.blocked_comments;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO comment_daily_stats AS s (day, total_comments, blocked_comments)
+            VALUES ((NEW.created_at AT TIME ZONE 'UTC')::date, 1, (COALESCE(NEW.is_blocked, false))::int)
+            ON CONFLICT (day) DO UPDATE SET
+                total_comments = s.total_comments + EXCLUDED.total_comments,
+                blocked_comments = s.blocked_comments + EXCLUDED.blocked_comments;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """)
+    op.execute("""
+    CREATE TRIGGER comments_daily_stats_insert_delete
+    AFTER INSERT OR DELETE ON comments
+    FOR EACH ROW EXECUTE FUNCTION comment_daily_stats_apply()
+    """)
+    op.execute("""
+    CREATE TRIGGER comments_daily_stats_update
+    AFTER UPDATE OF is_blocked, created_at ON comments
+    FOR EACH ROW
+    WHEN (OLD.is_blocked IS DISTINCT FROM NEW.is_blocked OR OLD.created_at IS DISTINCT FROM NEW.created_at)
+    EXECUTE FUNCTION comment_daily_stats_apply()
+    """)
+    # Existing history is loaded afterwards with: python -m app.backfill_stats
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS comments_daily_stats_update ON comments")
+    op.execute("DROP TRIGGER IF EXISTS comments_daily_stats_insert_delete ON comments")
+    op.execute("DROP FUNCTION IF EXISTS comment_daily_stats_apply()")
+    op.drop_table('comment_daily_stats')
@@ -0,0 +1,23 @@
+# backfill_stats.py
+# Rebuild the comment_daily_stats rollup from raw comments:
+#   python -m app.backfill_stats [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+
+import argparse
+import asyncio
+from datetime import date
+
+from app.core.db import AsyncSessionLocal
+from app.services.comment_stats import STATS_BACKFILL_CHUNK_DAYS, backfill_comment_daily_stats
+
+async def main(date_from: date | None, date_to: date | None, chunk_days: int):
+    async with AsyncSessionLocal() as db:
+        written = await backfill_comment_daily_stats(db, date_from, date_to, chunk_days)
+    print(f"[STATS BACKFILL] corrected {written} day(s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, default=None)
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, default=None)
+    parser.add_argument("--chunk-days", type=int, default=STATS_BACKFILL_CHUNK_DAYS)
+    args = parser.parse_args()
+    asyncio.run(main(args.date_from, args.date_to, args.chunk_days))
@@ -0,0 +1,233 @@
+# core/cache.py
+# Response cache for public read endpoints. Bodies are stored with their ETag under
+# a key built from the request URL; writes invalidate them by tag. A tag is a
+# version stamp kept next to the entries, and an entry is only served while every
+# tag it was stored under still has the version it saw, so invalidation is a
+# single write per tag and never needs to find the entries themselves.
+
+import hashlib
+import json
+import os
+import time
+from typing import Awaitable, Callable
+from urllib.parse import urlencode
+
+from decouple import config
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.replicas import use_primary
+from app.utils.lru import LRUTTLCache
+
+# memory | redis | off. The memory backend is per process: with several API
+# workers, the others keep serving an invalidated entry until its TTL runs out
+RESPONSE_CACHE_BACKEND = config("RESPONSE_CACHE_BACKEND", default="memory")
+RESPONSE_CACHE_REDIS_URL = config("RESPONSE_CACHE_REDIS_URL", default="redis://localhost:6379/0")
+RESPONSE_CACHE_TTL_SEC = config("RESPONSE_CACHE_TTL_SEC", default=60.0, cast=float)
+RESPONSE_CACHE_SIZE = config("RESPONSE_CACHE_SIZE", default=10000, cast=int)
+
+# Tags
+COMMENT_STATS_TAG = "comment_stats"
+
+
+def post_comments_tag(post_id: int) -> str:
+    return f"post_comments:{post_id}"
+
+
+class CacheBackend:
+    """Minimal key/value store; `ttl=None` means the key never expires."""
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        raise NotImplementedError
+
+    async def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        """Set only if the key is absent; returns whether it was set."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self.data = LRUTTLCache(maxsize, ttl=float("inf"))
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        self.data.set(key, value, ttl)
+
+    async def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        if self.data.get(key) is not None:
+            return False
+        self.data.set(key, value, ttl)
+        return True
+
+
+class RedisBackend(CacheBackend):
+    """Any client with the redis.asyncio API (mget, set with px/nx, aclose)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str = RESPONSE_CACHE_REDIS_URL) -> "RedisBackend":
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package") from e
+        return cls(redis.from_url(url))
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return await self.client.mget(keys)
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        await self.client.set(key, value, px=None if ttl is None else int(ttl * 1000))
+
+    async def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        return bool(await self.client.set(key, value, px=None if ttl is None else int(ttl * 1000), nx=True))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def _new_version() -> bytes:
+    # Unique rather than a counter, so a tag that was evicted never comes back
+    # with a version an old entry was stored under
+    return f"{time.time_ns():x}{os.urandom(4).hex()}".encode()
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as If-None-Match requires
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def request_key(request: Request) -> str:
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"resp:{request.url.path}?{query}"
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend | None, ttl: float = RESPONSE_CACHE_TTL_SEC):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def _lookup(self, key: str, tags: list[str]) -> tuple[bytes | None, dict[str, bytes] | None]:
+        # Entry and tag versions in one round trip
+        tag_keys = [f"tag:{tag}" for tag in tags]
+        raw, *versions = await self.backend.get_many([key, *tag_keys])
+        missing = [tag_key for tag_key, version in zip(tag_keys, versions) if version is None]
+        for tag_key in missing:
+            await self.backend.add(tag_key, _new_version())
+        if missing:
+            versions = await self.backend.get_many(tag_keys)
+        return raw, {tag: version for tag, version in zip(tags, versions)}
+
+    async def respond(
+        self,
+        request: Request,
+        tags: list[str],
+        build: Callable[[], Awaitable[tuple[bytes, dict[str, str]]]],
+        ttl: float | None = None,
+        db: AsyncSession | None = None,
+    ) -> Response:
+        """
+        Serve the cached JSON body for this request, or call `build()` for the
+        body and extra headers and cache the result under `tags`. `db` is the
+        read session `build()` queries; a body that gets cached is read from the
+        primary, since a lagging replica would store pre-invalidation data under
+        the new tag versions for the whole TTL.
+        """
+        if self.backend is None:
+            body, headers = await build()
+            return self._response(request, body, headers, make_etag(body), "BYPASS")
+
+        key = request_key(request)
+        try:
+            raw, versions = await self._lookup(key, tags)
+        except Exception as e:
+            self.errors += 1
+            print("[RESPONSE CACHE ERROR]", e)
+            body, headers = await build()
+            return self._response(request, body, headers, make_etag(body), "BYPASS")
+
+        if raw is not None:
+            meta, body = raw.split(b"\n", 1)
+            meta = json.loads(meta)
+            if meta["tags"] == {tag: version.decode() for tag, version in versions.items()}:
+                self.hits += 1
+                return self._response(request, body, meta["headers"], meta["etag"], "HIT")
+
+        # Versions were read before the query: an invalidation that lands while it
+        # runs leaves this entry stale on arrival instead of serving old data
+        self.misses += 1
+        if db is not None:
+            use_primary(db)
+        body, headers = await build()
+        etag = make_etag(body)
+        meta = {"etag": etag, "headers": headers, "tags": {tag: version.decode() for tag, version in versions.items()}}
+        try:
+            await self.backend.set(key, json.dumps(meta).encode() + b"\n" + body, self.ttl if ttl is None else ttl)
+        except Exception as e:
+            self.errors += 1
+            print("[RESPONSE CACHE ERROR]", e)
+        return self._response(request, body, headers, etag, "MISS")
+
+    def _response(self, request: Request, body: bytes, headers: dict, etag: str, status: str) -> Response:
+        # no-cache: clients may keep the body but must revalidate it with If-None-Match
+        headers = {**headers, "ETag": etag, "Cache-Control": "no-cache", "X-Cache": status}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def invalidate(self, *tags: str) -> None:
+        if self.backend is None:
+            return
+        try:
+            for tag in tags:
+                await self.backend.set(f"tag:{tag}", _new_version())
+        except Exception as e:
+            # Entries under these tags stay until their TTL runs out
+            self.errors += 1
+            print("[RESPONSE CACHE ERROR]", e)
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _build_backend() -> CacheBackend | None:
+    if RESPONSE_CACHE_BACKEND == "redis":
+        return RedisBackend.from_url(RESPONSE_CACHE_REDIS_URL)
+    if RESPONSE_CACHE_BACKEND == "memory":
+        return MemoryBackend(RESPONSE_CACHE_SIZE)
+    return None
+
+
+response_cache = ResponseCache(_build_backend())
@@ -1,21 +1,136 @@
 # core\db.py
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import time
+import uuid
+
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-import os
-from decouple import config
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from decouple import config, Csv
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
 DATABASE_URL = config("DATABASE_URL")
+# Optional read replicas (comma-separated); reads use the primary when empty
+DATABASE_REPLICA_URLS = config("DATABASE_REPLICA_URLS", default="", cast=Csv())
+
+DB_ECHO = config("DB_ECHO", default=False, cast=bool)
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=10, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=20, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30.0, cast=float)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=1800, cast=int)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=True, cast=bool)
+DB_STATEMENT_CACHE_SIZE = config("DB_STATEMENT_CACHE_SIZE", default=100, cast=int)
+# PgBouncer in transaction/statement mode cannot keep prepared statements between transactions
+DB_PGBOUNCER = config("DB_PGBOUNCER", default=False, cast=bool)
+
+
+class PoolStats:
+    """Checkout wait times and timeouts for one pool."""
+
+    # Upper bounds (seconds) of the checkout wait histogram
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * len(self.BUCKETS)
+
+    def observe(self, wait: float) -> None:
+        self.checkouts += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        for i, bound in enumerate(self.BUCKETS):
+            if wait <= bound:
+                self.wait_buckets[i] += 1
+                break
+
+
+# Keyed by the pool's logging name, which survives pool.recreate() on dispose
+POOL_STATS: dict[str, PoolStats] = {}
 
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        stats = POOL_STATS.setdefault(self._orig_logging_name, PoolStats())
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sa_exc.TimeoutError:
+            stats.timeouts += 1
+            raise
+        stats.observe(time.perf_counter() - start)
+        return connection
+
+
+def create_engine_from_settings(url: str, name: str) -> AsyncEngine:
+    connect_args = {}
+    if make_url(url).get_driver_name() == "asyncpg":
+        if DB_PGBOUNCER:
+            connect_args = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                # Unnamed-per-backend statements would clash once PgBouncer reuses a server connection
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        else:
+            connect_args = {
+                "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+                "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            }
+
+    return create_async_engine(
+        url,
+        echo=DB_ECHO,
+        poolclass=InstrumentedPool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_logging_name=name,
+        connect_args=connect_args,
+    )
+
+
+engine = create_engine_from_settings(DATABASE_URL, "primary")
+replica_engines = {
+    f"replica{i}": create_engine_from_settings(url, f"replica{i}")
+    for i, url in enumerate(DATABASE_REPLICA_URLS)
+}
 
 AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
+
+def pool_metrics() -> list[dict]:
+    metrics = []
+    for name, eng in {"primary": engine, **replica_engines}.items():
+        pool = eng.sync_engine.pool
+        stats = POOL_STATS.get(name, PoolStats())
+        capacity = pool.size() + pool._max_overflow
+        metrics.append({
+            "pool": name,
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "saturation": round(pool.checkedout() / capacity, 4) if capacity > 0 else 0.0,
+            "checkouts": stats.checkouts,
+            "checkout_timeouts": stats.timeouts,
+            "checkout_wait_total_sec": round(stats.wait_total, 6),
+            "checkout_wait_max_sec": round(stats.wait_max, 6),
+            "checkout_wait_buckets": dict(zip((str(b) for b in PoolStats.BUCKETS), stats.wait_buckets)),
+        })
+    return metrics
+
 # Dependency
 async def get_db():
     async with AsyncSessionLocal() as session:
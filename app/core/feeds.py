@@ -0,0 +1,100 @@
+# core/feeds.py
+# Per-process cache of home feed windows: for each recently active reader, the
+# keys (created_at, id) of the newest FEED_WINDOW_SIZE visible posts by the users
+# they follow, plus whom they follow. create_post pushes new posts into the cached
+# windows of the author's followers, so a warm feed is never rebuilt by a new
+# post. Other processes pick the post up when their window expires.
+
+import bisect
+from datetime import datetime
+
+from decouple import config
+
+from app.utils.lru import LRUTTLCache
+
+FEED_WINDOW_SIZE = config("FEED_WINDOW_SIZE", default=500, cast=int)
+FEED_CACHE_TTL_SEC = config("FEED_CACHE_TTL_SEC", default=300.0, cast=float)
+FEED_CACHE_SIZE = config("FEED_CACHE_SIZE", default=10000, cast=int)
+
+FeedKey = tuple[datetime, int]
+
+
+class FeedWindow:
+    __slots__ = ("followees", "keys", "complete")
+
+    def __init__(self, followees: frozenset[int], keys: list[FeedKey], complete: bool):
+        self.followees = followees
+        # Oldest first, so new posts append
+        self.keys = keys
+        # True when no older post exists beyond the window
+        self.complete = complete
+
+    def page(self, before: FeedKey | None, count: int) -> list[FeedKey]:
+        """Up to `count` keys older than `before`, newest first."""
+        end = len(self.keys) if before is None else bisect.bisect_left(self.keys, before)
+        return self.keys[max(0, end - count):end][::-1]
+
+    def push(self, key: FeedKey, size: int) -> None:
+        bisect.insort(self.keys, key)
+        if len(self.keys) > size:
+            del self.keys[: len(self.keys) - size]
+            self.complete = False
+
+
+class FeedCache:
+    def __init__(self, maxsize: int = FEED_CACHE_SIZE, ttl: float = FEED_CACHE_TTL_SEC, size: int = FEED_WINDOW_SIZE):
+        self.windows = LRUTTLCache(maxsize, ttl)
+        self.size = size
+        # author id -> readers whose cached window follows them; pruned lazily
+        self.readers: dict[int, set[int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.pushes = 0
+
+    def get(self, user_id: int) -> FeedWindow | None:
+        window = self.windows.get(user_id)
+        if window is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return window
+
+    def set(self, user_id: int, window: FeedWindow) -> None:
+        self.windows.set(user_id, window)
+        for author_id in window.followees:
+            self.readers.setdefault(author_id, set()).add(user_id)
+
+    def drop(self, user_id: int) -> None:
+        self.windows.delete(user_id)
+
+    def publish(self, author_id: int, created_at: datetime, post_id: int) -> None:
+        """A new visible post by `author_id`: add it to its followers' cached windows."""
+        readers = self.readers.get(author_id)
+        if not readers:
+            return
+        for reader_id in list(readers):
+            window = self.windows.get(reader_id)
+            if window is None or author_id not in window.followees:
+                readers.discard(reader_id)
+                continue
+            window.push((created_at, post_id), self.size)
+            self.pushes += 1
+        if not readers:
+            del self.readers[author_id]
+
+    def clear(self) -> None:
+        self.windows.clear()
+        self.readers.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "windows": len(self.windows),
+            "hits": self.hits,
+            "misses": self.misses,
+            "pushes": self.pushes,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+feed_cache = FeedCache()
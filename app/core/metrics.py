@@ -0,0 +1,150 @@
+# core/metrics.py
+# Prometheus metrics recorded as work happens: requests, SQL statements, model
+# calls and named stages. Pools, replicas, caches and the job queue are read when
+# /metrics is scraped (routers/metrics.py). No database import here, so the
+# moderation engine can use it standalone.
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from decouple import config
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements per request",
+    ["method", "route"], buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 32, 64),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request",
+    ["method", "route"], buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "SQL statement latency by engine and leading keyword",
+    ["engine", "operation"], buckets=LATENCY_BUCKETS,
+)
+MODERATION_CALL_SECONDS = Histogram(
+    "moderation_call_duration_seconds", "Model calls: check, batch or reply; ok, timeout or error",
+    ["call", "outcome"], buckets=LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "app_stage_duration_seconds", "Latency of named stages inside a request or job",
+    ["stage"], buckets=LATENCY_BUCKETS,
+)
+MODERATION_VERDICTS = Counter(
+    "moderation_verdicts", "Toxicity verdicts by source (blacklist, or model incl. its cache): toxic, clean, unknown",
+    ["source", "verdict"],
+)
+JOB_QUEUE_DEPTH = Gauge("job_queue_depth", "Pending and running jobs", ["kind", "status"])
+JOB_QUEUE_OVERDUE_SECONDS = Gauge(
+    "job_queue_overdue_seconds", "How long the oldest due pending job has waited", ["kind"],
+)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Set by MetricsMiddleware for the request being served; tasks the request
+# spawns inherit it, background workers never see it
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in _OPERATIONS else "OTHER"
+
+
+def instrument_engine(name: str, engine: AsyncEngine) -> None:
+    """Time every statement on `engine` and add it to the current request's totals."""
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        DB_QUERY_SECONDS.labels(name, _operation(statement)).observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    def handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", handle_error)
+
+
+@contextmanager
+def stage(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(name).observe(time.perf_counter() - started)
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware: latency, status and SQL totals per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            # The template, not the raw path, so ids do not multiply the series
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            REQUEST_SECONDS.labels(method, route, str(status)).observe(elapsed)
+            REQUEST_DB_QUERIES.labels(method, route).observe(stats.queries)
+            REQUEST_DB_SECONDS.labels(method, route).observe(stats.db_seconds)
+
+
+def set_queue_depth(rows: list) -> None:
+    """Replace the job queue gauges with `rows` of (kind, status, jobs, overdue_sec)."""
+    JOB_QUEUE_DEPTH.clear()
+    JOB_QUEUE_OVERDUE_SECONDS.clear()
+    for row in rows:
+        JOB_QUEUE_DEPTH.labels(row.kind, row.status).set(row.jobs)
+        if row.status == "pending":
+            JOB_QUEUE_OVERDUE_SECONDS.labels(row.kind).set(row.overdue_sec)
@@ -0,0 +1,69 @@
+# core/principals.py
+# Per-process cache of authenticated users, so get_current_user skips the database
+# for tokens it has seen recently. Entries never outlive the token they came from,
+# and any committed change to a user drops that user's entries.
+
+import time
+
+from decouple import config
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.models.user import User
+from app.utils.lru import LRUTTLCache
+
+PRINCIPAL_CACHE_TTL_SEC = config("PRINCIPAL_CACHE_TTL_SEC", default=60.0, cast=float)
+PRINCIPAL_CACHE_SIZE = config("PRINCIPAL_CACHE_SIZE", default=10000, cast=int)
+
+_COLUMNS = [column.key for column in User.__table__.columns]
+
+principal_cache = LRUTTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SEC)
+
+
+def principal_key(user_id: int | None = None, email: str | None = None) -> str:
+    # Tokens with a "uid" claim are cached by id, older ones by their subject (email)
+    return f"uid:{user_id}" if user_id is not None else f"sub:{email}"
+
+
+def get_principal(key: str) -> User | None:
+    values = principal_cache.get(key)
+    # A fresh transient instance per request: nothing is shared between sessions
+    return User(**values) if values is not None else None
+
+
+def cache_principal(key: str, user: User, expires_at: float | None) -> None:
+    ttl = PRINCIPAL_CACHE_TTL_SEC
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    if ttl > 0:
+        principal_cache.set(key, {column: getattr(user, column) for column in _COLUMNS}, ttl)
+
+
+def invalidate_principal(user_id: int | None = None, email: str | None = None) -> None:
+    if user_id is not None:
+        principal_cache.delete(principal_key(user_id=user_id))
+    if email is not None:
+        principal_cache.delete(principal_key(email=email))
+
+
+# Changes are collected at flush and applied after commit, so a request racing the
+# write cannot re-cache the old row after it was dropped
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    changed = session.info.setdefault("changed_principals", set())
+    history = inspect(target).attrs.email.history
+    changed.add(principal_key(user_id=target.id))
+    for email in {target.email, *(history.deleted or ())}:
+        changed.add(principal_key(email=email))
+
+
+# On rollback too: an extra cache miss is harmless, a stale principal is not
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _drop_changed_principals(session: Session) -> None:
+    for key in session.info.pop("changed_principals", ()):
+        principal_cache.delete(key)
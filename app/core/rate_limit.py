@@ -0,0 +1,229 @@
+# core/rate_limit.py
+# Admission in front of the endpoints that call the model. Each caller has a token
+# bucket per user and per client address: a bucket holds up to `burst` tokens,
+# refills at `per_min` tokens a minute, and a request spends one token from every
+# bucket or from none. The memory store is per process; the redis store keeps the
+# buckets in one place for all workers and updates them in a single script call.
+# AdmissionLimit caps how many requests may wait on a slow dependency at once.
+
+import math
+import time
+from contextlib import asynccontextmanager
+
+from decouple import config
+from fastapi import Depends, HTTPException, Request, status
+
+from app.core.security import get_current_user
+from app.models.user import User
+from app.utils.lru import LRUTTLCache
+
+# memory | redis | off
+RATE_LIMIT_BACKEND = config("RATE_LIMIT_BACKEND", default="memory")
+RATE_LIMIT_REDIS_URL = config("RATE_LIMIT_REDIS_URL", default="redis://localhost:6379/0")
+RATE_LIMIT_USER_PER_MIN = config("RATE_LIMIT_USER_PER_MIN", default=20.0, cast=float)
+RATE_LIMIT_USER_BURST = config("RATE_LIMIT_USER_BURST", default=10.0, cast=float)
+RATE_LIMIT_IP_PER_MIN = config("RATE_LIMIT_IP_PER_MIN", default=60.0, cast=float)
+RATE_LIMIT_IP_BURST = config("RATE_LIMIT_IP_BURST", default=30.0, cast=float)
+# Callers tracked by the memory store; idle buckets are full and can be forgotten
+RATE_LIMIT_CACHE_SIZE = config("RATE_LIMIT_CACHE_SIZE", default=100000, cast=int)
+# Behind a reverse proxy: key by the last X-Forwarded-For address (the one the proxy saw)
+RATE_LIMIT_TRUST_FORWARDED = config("RATE_LIMIT_TRUST_FORWARDED", default=False, cast=bool)
+
+# (key, tokens per second, capacity)
+Bucket = tuple[str, float, float]
+
+
+class BucketStore:
+    async def take(self, buckets: list[Bucket], cost: float) -> float:
+        """
+        Spend `cost` tokens from every bucket, or from none of them. Returns 0 when
+        spent, otherwise the seconds until all buckets hold enough. A cost above a
+        bucket's capacity spends the whole bucket.
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryBucketStore(BucketStore):
+    def __init__(self, maxsize: int = RATE_LIMIT_CACHE_SIZE, clock=time.monotonic):
+        self.buckets = LRUTTLCache(maxsize, ttl=float("inf"))
+        self.clock = clock
+
+    async def take(self, buckets: list[Bucket], cost: float) -> float:
+        now = self.clock()
+        levels, wait = [], 0.0
+        for key, rate, burst in buckets:
+            tokens, at = self.buckets.get(key) or (burst, now)
+            tokens = min(burst, tokens + (now - at) * rate)
+            levels.append(tokens)
+            need = min(cost, burst)
+            if tokens < need:
+                wait = max(wait, (need - tokens) / rate)
+        if wait:
+            return wait
+        for (key, rate, burst), tokens in zip(buckets, levels):
+            # Expires once refilled: a missing bucket reads as full
+            self.buckets.set(key, (tokens - min(cost, burst), now), burst / rate)
+        return 0.0
+
+
+# Same arithmetic as MemoryBucketStore on Redis hashes, timed by the Redis clock so
+# workers with skewed clocks agree. ARGV: cost, then rate and burst per key.
+TAKE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local levels, wait = {}, 0
+for i, key in ipairs(KEYS) do
+    local rate, burst = tonumber(ARGV[i * 2]), tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'at')
+    local tokens = tonumber(state[1]) or burst
+    local at = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - at) * rate)
+    levels[i] = tokens
+    local need = math.min(cost, burst)
+    if tokens < need then
+        wait = math.max(wait, (need - tokens) / rate)
+    end
+end
+if wait == 0 then
+    for i, key in ipairs(KEYS) do
+        local rate, burst = tonumber(ARGV[i * 2]), tonumber(ARGV[i * 2 + 1])
+        redis.call('HSET', key, 'tokens', levels[i] - math.min(cost, burst), 'at', now)
+        redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000))
+    end
+end
+return tostring(wait)
+"""
+
+
+class RedisBucketStore(BucketStore):
+    """Any client with the redis.asyncio API (register_script, aclose)."""
+
+    def __init__(self, client):
+        self.client = client
+        self.script = client.register_script(TAKE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str = RATE_LIMIT_REDIS_URL) -> "RedisBucketStore":
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the redis package") from e
+        return cls(redis.from_url(url))
+
+    async def take(self, buckets: list[Bucket], cost: float) -> float:
+        args = [cost]
+        for _, rate, burst in buckets:
+            args += [rate, burst]
+        # Lua numbers come back truncated to integers; the wait is returned as text
+        return float(await self.script(keys=[key for key, _, _ in buckets], args=args))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def client_address(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        store: BucketStore | None,
+        user_per_min: float = RATE_LIMIT_USER_PER_MIN,
+        user_burst: float = RATE_LIMIT_USER_BURST,
+        ip_per_min: float = RATE_LIMIT_IP_PER_MIN,
+        ip_burst: float = RATE_LIMIT_IP_BURST,
+    ):
+        self.store = store
+        self.user = (user_per_min / 60, user_burst)
+        self.ip = (ip_per_min / 60, ip_burst)
+        self.allowed = 0
+        self.limited = 0
+        self.errors = 0
+
+    async def check(self, request: Request, user_id: int, cost: float = 1) -> None:
+        """Spend `cost` tokens for this user and address, or raise 429 with Retry-After."""
+        if self.store is None:
+            return
+        buckets = [(f"rl:user:{user_id}", *self.user), (f"rl:ip:{client_address(request)}", *self.ip)]
+        try:
+            wait = await self.store.take(buckets, cost)
+        except Exception as e:
+            # Fail open: an unreachable store must not take the write endpoints down
+            self.errors += 1
+            print("[RATE LIMIT ERROR]", e)
+            return
+        if wait:
+            self.limited += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded, retry later",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+        self.allowed += 1
+
+    async def close(self) -> None:
+        if self.store is not None:
+            await self.store.close()
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.store).__name__ if self.store else None,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "errors": self.errors,
+        }
+
+
+class AdmissionLimit:
+    """At most `max_pending` callers inside `slot()`; the rest get 429 instead of queueing."""
+
+    def __init__(self, max_pending: int, detail: str = "Server is busy, retry shortly"):
+        self.max_pending = max_pending
+        self.detail = detail
+        self.pending = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=self.detail,
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> dict:
+        return {"pending": self.pending, "admitted": self.admitted, "rejected": self.rejected}
+
+
+def _build_store() -> BucketStore | None:
+    if RATE_LIMIT_BACKEND == "redis":
+        return RedisBucketStore.from_url(RATE_LIMIT_REDIS_URL)
+    if RATE_LIMIT_BACKEND == "memory":
+        return MemoryBucketStore(RATE_LIMIT_CACHE_SIZE)
+    return None
+
+
+rate_limiter = RateLimiter(_build_store())
+
+
+async def limit_writes(request: Request, user: User = Depends(get_current_user)) -> None:
+    """Dependency for endpoints that cost a model call."""
+    await rate_limiter.check(request, user.id)
@@ -0,0 +1,157 @@
+# core/replicas.py
+# Read routing: sessions from get_read_db send SELECTs to a healthy read replica
+# and everything else (flushes, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE) to the primary.
+
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+
+from decouple import config
+from sqlalchemy import Delete, Insert, Update, text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.db import engine, replica_engines
+
+# round_robin | least_connections
+DB_REPLICA_STRATEGY = config("DB_REPLICA_STRATEGY", default="round_robin")
+DB_REPLICA_MAX_LAG_SEC = config("DB_REPLICA_MAX_LAG_SEC", default=5.0, cast=float)
+DB_REPLICA_HEALTH_INTERVAL_SEC = config("DB_REPLICA_HEALTH_INTERVAL_SEC", default=5.0, cast=float)
+
+# An idle primary stops advancing the replay timestamp, so a fully replayed replica reports zero lag
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaState:
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.lag_sec = 0.0
+        self.last_error: str | None = None
+        self.checked_at: float | None = None
+
+    def in_use(self) -> int:
+        return self.engine.sync_engine.pool.checkedout()
+
+
+class ReplicaRouter:
+    """Picks a replica per session; replicas that are down or lagging are skipped until they recover."""
+
+    def __init__(
+        self,
+        replicas: dict[str, AsyncEngine],
+        strategy: str = DB_REPLICA_STRATEGY,
+        max_lag_sec: float = DB_REPLICA_MAX_LAG_SEC,
+    ):
+        self.replicas = [ReplicaState(name, eng) for name, eng in replicas.items()]
+        self.strategy = strategy
+        self.max_lag_sec = max_lag_sec
+        self._round_robin = itertools.count()
+
+    def pick(self) -> ReplicaState | None:
+        candidates = [replica for replica in self.replicas if replica.healthy]
+        if not candidates:
+            return None
+        if self.strategy == "least_connections":
+            return min(candidates, key=ReplicaState.in_use)
+        return candidates[next(self._round_robin) % len(candidates)]
+
+    def mark_down(self, replica: ReplicaState, error: Exception | str) -> None:
+        replica.healthy = False
+        replica.last_error = str(error)
+        print("[REPLICA DOWN]", replica.name, replica.last_error)
+
+    async def check(self, replica: ReplicaState) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                lag = float((await conn.execute(REPLICA_LAG_SQL)).scalar() or 0.0)
+        except Exception as e:
+            self.mark_down(replica, e)
+        else:
+            replica.lag_sec = lag
+            if lag > self.max_lag_sec:
+                self.mark_down(replica, f"replication lag {lag:.1f}s > {self.max_lag_sec}s")
+            else:
+                replica.healthy = True
+                replica.last_error = None
+        replica.checked_at = time.time()
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+
+    async def run_health_checks(self, interval: float = DB_REPLICA_HEALTH_INTERVAL_SEC) -> None:
+        while True:
+            await self.check_all()
+            await asyncio.sleep(interval)
+
+    def status(self) -> list[dict]:
+        return [
+            {
+                "name": replica.name,
+                "healthy": replica.healthy,
+                "lag_sec": replica.lag_sec,
+                "in_use": replica.in_use(),
+                "last_error": replica.last_error,
+                "checked_at": replica.checked_at,
+            }
+            for replica in self.replicas
+        ]
+
+
+read_router = ReplicaRouter(replica_engines)
+
+
+class RoutingSession(Session):
+    def __init__(self, *args, replica: ReplicaState | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.replica is None
+            or self._flushing
+            or isinstance(clause, (Insert, Update, Delete))
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            return engine.sync_engine
+        return self.replica.engine.sync_engine
+
+
+def use_primary(session: AsyncSession) -> None:
+    """Send the rest of a read session's queries to the primary."""
+    if isinstance(session.sync_session, RoutingSession):
+        session.sync_session.replica = None
+
+
+@asynccontextmanager
+async def read_session():
+    replica = read_router.pick()
+    async with AsyncSession(
+        bind=engine,
+        sync_session_class=RoutingSession,
+        replica=replica,
+        expire_on_commit=False,
+    ) as session:
+        try:
+            yield session
+        except (OperationalError, InterfaceError, DBAPIError, OSError) as e:
+            # Later requests go to another replica (or the primary) until the health check passes
+            unreachable = isinstance(e, (OperationalError, InterfaceError, OSError)) or e.connection_invalidated
+            if replica is not None and unreachable:
+                read_router.mark_down(replica, e)
+            raise
+
+
+# Dependency for read-only endpoints
+async def get_read_db():
+    async with read_session() as session:
+        yield session
@@ -1,7 +1,6 @@
 # app/core/security.py
 
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+from jose import JWTError
 from datetime import datetime, timedelta, timezone
 from decouple import config
 from fastapi import Depends, HTTPException, status
@@ -9,31 +8,44 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import get_db
+from app.core.passwords import password_hasher
+from app.core.principals import cache_principal, get_principal, principal_key
+from app.core.tokens import token_service
 from app.models.user import User
 from app.services.user import get_user_by_email  # ← уникнення циклу
 
 # Конфігурація безпеки
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-SECRET_KEY = config("SECRET_KEY")
-ALGORITHM = config("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(config("ACCESS_TOKEN_EXPIRE_MINUTES"))
+# Токени з "uid" знаходять користувача за первинним ключем і переживають зміну email
+JWT_EMBED_USER_ID = config("JWT_EMBED_USER_ID", default=True, cast=bool)
 
 # Хешування паролю
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
 
 # Перевірка паролю
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await password_hasher.verify(plain, hashed)
+
+# Перевірка паролю для логіну; другий елемент — новий хеш, якщо BCRYPT_ROUNDS змінився
+async def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, str | None]:
+    return await password_hasher.verify_and_update(plain, hashed)
+
+# Claims для токена користувача
+def user_claims(user: User) -> dict:
+    claims = {"sub": user.email}
+    if JWT_EMBED_USER_ID:
+        claims["uid"] = user.id
+    return claims
 
 # Створення JWT-токена
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return token_service.encode(to_encode)
 
 # Отримання користувача з токена
 async def get_current_user(
@@ -46,15 +58,27 @@ async def get_current_user(
     )
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # Перевірений токен кешується до exp; ключі — з keyset (ротація за kid)
+        payload = token_service.decode(token)
         email: str = payload.get("sub")
+        user_id = payload.get("uid")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    user = await get_user_by_email(email, db)
+    # Кеш principal: більшість запитів обходяться без БД
+    key = principal_key(user_id, email)
+    user = get_principal(key)
+    if user is not None:
+        return user
+
+    if user_id is not None:
+        user = await db.get(User, user_id)
+    else:
+        user = await get_user_by_email(email, db)
     if user is None:
         raise credentials_exception
 
+    cache_principal(key, user, payload.get("exp"))
     return user
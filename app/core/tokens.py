@@ -0,0 +1,229 @@
+# core/tokens.py
+# JWT signing and verification with a kid-indexed keyset and a memo of verified
+# tokens. A bearer token is verified once; repeats within its lifetime are a
+# digest lookup. Keys come from SECRET_KEY/ALGORITHM, or from a keyset file
+# (JWT_KEYSET_PATH) that is re-read when it changes, so keys rotate without a restart.
+#
+# Keyset file:
+#   {"active_kid": "2026-10",
+#    "keys": [{"kid": "2026-10", "alg": "EdDSA", "private_key": "ed25519.pem", "public_key": "ed25519.pub.pem"},
+#             {"kid": "2026-04", "alg": "RS256", "public_key": "-----BEGIN PUBLIC KEY-----..."}]}
+# Key values are inline PEM, a path relative to the keyset file, or "secret" for HS*.
+# Keys without a private key only verify; tokens are signed with active_kid.
+
+import base64
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    PublicFormat,
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from decouple import config
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
+
+from app.utils.lru import LRUTTLCache
+
+SECRET_KEY = config("SECRET_KEY")
+ALGORITHM = config("ALGORITHM")
+JWT_KEYSET_PATH = config("JWT_KEYSET_PATH", default="")
+# How often the keyset file's mtime is checked
+JWT_KEYSET_RELOAD_SEC = config("JWT_KEYSET_RELOAD_SEC", default=5.0, cast=float)
+JWT_VERIFIED_CACHE_SIZE = config("JWT_VERIFIED_CACHE_SIZE", default=10000, cast=int)
+# Upper bound for tokens without "exp"
+JWT_VERIFIED_CACHE_TTL_SEC = config("JWT_VERIFIED_CACHE_TTL_SEC", default=300.0, cast=float)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str | None
+    alg: str
+    # HS*: the secret; RS*/ES*: PEM text; EdDSA: cryptography key objects
+    verify_key: object
+    sign_key: object | None = None
+
+
+class KeySet:
+    def __init__(self, keys: list[SigningKey], active_kid: str | None):
+        self.keys = {key.kid: key for key in keys}
+        if active_kid not in self.keys:
+            raise ValueError(f"active_kid {active_kid!r} is not in the keyset")
+        self.active = self.keys[active_kid]
+
+    @classmethod
+    def from_secret(cls, secret: str = SECRET_KEY, alg: str = ALGORITHM) -> "KeySet":
+        # kid None matches tokens without a kid header, i.e. everything issued before keysets
+        return cls([SigningKey(None, alg, secret, secret)], None)
+
+    @classmethod
+    def from_file(cls, path: str | Path, legacy: SigningKey | None = None) -> "KeySet":
+        path = Path(path)
+        spec = json.loads(path.read_text(encoding="utf-8"))
+
+        def material(value: str | None) -> str | None:
+            if value is None or value.lstrip().startswith("-----BEGIN"):
+                return value
+            return (path.parent / value).read_text(encoding="utf-8")
+
+        keys = [legacy] if legacy is not None else []
+        for entry in spec["keys"]:
+            alg = entry["alg"]
+            if alg.startswith("HS"):
+                keys.append(SigningKey(entry["kid"], alg, entry["secret"], entry["secret"]))
+                continue
+            public_pem = material(entry.get("public_key"))
+            private_pem = material(entry.get("private_key"))
+            if alg == "EdDSA":
+                private = load_pem_private_key(private_pem.encode(), None) if private_pem else None
+                public = load_pem_public_key(public_pem.encode()) if public_pem else private.public_key()
+                if not isinstance(public, Ed25519PublicKey):
+                    raise ValueError(f"key {entry['kid']!r}: EdDSA needs an Ed25519 key")
+                keys.append(SigningKey(entry["kid"], alg, public, private))
+            else:
+                if public_pem is None:
+                    public_pem = load_pem_private_key(private_pem.encode(), None).public_key().public_bytes(
+                        Encoding.PEM, PublicFormat.SubjectPublicKeyInfo
+                    ).decode()
+                keys.append(SigningKey(entry["kid"], alg, public_pem, private_pem))
+        return cls(keys, spec["active_kid"])
+
+
+class KeySetFile:
+    """Keyset backed by a file; a changed file is picked up on the next check."""
+
+    def __init__(self, path: str | Path, legacy: SigningKey | None = None, reload_sec: float = JWT_KEYSET_RELOAD_SEC):
+        self.path = Path(path)
+        self.legacy = legacy
+        self.reload_sec = reload_sec
+        self._mtime = os.stat(self.path).st_mtime_ns
+        self.keyset = KeySet.from_file(self.path, legacy)
+        self._checked_at = time.monotonic()
+
+    def current(self) -> KeySet:
+        now = time.monotonic()
+        if now - self._checked_at >= self.reload_sec:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime != self._mtime:
+                    self.keyset = KeySet.from_file(self.path, self.legacy)
+                    self._mtime = mtime
+                    print("[JWT KEYSET RELOADED]", sorted(str(kid) for kid in self.keyset.keys))
+            except Exception as e:
+                # A half-written or broken file keeps the previous keys in service
+                print("[JWT KEYSET ERROR]", e)
+        return self.keyset
+
+
+def _check_time_claims(claims: dict, now: float) -> None:
+    # What jose checks for the algorithms it signs itself
+    if "exp" in claims and now >= float(claims["exp"]):
+        raise ExpiredSignatureError("Signature has expired.")
+    if "nbf" in claims and now < float(claims["nbf"]):
+        raise JWTClaimsError("The token is not yet valid (nbf)")
+
+
+class TokenService:
+    def __init__(self, keys: KeySet | KeySetFile, cache_size: int = JWT_VERIFIED_CACHE_SIZE):
+        self._keys = keys
+        self.verified = LRUTTLCache(cache_size, JWT_VERIFIED_CACHE_TTL_SEC)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def keyset(self) -> KeySet:
+        return self._keys.current() if isinstance(self._keys, KeySetFile) else self._keys
+
+    def encode(self, claims: dict) -> str:
+        key = self.keyset.active
+        if key.sign_key is None:
+            raise RuntimeError(f"active key {key.kid!r} has no private key")
+        headers = {"kid": key.kid} if key.kid is not None else None
+        if key.alg != "EdDSA":
+            return jwt.encode(claims, key.sign_key, algorithm=key.alg, headers=headers)
+
+        header = {"alg": "EdDSA", "typ": "JWT", **(headers or {})}
+        payload = {k: int(v.timestamp()) if hasattr(v, "timestamp") else v for k, v in claims.items()}
+        signing_input = ".".join(
+            _b64encode(json.dumps(part, separators=(",", ":")).encode()) for part in (header, payload)
+        )
+        return f"{signing_input}.{_b64encode(key.sign_key.sign(signing_input.encode()))}"
+
+    def _verify(self, token: str, key: SigningKey) -> dict:
+        if key.alg != "EdDSA":
+            return jwt.decode(token, key.verify_key, algorithms=[key.alg])
+        try:
+            signing_input, signature = token.rsplit(".", 1)
+            key.verify_key.verify(_b64decode(signature), signing_input.encode())
+            claims = json.loads(_b64decode(signing_input.split(".", 1)[1]))
+        except (InvalidSignature, ValueError) as e:
+            raise JWTError("Signature verification failed.") from e
+        _check_time_claims(claims, time.time())
+        return claims
+
+    def decode(self, token: str) -> dict:
+        """Verified claims, or JWTError."""
+        digest = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        keyset = self.keyset
+        cached = self.verified.get(digest)
+        # A hit must still be signed by a key in the current keyset
+        if cached is not None and cached[0] in keyset.keys:
+            claims = cached[1]
+            if "exp" not in claims or time.time() < float(claims["exp"]):
+                self.hits += 1
+                return claims
+
+        self.misses += 1
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError:
+            raise
+        except Exception as e:
+            raise JWTError("Invalid header") from e
+        key = keyset.keys.get(header.get("kid"))
+        # The key decides the algorithm, never the token
+        if key is None or header.get("alg") != key.alg:
+            raise JWTError("Unknown signing key")
+        claims = self._verify(token, key)
+
+        ttl = JWT_VERIFIED_CACHE_TTL_SEC
+        if "exp" in claims:
+            ttl = min(ttl, float(claims["exp"]) - time.time())
+        if ttl > 0:
+            self.verified.set(digest, (key.kid, claims), ttl)
+        return claims
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.verified),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _build_keys() -> KeySet | KeySetFile:
+    if not JWT_KEYSET_PATH:
+        return KeySet.from_secret()
+    return KeySetFile(JWT_KEYSET_PATH, legacy=SigningKey(None, ALGORITHM, SECRET_KEY))
+
+
+token_service = TokenService(_build_keys())
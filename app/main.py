@@ -1,11 +1,54 @@
 # main.py
 
+import asyncio
+from contextlib import asynccontextmanager
+
+from decouple import config
 from fastapi import FastAPI
-from app.routers import auth, post, comment, analytics
+from fastapi.responses import ORJSONResponse
+from app.core.cache import response_cache
+from app.core.db import AsyncSessionLocal, engine, replica_engines
+from app.core.metrics import METRICS_ENABLED, MetricsMiddleware, instrument_engine
+from app.core.passwords import password_hasher
+from app.core.rate_limit import rate_limiter
+from app.core.replicas import read_router
+from app.routers import auth, post, comment, analytics, export, search, feed, metrics
+from app.services import comment_counts  # noqa: F401  (registers the reconcile job handler)
+from app.services.comment_stats import schedule_stats_rollup
+from app.services.jobs import JobWorker
+
+# Set to False when jobs are processed by a separate `python -m app.worker`
+JOB_WORKER_IN_PROCESS = config("JOB_WORKER_IN_PROCESS", default=True, cast=bool)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    worker = JobWorker() if JOB_WORKER_IN_PROCESS else None
+    if worker:
+        async with AsyncSessionLocal() as db:
+            await schedule_stats_rollup(db)
+        worker.start()
+    health_checks = asyncio.create_task(read_router.run_health_checks()) if read_router.replicas else None
+    yield
+    if health_checks:
+        health_checks.cancel()
+    if worker:
+        await worker.stop()
+    await response_cache.close()
+    await rate_limiter.close()
+    password_hasher.close()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(post.router, prefix="/posts", tags=["posts"])
 app.include_router(comment.router, prefix="/comments", tags=["comments"])
-app.include_router(analytics.router, prefix="/api", tags=["analytics"])
\ No newline at end of file
+app.include_router(analytics.router, prefix="/api", tags=["analytics"])
+app.include_router(export.router, prefix="/export", tags=["export"])
+app.include_router(search.router, prefix="/search", tags=["search"])
+app.include_router(feed.router, tags=["feed"])
+
+if METRICS_ENABLED:
+    for name, eng in {"primary": engine, **replica_engines}.items():
+        instrument_engine(name, eng)
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router, tags=["metrics"])
@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, func
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Index, DDL, FetchedValue, event, func, text
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from app.core.db import Base
+from app.models.search import search_vector_column
 
 class Comment(Base):
     __tablename__ = "comments"
@@ -8,9 +10,150 @@ class Comment(Base):
     id = Column(Integer, primary_key=True)
     post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"))
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    # The comment this one answers; NULL for top-level comments
+    parent_id = Column(Integer, ForeignKey("comments.id", ondelete="CASCADE"))
+    # Materialized path: ids from the thread's root down to this comment, set on
+    # insert by the comments_set_path trigger. Sorting by it gives thread order.
+    path = Column(ARRAY(Integer), nullable=False, server_default=FetchedValue())
     content = Column(String, nullable=False)
     is_blocked = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    search_vector = search_vector_column()
 
     post = relationship("Post", back_populates="comments")
     user = relationship("User", back_populates="comments")
+
+    __table_args__ = (
+        # Keyset pagination of a post's comments
+        Index("ix_comments_post_id_created_at_id", "post_id", "created_at", "id"),
+        # ON DELETE CASCADE from users
+        Index("ix_comments_user_id", "user_id"),
+        # Date-range analytics; is_blocked is included so the scan never visits the heap
+        Index("ix_comments_created_at", "created_at", postgresql_include=["is_blocked"]),
+        Index("ix_comments_search_vector", "search_vector", postgresql_using="gin"),
+        # Thread loading: a post's top-level comments, and the replies to a comment
+        # (also ON DELETE CASCADE from the parent)
+        Index("ix_comments_post_id_roots", "post_id", "id", postgresql_where=text("parent_id IS NULL")),
+        Index("ix_comments_parent_id_id", "parent_id", "id"),
+    )
+
+
+# Rows a statement changed on comments, as (post_id, created_at, is_blocked, sign):
+# +1 for new images, -1 for old ones, so an UPDATE nets out what did not change.
+# Returned as SQL text for EXECUTE in the statement-level triggers, because a
+# transition table that does not exist for TG_OP cannot appear in static SQL.
+COMMENT_CHANGES_FUNCTION = """
+CREATE OR REPLACE FUNCTION comment_changes(op text) RETURNS text
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE op
+        WHEN 'INSERT' THEN 'SELECT post_id, created_at, is_blocked IS TRUE AS is_blocked, 1 AS sign FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT post_id, created_at, is_blocked IS TRUE AS is_blocked, -1 AS sign FROM old_rows'
+        ELSE 'SELECT post_id, created_at, is_blocked IS TRUE AS is_blocked, -1 AS sign FROM old_rows '
+             'UNION ALL SELECT post_id, created_at, is_blocked IS TRUE, 1 FROM new_rows'
+    END
+$$
+"""
+
+
+def comment_change_triggers(name: str, function: str) -> list[str]:
+    # Transition tables allow only one event per trigger
+    return [
+        f"""
+        CREATE OR REPLACE TRIGGER {name}_{event_name.lower()}
+        AFTER {event_name} ON comments
+        REFERENCING {tables}
+        FOR EACH STATEMENT EXECUTE FUNCTION {function}()
+        """
+        for event_name, tables in (
+            ("INSERT", "NEW TABLE AS new_rows"),
+            ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+            ("DELETE", "OLD TABLE AS old_rows"),
+        )
+    ]
+
+
+# posts.comment_count / blocked_comment_count follow every write to comments:
+# create_comment, bulk inserts, auto-replies, moderation changes and cascades.
+# Transition tables rule out an UPDATE OF column list, so every UPDATE of comments
+# builds both of them; an update that moves no count returns before any other work.
+# The posts are locked in id order first, like reconcile_batch does, so the two
+# cannot deadlock on posts they both touch.
+POST_COMMENT_COUNTS_FUNCTION = """
+CREATE OR REPLACE FUNCTION post_comment_counts_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        IF NOT EXISTS (
+            SELECT 1 FROM old_rows o JOIN new_rows n USING (id)
+            WHERE (o.post_id, o.is_blocked IS TRUE) IS DISTINCT FROM (n.post_id, n.is_blocked IS TRUE)
+        ) THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+    EXECUTE format($sql$
+        SELECT 1 FROM posts
+        WHERE id IN (
+            SELECT post_id FROM (%%s) c
+            GROUP BY post_id
+            HAVING sum(sign) <> 0 OR COALESCE(sum(sign) FILTER (WHERE is_blocked), 0) <> 0
+        )
+        ORDER BY id
+        FOR NO KEY UPDATE
+    $sql$, comment_changes(TG_OP));
+    EXECUTE format($sql$
+        UPDATE posts p SET
+            comment_count = p.comment_count + d.total,
+            blocked_comment_count = p.blocked_comment_count + d.blocked
+        FROM (
+            SELECT post_id, sum(sign) AS total, COALESCE(sum(sign) FILTER (WHERE is_blocked), 0) AS blocked
+            FROM (%%s) c
+            GROUP BY post_id
+        ) d
+        WHERE p.id = d.post_id AND (d.total <> 0 OR d.blocked <> 0)
+    $sql$, comment_changes(TG_OP));
+    RETURN NULL;
+END
+$$
+"""
+
+POST_COMMENT_COUNTS_TRIGGERS = comment_change_triggers("comments_post_counts", "post_comment_counts_apply")
+
+# create_all() installs these too (DDL() needs %% for %); migrations do it in 7c0a9e4f3d21
+# and c2f8a6d4e1b9
+for _statement in [COMMENT_CHANGES_FUNCTION, POST_COMMENT_COUNTS_FUNCTION, *POST_COMMENT_COUNTS_TRIGGERS]:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+
+# A reply extends its parent's path and must be on the same post. parent_id is
+# set once, on insert.
+COMMENT_PATH_FUNCTION = """
+CREATE OR REPLACE FUNCTION comment_set_path() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    parent_path integer[];
+    parent_post_id integer;
+BEGIN
+    IF NEW.parent_id IS NULL THEN
+        NEW.path := ARRAY[NEW.id];
+        RETURN NEW;
+    END IF;
+    SELECT path, post_id INTO parent_path, parent_post_id FROM comments WHERE id = NEW.parent_id;
+    IF parent_post_id IS DISTINCT FROM NEW.post_id THEN
+        RAISE EXCEPTION 'parent comment %% is not on post %%', NEW.parent_id, NEW.post_id
+            USING ERRCODE = 'foreign_key_violation';
+    END IF;
+    NEW.path := parent_path || NEW.id;
+    RETURN NEW;
+END
+$$
+"""
+
+COMMENT_PATH_TRIGGER = """
+CREATE OR REPLACE TRIGGER comments_set_path
+BEFORE INSERT ON comments
+FOR EACH ROW EXECUTE FUNCTION comment_set_path()
+"""
+
+# Migrations install these in 3d5f8a1c9b27
+for _statement in [COMMENT_PATH_FUNCTION, COMMENT_PATH_TRIGGER]:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
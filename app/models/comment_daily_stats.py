@@ -0,0 +1,49 @@
+# app/models/comment_daily_stats.py
+
+from sqlalchemy import Column, Integer, Date, DDL, event
+from app.core.db import Base
+from app.models.comment import comment_change_triggers
+
+class CommentDailyStats(Base):
+    __tablename__ = "comment_daily_stats"
+
+    # UTC calendar day of comments.created_at
+    day = Column(Date, primary_key=True)
+    total_comments = Column(Integer, nullable=False, default=0)
+    blocked_comments = Column(Integer, nullable=False, default=0)
+
+
+# Keeps the rollup in step with every insert, delete (including ON DELETE CASCADE)
+# and is_blocked/created_at change on comments, whichever code path makes it.
+# Statement-level: a multi-row statement touches each day's row once, not once per comment.
+# Comments of the current UTC day are left out: every new comment lands on that day,
+# and upserting its row would serialize all comment writes on one row lock. Reads
+# count today live; the close_comment_stats job writes the day once it is over.
+COMMENT_DAILY_STATS_FUNCTION = """
+CREATE OR REPLACE FUNCTION comment_daily_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    EXECUTE format($sql$
+        INSERT INTO comment_daily_stats AS s (day, total_comments, blocked_comments)
+        SELECT day, sum(sign), COALESCE(sum(sign) FILTER (WHERE is_blocked), 0)
+        FROM (
+            SELECT (created_at AT TIME ZONE 'UTC')::date AS day, is_blocked, sign FROM (%%s) c
+            WHERE created_at < date_trunc('day', statement_timestamp() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+        ) d
+        GROUP BY day
+        HAVING sum(sign) <> 0 OR COALESCE(sum(sign) FILTER (WHERE is_blocked), 0) <> 0
+        ON CONFLICT (day) DO UPDATE SET
+            total_comments = s.total_comments + EXCLUDED.total_comments,
+            blocked_comments = s.blocked_comments + EXCLUDED.blocked_comments
+    $sql$, comment_changes(TG_OP));
+    RETURN NULL;
+END
+$$
+"""
+
+COMMENT_DAILY_STATS_TRIGGERS = comment_change_triggers("comments_daily_stats", "comment_daily_stats_apply")
+
+# create_all() (tests, fresh databases) installs the triggers too; migrations do it in
+# ed0f1c3b7a52 (row-level) and 7c0a9e4f3d21 (statement-level)
+for _statement in [COMMENT_DAILY_STATS_FUNCTION, *COMMENT_DAILY_STATS_TRIGGERS]:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
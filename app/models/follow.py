@@ -0,0 +1,16 @@
+# app/models/follow.py
+
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, func
+from app.core.db import Base
+
+class Follow(Base):
+    __tablename__ = "follows"
+
+    follower_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    followee_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Followers of an author (and ON DELETE CASCADE from users)
+        Index("ix_follows_followee_id", "followee_id"),
+    )
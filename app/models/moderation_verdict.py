@@ -0,0 +1,13 @@
+# app/models/moderation_verdict.py
+
+from sqlalchemy import Column, String, Boolean, DateTime, func
+from app.core.db import Base
+
+class ModerationVerdict(Base):
+    __tablename__ = "moderation_verdicts"
+
+    # sha256 of the normalized text
+    text_hash = Column(String(64), primary_key=True)
+    is_toxic = Column(Boolean, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
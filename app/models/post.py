@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index, func, text
 from sqlalchemy.orm import relationship
 from app.core.db import Base
+from app.models.search import search_vector_column
 
 class Post(Base):
     __tablename__ = "posts"
@@ -11,6 +12,19 @@ class Post(Base):
     is_blocked = Column(Boolean, default=False)
     auto_reply_enabled = Column(Boolean, default=False)
     reply_delay_sec = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    search_vector = search_vector_column()
+    # Kept by the triggers on comments (see app.models.comment); repaired by app.reconcile_counts
+    comment_count = Column(Integer, nullable=False, server_default="0")
+    blocked_comment_count = Column(Integer, nullable=False, server_default="0")
 
     user = relationship("User", back_populates="posts")
-    comments = relationship("Comment", back_populates="post", cascade="all, delete")
\ No newline at end of file
+    comments = relationship("Comment", back_populates="post", cascade="all, delete")
+
+    __table_args__ = (
+        # Keyset pagination of a user's posts
+        Index("ix_posts_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Home feeds: an author's visible posts, newest first, as an index-only scan
+        Index("ix_posts_feed", "user_id", "created_at", "id", postgresql_where=text("is_blocked IS NOT TRUE")),
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+    )
\ No newline at end of file
@@ -0,0 +1,14 @@
+# app/models/search.py
+
+from sqlalchemy import Column, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
+
+# Text search configuration of the generated search_vector columns and of every
+# query against them. Changing it needs a migration that regenerates the columns.
+TS_CONFIG = "english"
+
+
+def search_vector_column():
+    # Kept current by Postgres on every write; deferred so ORM loads never fetch it
+    return deferred(Column(TSVECTOR, Computed(f"to_tsvector('{TS_CONFIG}', content)", persisted=True)))
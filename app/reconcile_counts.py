@@ -0,0 +1,28 @@
+# reconcile_counts.py
+# Recount posts.comment_count / blocked_comment_count from raw comments:
+#   python -m app.reconcile_counts [--batch-size N] [--enqueue]
+# --enqueue hands the walk to the job workers instead of running it here.
+
+import argparse
+import asyncio
+
+from app.core.db import AsyncSessionLocal
+from app.services.comment_counts import RECONCILE_BATCH_SIZE, RECONCILE_JOB, reconcile_comment_counts
+from app.services.jobs import enqueue_job
+
+async def main(batch_size: int, enqueue: bool):
+    async with AsyncSessionLocal() as db:
+        if enqueue:
+            await enqueue_job(db, RECONCILE_JOB, {"after_id": 0, "batch_size": batch_size})
+            await db.commit()
+            print("[RECONCILE] job enqueued")
+            return
+        repaired = await reconcile_comment_counts(db, batch_size)
+    print(f"[RECONCILE] repaired {repaired} post(s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH_SIZE)
+    parser.add_argument("--enqueue", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.enqueue))
@@ -1,35 +1,23 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
 from datetime import date
+import json
 
-from app.core.db import get_db
+from app.core.cache import COMMENT_STATS_TAG, response_cache
+from app.core.replicas import get_read_db
+from app.services.comment_stats import get_daily_breakdown
 
 router = APIRouter()
 
 @router.get("/comments-daily-breakdown")
 async def comments_daily_breakdown(
+    request: Request,
     date_from: date = Query(..., description="Start date (YYYY-MM-DD)"),
     date_to: date = Query(..., description="End date (YYYY-MM-DD)"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> list[dict]:
-    stmt = text("""
-        SELECT
-            DATE(created_at) AS day,
-            COUNT(*) AS total_comments,
-            SUM(CASE WHEN is_blocked THEN 1 ELSE 0 END) AS blocked_comments
-        FROM comments
-        WHERE created_at BETWEEN :date_from AND :date_to
-        GROUP BY day
-        ORDER BY day
-    """)
-    result = await db.execute(stmt, {"date_from": date_from, "date_to": date_to})
-    rows = result.fetchall()
-    return [
-        {
-            "date": str(row.day),
-            "total_comments": row.total_comments,
-            "blocked_comments": row.blocked_comments or 0
-        }
-        for row in rows
-    ]
\ No newline at end of file
+    # Days are UTC and both ends are inclusive
+    async def build():
+        return json.dumps(await get_daily_breakdown(db, date_from, date_to)).encode(), {}
+
+    return await response_cache.respond(request, [COMMENT_STATS_TAG], build, db=db)
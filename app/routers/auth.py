@@ -4,10 +4,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db import get_db
+from app.core.replicas import get_read_db
 from app.schemas.user import UserCreate, UserRead
 from app.services.user import get_user_by_email
 from app.services.auth import create_user, get_all_users
-from app.core.security import verify_password, create_access_token, get_current_user
+from app.core.security import verify_and_update_password, create_access_token, get_current_user, user_claims
 from app.models.user import User
 
 router = APIRouter()
@@ -26,14 +27,21 @@ async def login(
     db: AsyncSession = Depends(get_db),
 ):
     user = await get_user_by_email(form_data.username, db)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Stored with an old cost factor; upgrade it while the plain password is at hand
+        user.hashed_password = new_hash
+        await db.commit()
 
-    access_token = create_access_token({"sub": user.email})
+    access_token = create_access_token(user_claims(user))
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/all-users", response_model=list[UserRead])
-async def all_users(db: AsyncSession = Depends(get_db)):
+async def all_users(db: AsyncSession = Depends(get_read_db)):
     return await get_all_users(db)
 
 @router.get("/me")
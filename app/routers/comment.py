@@ -1,16 +1,35 @@
 # routers/comment.py
 
-from fastapi import APIRouter, Depends
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import post_comments_tag, response_cache
 from app.core.db import get_db
-from app.schemas.comment import CommentCreate, CommentRead
-from app.services.comment import create_comment, get_comments_by_post
+from app.core.rate_limit import limit_writes, rate_limiter
+from app.core.replicas import get_read_db
+from app.schemas.comment import CommentBulkResult, CommentCreate, CommentNode, CommentRead
+from app.services.ai_moderation import MODERATION_BULK_BATCH_SIZE
+from app.services.comment import (
+    COMMENT_TREE_MAX_DEPTH,
+    COMMENTS_BULK_MAX_ITEMS,
+    create_comment,
+    create_comments_bulk,
+    get_comment_tree,
+    get_comments_by_post,
+)
 from app.core.security import get_current_user
 from app.models.user import User
+from app.utils.pagination import NEXT_CURSOR_HEADER, PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT, decode_cursor, decode_id_cursor
+from app.utils.serialization import RowEncoder
 
 router = APIRouter()
 
-@router.post("/", response_model=CommentRead)
+comment_rows = RowEncoder(CommentRead)
+comment_tree = TypeAdapter(list[CommentNode])
+
+@router.post("/", response_model=CommentRead, dependencies=[Depends(limit_writes)])
 async def create_comment_view(
     comment_in: CommentCreate,
     db: AsyncSession = Depends(get_db),
@@ -18,10 +37,103 @@ async def create_comment_view(
 ):
     return await create_comment(user.id, comment_in, db)
 
+def _too_many_items() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"At most {COMMENTS_BULK_MAX_ITEMS} comments per request",
+    )
+
+async def _read_bulk_items(request: Request) -> list:
+    """Raw items from a JSON array body, or from NDJSON (one object per line)."""
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        items, buffer = [], b""
+        # Lines are parsed as they arrive, so an oversized upload stops early
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    items.append(line)
+                if len(items) > COMMENTS_BULK_MAX_ITEMS:
+                    raise _too_many_items()
+        if buffer.strip():
+            items.append(buffer)
+        return items
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array")
+    return items
+
+def _parse_bulk_item(raw) -> CommentCreate | str:
+    try:
+        if isinstance(raw, bytes):
+            return CommentCreate.model_validate_json(raw)
+        return CommentCreate.model_validate(raw)
+    except ValidationError as e:
+        return "; ".join(f"{'.'.join(map(str, err['loc'])) or 'item'}: {err['msg']}" for err in e.errors())
+
+@router.post("/bulk", response_model=CommentBulkResult)
+async def create_comments_bulk_view(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Create many comments in one request. Accepts a JSON array of comments or
+    NDJSON (Content-Type: application/x-ndjson). Invalid items are reported per
+    index and do not fail the rest.
+    """
+    items = await _read_bulk_items(request)
+    if len(items) > COMMENTS_BULK_MAX_ITEMS:
+        raise _too_many_items()
+    # One token per moderation prompt the request may need
+    await rate_limiter.check(request, user.id, cost=max(1, -(-len(items) // MODERATION_BULK_BATCH_SIZE)))
+    return await create_comments_bulk(user.id, [_parse_bulk_item(raw) for raw in items], db)
+
 @router.get("/post/{post_id}", response_model=list[CommentRead])
 async def get_post_comments(
     post_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: str | None = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    records = await get_comments_by_post(post_id, db)
-    return [CommentRead.model_validate(row) for row in records]
\ No newline at end of file
+    page_cursor = decode_cursor(cursor)
+
+    async def build():
+        records, next_cursor = await get_comments_by_post(post_id, db, limit, page_cursor)
+        body = comment_rows.encode(records)
+        return body, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+    return await response_cache.respond(request, [post_comments_tag(post_id)], build, db=db)
+
+@router.get("/post/{post_id}/tree", response_model=list[CommentNode])
+async def get_post_comment_tree(
+    post_id: int,
+    request: Request,
+    parent_id: int | None = Query(None, description="Page through the replies to this comment instead"),
+    limit: int = Query(20, ge=1, le=PAGE_MAX_LIMIT),
+    max_depth: int = Query(3, ge=1, le=COMMENT_TREE_MAX_DEPTH),
+    max_children: int = Query(5, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: str | None = Query(None, description="X-Next-Cursor of the previous page, or a node's replies_cursor"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    A post's thread: a page of top-level comments (or of the replies to
+    `parent_id`), each with up to `max_children` replies per comment, `max_depth`
+    levels deep. Nodes with `more_replies` continue with `parent_id=<id>`.
+    """
+    page_cursor = decode_id_cursor(cursor)
+
+    async def build():
+        nodes, next_cursor = await get_comment_tree(
+            post_id, db, limit, max_depth, max_children, parent_id, page_cursor
+        )
+        body = comment_tree.dump_json([CommentNode.model_validate(node) for node in nodes])
+        return body, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+    return await response_cache.respond(request, [post_comments_tag(post_id)], build, db=db)
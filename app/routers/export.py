@@ -0,0 +1,46 @@
+# routers/export.py
+
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.security import get_current_user
+from app.models.user import User
+from app.services.export import EXPORT_FORMATS, comments_query, posts_query, stream_rows
+
+router = APIRouter()
+
+ExportFormat = Literal["ndjson", "csv"]
+
+
+def _export_response(stmt, fmt: str, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_rows(stmt, fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+@router.get("/posts")
+async def export_posts(
+    format: ExportFormat = Query("ndjson"),
+    user_id: int | None = Query(None),
+    date_from: date | None = Query(None, description="Start date (YYYY-MM-DD), UTC, inclusive"),
+    date_to: date | None = Query(None, description="End date (YYYY-MM-DD), UTC, inclusive"),
+    user: User = Depends(get_current_user),
+):
+    return _export_response(posts_query(user_id, date_from, date_to), format, "posts")
+
+
+@router.get("/comments")
+async def export_comments(
+    format: ExportFormat = Query("ndjson"),
+    user_id: int | None = Query(None),
+    post_id: int | None = Query(None),
+    date_from: date | None = Query(None, description="Start date (YYYY-MM-DD), UTC, inclusive"),
+    date_to: date | None = Query(None, description="End date (YYYY-MM-DD), UTC, inclusive"),
+    user: User = Depends(get_current_user),
+):
+    return _export_response(comments_query(user_id, post_id, date_from, date_to), format, "comments")
@@ -0,0 +1,43 @@
+# routers/feed.py
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_db
+from app.core.security import get_current_user
+from app.models.user import User
+from app.schemas.post import FeedPost
+from app.services.feed import follow_user, get_feed, unfollow_user
+from app.utils.pagination import PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT, decode_cursor
+from app.utils.serialization import RowEncoder
+
+router = APIRouter()
+
+feed_rows = RowEncoder(FeedPost)
+
+@router.put("/users/{user_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+async def follow_view(
+    user_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    await follow_user(user.id, user_id, db)
+
+@router.delete("/users/{user_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+async def unfollow_view(
+    user_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    await unfollow_user(user.id, user_id, db)
+
+@router.get("/feed", response_model=list[FeedPost])
+async def get_feed_view(
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: str | None = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    # The primary: a window built from a lagging replica could miss a new follow
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Visible posts of the users you follow, newest first."""
+    records, next_cursor = await get_feed(user.id, db, limit, decode_cursor(cursor))
+    return feed_rows.response(records, next_cursor)
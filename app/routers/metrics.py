@@ -0,0 +1,82 @@
+# routers/metrics.py
+# Prometheus scrape endpoint. Each process serves its own registry, so scrape
+# every worker process (or run one per container).
+
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import response_cache
+from app.core.db import PoolStats, get_db, pool_metrics
+from app.core.feeds import feed_cache
+from app.core.metrics import set_queue_depth
+from app.core.rate_limit import rate_limiter
+from app.core.replicas import read_router
+from app.core.tokens import token_service
+from app.services.ai_moderation import engine as moderation_engine, moderation_admission, verdict_cache
+from app.services.jobs import queue_depth
+
+router = APIRouter()
+
+# Numeric values of each stats() dict become app_<name>_<key> gauges
+STATS_SOURCES = {
+    "moderation_cache": verdict_cache.stats,
+    "response_cache": response_cache.stats,
+    "token_cache": token_service.stats,
+    "feed_cache": feed_cache.stats,
+    "rate_limit": rate_limiter.stats,
+    "moderation_admission": moderation_admission.stats,
+    "moderation_breaker": moderation_engine.breaker.stats,
+}
+
+
+class SnapshotCollector(Collector):
+    """Connection pools, replicas and cache counters, read at scrape time."""
+
+    def collect(self):
+        pools = pool_metrics()
+        for key in ("size", "checked_out", "idle", "overflow", "saturation"):
+            family = GaugeMetricFamily(f"db_pool_{key}", f"Connection pool {key}", labels=["pool"])
+            for pool in pools:
+                family.add_metric([pool["pool"]], pool[key])
+            yield family
+        for key, name in (("checkouts", "db_pool_checkouts"), ("checkout_timeouts", "db_pool_checkout_timeouts")):
+            family = CounterMetricFamily(name, f"Connection pool {key}", labels=["pool"])
+            for pool in pools:
+                family.add_metric([pool["pool"]], pool[key])
+            yield family
+        wait = HistogramMetricFamily(
+            "db_pool_checkout_wait_seconds", "Time waiting for a pooled connection", labels=["pool"],
+        )
+        for pool in pools:
+            cumulative, buckets = 0, []
+            for bound, count in zip(PoolStats.BUCKETS, pool["checkout_wait_buckets"].values()):
+                cumulative += count
+                buckets.append(("+Inf" if bound == float("inf") else str(bound), cumulative))
+            wait.add_metric([pool["pool"]], buckets, pool["checkout_wait_total_sec"])
+        yield wait
+
+        healthy = GaugeMetricFamily("db_replica_healthy", "1 while the replica serves reads", labels=["replica"])
+        lag = GaugeMetricFamily("db_replica_lag_seconds", "Replication lag at the last health check", labels=["replica"])
+        for replica in read_router.status():
+            healthy.add_metric([replica["name"]], int(replica["healthy"]))
+            lag.add_metric([replica["name"]], replica["lag_sec"])
+        yield healthy
+        yield lag
+
+        for source_name, source in STATS_SOURCES.items():
+            for key, value in source().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    yield GaugeMetricFamily(f"app_{source_name}_{key}", f"{source_name} {key}", value=value)
+
+
+REGISTRY.register(SnapshotCollector())
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(db: AsyncSession = Depends(get_db)):
+    # The queue lives in the database, so it is the one value read per scrape
+    set_queue_depth(await queue_depth(db))
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -1,8 +1,10 @@
 # routers/post.py
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db import get_db
+from app.core.rate_limit import limit_writes
+from app.core.replicas import get_read_db
 from app.schemas.post import PostCreate, PostRead
 from app.services.post import (
     create_post,
@@ -13,10 +15,14 @@ from app.services.post import (
 )
 from app.core.security import get_current_user
 from app.models.user import User
+from app.utils.pagination import PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT, decode_cursor
+from app.utils.serialization import RowEncoder
 
 router = APIRouter()
 
-@router.post("/", response_model=PostRead)
+post_rows = RowEncoder(PostRead)
+
+@router.post("/", response_model=PostRead, dependencies=[Depends(limit_writes)])
 async def create_post_view(
     post_in: PostCreate,
     db: AsyncSession = Depends(get_db),
@@ -26,11 +32,13 @@ async def create_post_view(
 
 @router.get("/", response_model=list[PostRead])
 async def get_my_posts(
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: str | None = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
 ):
-    records = await get_posts_by_user(user.id, db)
-    return [PostRead.model_validate(row) for row in records]
+    records, next_cursor = await get_posts_by_user(user.id, db, limit, decode_cursor(cursor))
+    return post_rows.response(records, next_cursor)
 
 @router.get("/{post_id}", response_model=PostRead)
 async def get_post_by_id(
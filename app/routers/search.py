@@ -0,0 +1,44 @@
+# routers/search.py
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.replicas import get_read_db
+from app.core.security import get_current_user
+from app.models.user import User
+from app.schemas.comment import CommentRead
+from app.schemas.post import PostRead
+from app.services.search import search_comments, search_posts
+from app.utils.pagination import PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT, decode_rank_cursor
+from app.utils.serialization import RowEncoder
+
+router = APIRouter()
+
+post_rows = RowEncoder(PostRead)
+comment_rows = RowEncoder(CommentRead)
+
+SearchQuery = Query(..., min_length=1, max_length=200, description='Words, "quoted phrases", OR, -excluded')
+
+@router.get("/posts", response_model=list[PostRead])
+async def search_my_posts(
+    q: str = SearchQuery,
+    include_blocked: bool = Query(False),
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: str | None = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    # Searches the caller's own posts, like GET /posts/
+    records, next_cursor = await search_posts(db, q, limit, decode_rank_cursor(cursor), user.id, include_blocked)
+    return post_rows.response(records, next_cursor)
+
+@router.get("/comments", response_model=list[CommentRead])
+async def search_all_comments(
+    q: str = SearchQuery,
+    post_id: int | None = Query(None),
+    include_blocked: bool = Query(False),
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: str | None = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    records, next_cursor = await search_comments(db, q, limit, decode_rank_cursor(cursor), post_id, include_blocked)
+    return comment_rows.response(records, next_cursor)
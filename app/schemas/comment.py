@@ -4,13 +4,39 @@ from datetime import datetime
 class CommentCreate(BaseModel):
     post_id: int
     content: str
+    # Reply to this comment, which must be on the same post
+    parent_id: int | None = None
 
 class CommentRead(BaseModel):
     id: int
     post_id: int
     user_id: int
+    parent_id: int | None = None
     content: str
     is_blocked: bool
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+class CommentNode(CommentRead):
+    # 1 for top-level comments
+    depth: int
+    replies: list["CommentNode"] = []
+    # The node has replies beyond `replies`: fetch them with parent_id=<id>
+    # and cursor=replies_cursor (no cursor when none were loaded)
+    more_replies: bool = False
+    replies_cursor: str | None = None
+
+class CommentBulkItemResult(BaseModel):
+    index: int
+    # created | invalid | post_not_found | parent_not_found
+    status: str
+    id: int | None = None
+    is_blocked: bool | None = None
+    error: str | None = None
+
+class CommentBulkResult(BaseModel):
+    created: int
+    blocked: int
+    failed: int
+    results: list[CommentBulkItemResult]
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, ConfigDict
+from datetime import datetime
 
 class PostCreate(BaseModel):
     content: str
@@ -11,5 +12,13 @@ class PostRead(BaseModel):
     is_blocked: bool
     auto_reply_enabled: bool
     reply_delay_sec: int
+    created_at: datetime
+    comment_count: int
+    blocked_comment_count: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class FeedPost(PostRead):
+    # The author
+    user_id: int
@@ -1,66 +1,129 @@
+import asyncio
+from functools import partial
+
 from decouple import config
-from google import genai
-from google.genai.types import GenerateContentConfig
 
-GOOGLE_API_KEY = config("GOOGLE_API_KEY")
+from app.core.metrics import MODERATION_VERDICTS
+from app.core.rate_limit import AdmissionLimit
+from app.services.blacklist import DEFAULT_BLACKLIST_PATH, BlacklistMatcher
+from app.services.moderation_cache import VerdictCache
+from app.services.moderation_engine import (
+    FALLBACK_REPLY,
+    CircuitBreaker,
+    FakeBackend,
+    GeminiAsyncBackend,
+    GeminiThreadPoolBackend,
+    ModerationEngine,
+)
+
+# async | threads | fake
+MODERATION_BACKEND = config("MODERATION_BACKEND", default="async")
+MODERATION_MODEL = config("MODERATION_MODEL", default="gemini-2.0-flash")
+MODERATION_MAX_CONCURRENCY = config("MODERATION_MAX_CONCURRENCY", default=8, cast=int)
+# Requests allowed to wait on the model at once (per process); beyond that they get 429
+MODERATION_MAX_PENDING = config("MODERATION_MAX_PENDING", default=64, cast=int)
+MODERATION_TIMEOUT_SEC = config("MODERATION_TIMEOUT_SEC", default=10.0, cast=float)
+MODERATION_BATCH_SIZE = config("MODERATION_BATCH_SIZE", default=1, cast=int)
+MODERATION_BATCH_WINDOW_MS = config("MODERATION_BATCH_WINDOW_MS", default=20.0, cast=float)
+# Texts per prompt for bulk imports, whatever MODERATION_BATCH_SIZE is
+MODERATION_BULK_BATCH_SIZE = config("MODERATION_BULK_BATCH_SIZE", default=20, cast=int)
+MODERATION_FAKE_LATENCY_MS = config("MODERATION_FAKE_LATENCY_MS", default=50.0, cast=float)
+MODERATION_BLACKLIST_PATH = config("MODERATION_BLACKLIST_PATH", default=str(DEFAULT_BLACKLIST_PATH))
+MODERATION_CACHE_SIZE = config("MODERATION_CACHE_SIZE", default=10000, cast=int)
+MODERATION_CACHE_TTL_SEC = config("MODERATION_CACHE_TTL_SEC", default=86400.0, cast=float)
+# Share verdicts between workers through the moderation_verdicts table
+MODERATION_CACHE_SHARED = config("MODERATION_CACHE_SHARED", default=False, cast=bool)
+# Failures in a row that open the breaker, and how long it stays open before a probe
+MODERATION_BREAKER_FAILURES = config("MODERATION_BREAKER_FAILURES", default=5, cast=int)
+MODERATION_BREAKER_RESET_SEC = config("MODERATION_BREAKER_RESET_SEC", default=30.0, cast=float)
+# Text the model gave no verdict on (error, timeout, open breaker) is published (open),
+# blocked (closed), or published and checked again from a job until the model answers (queue)
+MODERATION_CHECK_FALLBACK = config("MODERATION_CHECK_FALLBACK", default="open")
+# Auto-replies without a model: the canned reply (canned), or the job is retried later (retry)
+MODERATION_REPLY_FALLBACK = config("MODERATION_REPLY_FALLBACK", default="canned")
+
+
+def _build_backend():
+    if MODERATION_BACKEND == "fake":
+        return FakeBackend(latency_ms=MODERATION_FAKE_LATENCY_MS)
+
+    from google import genai
+
+    # Initialize the client
+    client = genai.Client(api_key=config("GOOGLE_API_KEY"))
+    if MODERATION_BACKEND == "threads":
+        return GeminiThreadPoolBackend(client, MODERATION_MODEL, max_workers=MODERATION_MAX_CONCURRENCY)
+    return GeminiAsyncBackend(client, MODERATION_MODEL)
+
+
+# Word list compiled once at import
+blacklist = BlacklistMatcher.from_file(MODERATION_BLACKLIST_PATH)
+
+engine = ModerationEngine(
+    _build_backend(),
+    max_concurrency=MODERATION_MAX_CONCURRENCY,
+    timeout=MODERATION_TIMEOUT_SEC,
+    max_batch_size=MODERATION_BATCH_SIZE,
+    batch_window_ms=MODERATION_BATCH_WINDOW_MS,
+    bulk_batch_size=MODERATION_BULK_BATCH_SIZE,
+    breaker=CircuitBreaker(MODERATION_BREAKER_FAILURES, MODERATION_BREAKER_RESET_SEC),
+)
+
+verdict_cache = VerdictCache(
+    maxsize=MODERATION_CACHE_SIZE,
+    ttl=MODERATION_CACHE_TTL_SEC,
+    shared=MODERATION_CACHE_SHARED,
+)
+
+moderation_admission = AdmissionLimit(MODERATION_MAX_PENDING, "Moderation is at capacity, retry shortly")
 
-# Initialize the client
-client = genai.Client(api_key=GOOGLE_API_KEY)
 
-def is_text_toxic(text: str) -> bool:
-    # List of banned words for manual checking
-    blacklist = ["dick", "cunt", "fuck", "cock", "Bitch", "Whore"]
+async def _admitted_check(text: str) -> bool | None:
+    async with moderation_admission.slot():
+        return await engine.check(text)
 
-    # Check for presence of words from the list
-    if any(bad_word in text.lower() for bad_word in blacklist):
-        print("[MANUAL TOXICITY DETECTED] YES")
+
+async def check_text(text: str, bulk: bool = False, admit: bool = True) -> bool | None:
+    """True/False, or None when the model gave no verdict; see resolve_verdict."""
+    # Check for words from the blacklist (single local pass, no model call)
+    matches = blacklist.find(text)
+    if matches:
+        print("[MANUAL TOXICITY DETECTED] YES", [match.term for match in matches])
+        MODERATION_VERDICTS.labels("blacklist", "toxic").inc()
         return True
 
-    # If no match, use AI for checking
-    prompt = (
-        "Determine if the following text is offensive, toxic, or inappropriate. "
-        "Answer only 'YES' or 'NO'.\n\n"
-        f"Text: {text}"
-    )
-
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt,
-            config=GenerateContentConfig(
-                temperature=0.2,
-                max_output_tokens=20
-            )
-        )
-        content = response.text.strip()
-        print("[AI TOXICITY RESPONSE]", content)
-        return "yes" in content.lower()
-    except Exception as e:
-        print("[AI MODERATION ERROR]", e)
-        return False
-
-def generate_reply(post_text: str, comment_text: str) -> str:
-    prompt = (
-        "Generate a short, relevant reply in English to this comment, considering the post content. "
-        "The reply should be simple, sincere, and informal. "
-        "No unnecessary explanations, no introductions, no quotes, no formatting. "
-        "Write only the reply — one to two sentences maximum.\n\n"
-        f"Post: {post_text}\n"
-        f"Comment: {comment_text}"
-    )
-
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt,
-            config=GenerateContentConfig(
-                temperature=0.4,
-                max_output_tokens=50
-            )
-        )
-        reply = response.text.strip()
-        print("[AI REPLY GENERATED]", reply)
-        return reply
-    except Exception as e:
-        print("[AI REPLY ERROR]", e)
-        return "Thank you for your comment!"
\ No newline at end of file
+    # If no match, use AI for checking (identical texts are answered from the cache)
+    # Only cache misses take an admission slot; bulk requests hold one for the whole request
+    if bulk:
+        compute = partial(engine.check, bulk=True)
+    else:
+        compute = _admitted_check if admit else engine.check
+    verdict = await verdict_cache.get_or_compute(text, compute)
+    MODERATION_VERDICTS.labels("model", "unknown" if verdict is None else "toxic" if verdict else "clean").inc()
+    return verdict
+
+
+async def check_texts(texts: list[str]) -> list[bool | None]:
+    # Cache misses are grouped into prompts of MODERATION_BULK_BATCH_SIZE texts
+    async with moderation_admission.slot():
+        return list(await asyncio.gather(*(check_text(text, bulk=True) for text in texts)))
+
+
+def resolve_verdict(verdict: bool | None) -> bool:
+    """Whether to block: the verdict, or the MODERATION_CHECK_FALLBACK policy without one."""
+    if verdict is None:
+        return MODERATION_CHECK_FALLBACK == "closed"
+    return verdict
+
+
+def needs_remoderation(verdict: bool | None) -> bool:
+    return verdict is None and MODERATION_CHECK_FALLBACK == "queue"
+
+
+async def is_text_toxic(text: str, bulk: bool = False) -> bool:
+    return resolve_verdict(await check_text(text, bulk))
+
+
+async def generate_reply(post_text: str, comment_text: str) -> str:
+    fallback = None if MODERATION_REPLY_FALLBACK == "retry" else FALLBACK_REPLY
+    return await engine.generate_reply(post_text, comment_text, fallback)
@@ -6,10 +6,10 @@ from app.core.security import hash_password
 from app.models.user import User
 
 async def create_user(user_in: UserCreate, db: AsyncSession):
-    user = User(email=user_in.email, hashed_password=hash_password(user_in.password))
+    user = User(email=user_in.email, hashed_password=await hash_password(user_in.password))
     db.add(user)
+    # The INSERT returns the id and nothing else is server-generated; no refresh needed
     await db.commit()
-    await db.refresh(user)
     return user
 
 async def get_all_users(db: AsyncSession) -> list[User]:
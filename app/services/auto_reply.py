@@ -1,27 +1,55 @@
-import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import COMMENT_STATS_TAG, post_comments_tag, response_cache
 from app.models.comment import Comment
 from app.models.post import Post
-from app.models.user import User
 from app.services.ai_moderation import generate_reply
+from app.services.jobs import enqueue_job, enqueue_jobs, job_handler, on_commit
 
-async def schedule_auto_reply(comment: Comment, db: AsyncSession):
-    post = await db.get(Post, comment.post_id)
-    if not post or not post.auto_reply_enabled:
+AUTO_REPLY_JOB = "auto_reply"
+
+async def schedule_auto_reply(comment, db: AsyncSession):
+    # `comment` carries its post's settings too: post_user_id, auto_reply_enabled, reply_delay_sec
+    if not comment.auto_reply_enabled:
         return
 
-    if comment.user_id == post.user_id:     ### DON'T FORGET ABOUT THIS
+    if comment.user_id == comment.post_user_id:     ### DON'T FORGET ABOUT THIS
         return
 
-    await asyncio.sleep(post.reply_delay_sec or 1)
+    # The reply is written later by a job worker; the caller's commit publishes the job
+    await enqueue_job(
+        db,
+        AUTO_REPLY_JOB,
+        {"comment_id": comment.id},
+        delay_sec=comment.reply_delay_sec or 1,
+    )
+
+async def schedule_auto_replies(comments: list, posts: dict, db: AsyncSession):
+    # Bulk variant: `comments` need id/post_id/user_id, `posts` maps id -> post row
+    payloads = []
+    for comment in comments:
+        post = posts.get(comment.post_id)
+        if not post or not post.auto_reply_enabled or comment.user_id == post.user_id:
+            continue
+        payloads.append(({"comment_id": comment.id}, post.reply_delay_sec or 1))
+    await enqueue_jobs(db, AUTO_REPLY_JOB, payloads)
+
+@job_handler(AUTO_REPLY_JOB)
+async def run_auto_reply(payload: dict, db: AsyncSession):
+    comment = await db.get(Comment, payload["comment_id"])
+    if not comment or comment.is_blocked:
+        return
+    post = await db.get(Post, comment.post_id)
+    if not post or not post.auto_reply_enabled:
+        return
 
-    reply_text = generate_reply(post.content, comment.content)
+    reply_text = await generate_reply(post.content, comment.content)
 
     reply = Comment(
         user_id=comment.user_id,
         post_id=post.id,
+        parent_id=comment.id,
         content=reply_text,
         is_blocked=False,
     )
     db.add(reply)
-    await db.commit()
+    on_commit(db, lambda: response_cache.invalidate(post_comments_tag(post.id), COMMENT_STATS_TAG))
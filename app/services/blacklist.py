@@ -0,0 +1,120 @@
+# services/blacklist.py
+# Local pre-filter: the word list is compiled once into a single regex and each
+# text is scanned in one pass, before any model call.
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+DEFAULT_BLACKLIST_PATH = Path(__file__).resolve().parent.parent / "data" / "blacklist.txt"
+
+# Leetspeak and symbol substitutions accepted in place of a letter
+LEET_MAP = {
+    "a": "4@", "b": "8", "e": "3€", "g": "9", "i": "1!|", "l": "1|£",
+    "o": "0", "s": "5$", "t": "7+",
+}
+
+# Look-alike letters from other scripts (Cyrillic, Greek) that render like Latin ones
+CONFUSABLES_MAP = {
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h", "о": "o",
+    "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "і": "i", "ї": "i", "ј": "j",
+    "ѕ": "s", "ԁ": "d", "ɡ": "g", "ь": "b", "α": "a", "β": "b", "ε": "e", "η": "n",
+    "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p", "τ": "t", "υ": "u", "χ": "x",
+}
+
+# A word boundary is a change between letter and non-letter; digits and symbols
+# never count as letters, so "c0ck!" is still one bounded word
+_LETTER = r"[^\W\d_]"
+
+
+@lru_cache(maxsize=4096)
+def _fold_char(ch: str) -> str:
+    folded = []
+    for c in unicodedata.normalize("NFKD", ch):
+        if unicodedata.combining(c):
+            continue
+        for lower in c.casefold():
+            folded.append(CONFUSABLES_MAP.get(lower, lower))
+    return "".join(folded)
+
+
+def normalize(text: str) -> tuple[str, list[int] | None]:
+    """
+    Fold case, accents and look-alike letters. Also returns, for each folded
+    character, the index of the original character it came from (None when
+    the text is ASCII and positions are unchanged).
+    """
+    if text.isascii():
+        return text.lower(), None
+
+    chars: list[str] = []
+    offsets: list[int] = []
+    for index, ch in enumerate(text):
+        folded = _fold_char(ch)
+        chars.append(folded)
+        offsets.extend([index] * len(folded))
+    return "".join(chars), offsets
+
+
+def _term_pattern(body: str) -> str:
+    # Every letter may repeat ("fuuuck") or be written as its leetspeak variants
+    parts = []
+    for c in body:
+        variants = c + LEET_MAP.get(c, "")
+        parts.append((re.escape(c) if len(variants) == 1 else f"[{re.escape(variants)}]") + "+")
+    return "".join(parts)
+
+
+@dataclass(frozen=True)
+class BlacklistMatch:
+    term: str
+    start: int
+    end: int
+
+
+class BlacklistMatcher:
+    """
+    Word-list matcher returning spans in the original text. Terms match whole
+    words; a leading/trailing "*" in a term drops the boundary on that side.
+    """
+
+    def __init__(self, terms: list[str]):
+        cleaned = {term.strip().lower() for term in terms}
+        # Longest first so "cocksucker*" wins over "cock" at the same position
+        self.terms = sorted((term for term in cleaned if term.strip("*")), key=len, reverse=True)
+
+        bounded, unbounded = [], []
+        for term in self.terms:
+            pattern = _term_pattern(normalize(term.strip("*"))[0])
+            pattern += f"{_LETTER}*" if term.endswith("*") else f"(?!{_LETTER})"
+            (unbounded if term.startswith("*") else bounded).append((term, pattern))
+
+        # Group numbers follow the order the alternatives appear in the regex
+        self._group_terms = [term for term, _ in bounded + unbounded]
+        alternatives = []
+        if bounded:
+            alternatives.append(f"(?<!{_LETTER})(?:" + "|".join(f"({p})" for _, p in bounded) + ")")
+        alternatives.extend(f"({p})" for _, p in unbounded)
+        self._regex = re.compile("|".join(alternatives)) if alternatives else None
+
+    @classmethod
+    def from_file(cls, path: str | Path = DEFAULT_BLACKLIST_PATH) -> "BlacklistMatcher":
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+        return cls([line for line in lines if line.strip() and not line.lstrip().startswith("#")])
+
+    def find(self, text: str) -> list[BlacklistMatch]:
+        if self._regex is None:
+            return []
+        folded, offsets = normalize(text)
+        matches = []
+        for m in self._regex.finditer(folded):
+            start, end = m.span()
+            if offsets is not None:
+                start, end = offsets[start], offsets[end - 1] + 1
+            matches.append(BlacklistMatch(self._group_terms[m.lastindex - 1], start, end))
+        return matches
+
+    def is_match(self, text: str) -> bool:
+        return self._regex is not None and self._regex.search(normalize(text)[0]) is not None
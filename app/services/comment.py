@@ -1,27 +1,248 @@
+from decouple import config
+from fastapi import HTTPException
+from sqlalchemy import exists, insert, literal, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import COMMENT_STATS_TAG, post_comments_tag, response_cache
+from app.core.metrics import stage
 from app.models.comment import Comment
+from app.models.post import Post
 from app.schemas.comment import CommentCreate
-from app.services.ai_moderation import is_text_toxic
-from app.services.auto_reply import schedule_auto_reply
+from app.services.ai_moderation import check_text, check_texts, needs_remoderation, resolve_verdict
+from app.services.auto_reply import schedule_auto_replies, schedule_auto_reply
+from app.services.remoderation import schedule_remoderation
+from app.utils.pagination import Cursor, IdCursor, encode_id_cursor, keyset_page, split_page
+
+COMMENTS_BULK_MAX_ITEMS = config("COMMENTS_BULK_MAX_ITEMS", default=1000, cast=int)
+# Upper bounds for GET /comments/post/{post_id}/tree
+COMMENT_TREE_MAX_DEPTH = config("COMMENT_TREE_MAX_DEPTH", default=10, cast=int)
+COMMENT_TREE_MAX_NODES = config("COMMENT_TREE_MAX_NODES", default=1000, cast=int)
+
+# Listing columns: the search vector stays in the database
+LIST_COLUMNS = [column for column in Comment.__table__.c if column.key != "search_vector"]
 
 async def create_comment(user_id: int, data: CommentCreate, db: AsyncSession):
-    is_blocked = is_text_toxic(data.content)
+    with stage("create_comment.moderation"):
+        verdict = await check_text(data.content)
+        is_blocked = resolve_verdict(verdict)
 
-    comment = Comment(
-        user_id=user_id,
-        post_id=data.post_id,
-        content=data.content,
-        is_blocked=is_blocked,
-    )
-    db.add(comment)
-    await db.commit()
-    await db.refresh(comment)
+    # One statement inserts the comment and reads back its row together with the
+    # post's auto-reply settings
+    stmt = insert(Comment)
+    if data.parent_id is None:
+        stmt = stmt.values(user_id=user_id, post_id=data.post_id, content=data.content, is_blocked=is_blocked)
+    else:
+        # A reply is only inserted when its parent is on the same post
+        stmt = stmt.from_select(
+            ["user_id", "post_id", "content", "is_blocked", "parent_id"],
+            select(
+                literal(user_id), literal(data.post_id), literal(data.content),
+                literal(is_blocked), literal(data.parent_id),
+            ).where(exists().where(Comment.id == data.parent_id, Comment.post_id == data.post_id)),
+        )
+    new_comment = stmt.returning(*LIST_COLUMNS).cte("new_comment")
+    with stage("create_comment.write"):
+        comment = (await db.execute(
+            select(
+                new_comment,
+                Post.user_id.label("post_user_id"),
+                Post.auto_reply_enabled,
+                Post.reply_delay_sec,
+            ).join(Post, Post.id == new_comment.c.post_id)
+        )).one_or_none()
+        if comment is None:
+            raise HTTPException(status_code=404, detail="Parent comment not found")
+
+        if not is_blocked:
+            await schedule_auto_reply(comment, db)
+        if needs_remoderation(verdict):
+            await schedule_remoderation(db, "comment", [comment.id])
 
-    if not is_blocked:
-        await schedule_auto_reply(comment, db)
+        await db.commit()
 
+    with stage("create_comment.invalidate"):
+        await response_cache.invalidate(post_comments_tag(data.post_id), COMMENT_STATS_TAG)
     return comment
 
-async def get_comments_by_post(post_id: int, db: AsyncSession) -> list[Comment]:
-    result = await db.execute(Comment.__table__.select().where(Comment.post_id == post_id))
-    return result.fetchall()
\ No newline at end of file
+async def create_comments_bulk(user_id: int, items: list[CommentCreate | str], db: AsyncSession) -> dict:
+    """
+    `items` holds parsed comments, or an error message for entries that failed
+    validation. Returns per-item results in input order.
+    """
+    results = [
+        {"index": index, "status": "invalid", "error": item}
+        for index, item in enumerate(items)
+        if isinstance(item, str)
+    ]
+    valid = [(index, item) for index, item in enumerate(items) if not isinstance(item, str)]
+
+    posts = {}
+    if valid:
+        post_ids = {item.post_id for _, item in valid}
+        rows = await db.execute(
+            select(Post.id, Post.user_id, Post.auto_reply_enabled, Post.reply_delay_sec).where(Post.id.in_(post_ids))
+        )
+        posts = {row.id: row for row in rows}
+    missing = [(index, item) for index, item in valid if item.post_id not in posts]
+    valid = [(index, item) for index, item in valid if item.post_id in posts]
+    results += [
+        {"index": index, "status": "post_not_found", "error": f"Post {item.post_id} not found"}
+        for index, item in missing
+    ]
+
+    parent_ids = {item.parent_id for _, item in valid if item.parent_id is not None}
+    if parent_ids:
+        rows = await db.execute(select(Comment.id, Comment.post_id).where(Comment.id.in_(parent_ids)))
+        parent_posts = {row.id: row.post_id for row in rows}
+        orphans = [
+            (index, item) for index, item in valid
+            if item.parent_id is not None and parent_posts.get(item.parent_id) != item.post_id
+        ]
+        orphan_indexes = {index for index, _ in orphans}
+        valid = [(index, item) for index, item in valid if index not in orphan_indexes]
+        results += [
+            {"index": index, "status": "parent_not_found",
+             "error": f"Comment {item.parent_id} not found on post {item.post_id}"}
+            for index, item in orphans
+        ]
+
+    created = []
+    if valid:
+        verdicts = await check_texts([item.content for _, item in valid])
+        # One multi-row INSERT ... RETURNING, rows back in parameter order
+        stmt = insert(Comment).returning(
+            Comment.id, Comment.post_id, Comment.user_id, Comment.is_blocked, sort_by_parameter_order=True
+        )
+        created = (await db.execute(stmt, [
+            {"user_id": user_id, "post_id": item.post_id, "parent_id": item.parent_id,
+             "content": item.content, "is_blocked": resolve_verdict(verdict)}
+            for (_, item), verdict in zip(valid, verdicts)
+        ])).all()
+        await schedule_auto_replies([row for row in created if not row.is_blocked], posts, db)
+        await schedule_remoderation(
+            db, "comment", [row.id for row, verdict in zip(created, verdicts) if needs_remoderation(verdict)]
+        )
+        await db.commit()
+        await response_cache.invalidate(*{post_comments_tag(row.post_id) for row in created}, COMMENT_STATS_TAG)
+
+    results += [
+        {"index": index, "status": "created", "id": row.id, "is_blocked": row.is_blocked}
+        for (index, _), row in zip(valid, created)
+    ]
+    results.sort(key=lambda result: result["index"])
+    return {
+        "created": len(created),
+        "blocked": sum(row.is_blocked for row in created),
+        "failed": len(items) - len(created),
+        "results": results,
+    }
+
+async def get_comments_by_post(
+    post_id: int,
+    db: AsyncSession,
+    limit: int,
+    cursor: Cursor | None = None,
+) -> tuple[list, str | None]:
+    # Oldest first, so a thread reads top to bottom
+    stmt = keyset_page(
+        select(*LIST_COLUMNS).where(Comment.post_id == post_id),
+        Comment.created_at, Comment.id, cursor, limit,
+    )
+    result = await db.execute(stmt)
+    return split_page(result.fetchall(), limit)
+
+# One recursive query loads a page of siblings (a post's top-level comments, or
+# the replies to one comment) and their replies, at most :max_children per node
+# and :max_depth levels. Each level fetches one row past its limit, which only
+# tells whether more replies exist; those rows are not expanded.
+COMMENT_TREE_SQL = """
+WITH RECURSIVE tree AS (
+    SELECT top.*, 1 AS level FROM (
+        SELECT c.id, c.post_id, c.user_id, c.parent_id, c.content, c.is_blocked, c.created_at, c.path,
+               row_number() OVER (ORDER BY c.id) AS position
+        FROM comments c
+        WHERE c.post_id = :post_id AND {siblings} AND c.id > :after_id
+        ORDER BY c.id
+        LIMIT :limit + 1
+    ) top
+    UNION ALL
+    SELECT child.*, tree.level + 1
+    FROM tree CROSS JOIN LATERAL (
+        SELECT c.id, c.post_id, c.user_id, c.parent_id, c.content, c.is_blocked, c.created_at, c.path,
+               row_number() OVER (ORDER BY c.id) AS position
+        FROM comments c
+        WHERE c.parent_id = tree.id
+        ORDER BY c.id
+        LIMIT CASE WHEN tree.level < :max_depth THEN :max_children + 1 ELSE 1 END
+    ) child
+    WHERE tree.level <= :max_depth
+      AND tree.position <= CASE WHEN tree.level = 1 THEN :limit ELSE :max_children END
+)
+SELECT * FROM tree ORDER BY path
+"""
+
+ROOTS_TREE_SQL = text(COMMENT_TREE_SQL.format(siblings="c.parent_id IS NULL"))
+REPLIES_TREE_SQL = text(COMMENT_TREE_SQL.format(siblings="c.parent_id = :parent_id"))
+
+
+def tree_depth(limit: int, max_children: int, max_depth: int) -> int:
+    """`max_depth` reduced until a full tree fits COMMENT_TREE_MAX_NODES."""
+    depth, nodes, level = 1, limit, limit
+    while depth < max_depth:
+        level *= max_children
+        if nodes + level > COMMENT_TREE_MAX_NODES:
+            break
+        nodes += level
+        depth += 1
+    return depth
+
+async def get_comment_tree(
+    post_id: int,
+    db: AsyncSession,
+    limit: int,
+    max_depth: int,
+    max_children: int,
+    parent_id: int | None = None,
+    cursor: IdCursor | None = None,
+) -> tuple[list[dict], str | None]:
+    """
+    A page of `post_id`'s top-level comments, or of the replies to `parent_id`,
+    each with its replies nested. Returns the nodes and the next page's cursor.
+    """
+    stmt = ROOTS_TREE_SQL if parent_id is None else REPLIES_TREE_SQL
+    depth = tree_depth(limit, max_children, max_depth)
+    rows = (await db.execute(stmt, {
+        "post_id": post_id,
+        "parent_id": parent_id,
+        "after_id": cursor or 0,
+        "limit": limit,
+        "max_depth": depth,
+        "max_children": max_children,
+    })).all()
+
+    # Path order puts every parent before its replies
+    top, nodes, next_cursor = [], {}, None
+    for row in rows:
+        if row.level == 1:
+            if row.position > limit:
+                next_cursor = encode_id_cursor(top[-1]["id"])
+                continue
+            siblings = top
+        else:
+            parent = nodes[row.parent_id]
+            if row.level > depth:
+                # Below the depth limit: the replies start from the beginning
+                parent["more_replies"] = True
+                continue
+            if row.position > max_children:
+                parent["more_replies"] = True
+                parent["replies_cursor"] = encode_id_cursor(parent["replies"][-1]["id"])
+                continue
+            siblings = parent["replies"]
+        node = {
+            "id": row.id, "post_id": row.post_id, "user_id": row.user_id, "parent_id": row.parent_id,
+            "content": row.content, "is_blocked": row.is_blocked, "created_at": row.created_at,
+            "depth": len(row.path), "replies": [], "more_replies": False, "replies_cursor": None,
+        }
+        nodes[row.id] = node
+        siblings.append(node)
+    return top, next_cursor
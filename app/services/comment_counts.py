@@ -0,0 +1,78 @@
+# services/comment_counts.py
+# posts.comment_count / blocked_comment_count are kept by triggers on comments.
+# Reconciliation recounts posts in id batches and repairs any that drifted
+# (rows loaded with triggers disabled, manual fixes, posts from before the columns).
+
+from decouple import config
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.jobs import enqueue_job, job_handler
+
+RECONCILE_BATCH_SIZE = config("RECONCILE_BATCH_SIZE", default=1000, cast=int)
+
+RECONCILE_JOB = "reconcile_comment_counts"
+
+# Held until commit: a comment written meanwhile waits for the batch, then its
+# trigger adds to the repaired value instead of being overwritten by it. The
+# trigger locks its posts in the same id order and mode. NO KEY UPDATE leaves
+# the foreign key checks of comment inserts (KEY SHARE) alone.
+LOCK_BATCH_SQL = text("""
+    SELECT id FROM posts
+    WHERE id > :after_id
+    ORDER BY id
+    LIMIT :limit
+    FOR NO KEY UPDATE
+""")
+
+# A separate statement, so its snapshot sees everything committed before the lock was granted
+REPAIR_BATCH_SQL = text("""
+    UPDATE posts p SET comment_count = c.total, blocked_comment_count = c.blocked
+    FROM (
+        SELECT p.id, COUNT(c.id) AS total, COUNT(c.id) FILTER (WHERE c.is_blocked) AS blocked
+        FROM posts p LEFT JOIN comments c ON c.post_id = p.id
+        WHERE p.id = ANY(:ids)
+        GROUP BY p.id
+    ) c
+    WHERE p.id = c.id
+      AND (p.comment_count, p.blocked_comment_count) IS DISTINCT FROM (c.total, c.blocked)
+""")
+
+
+async def reconcile_batch(
+    db: AsyncSession,
+    after_id: int = 0,
+    batch_size: int = RECONCILE_BATCH_SIZE,
+) -> tuple[int | None, int]:
+    """
+    Recount the next `batch_size` posts after `after_id`; the caller commits.
+    Returns (last post id, or None when no posts remain, posts repaired).
+    """
+    ids = (await db.execute(LOCK_BATCH_SQL, {"after_id": after_id, "limit": batch_size})).scalars().all()
+    if not ids:
+        return None, 0
+    result = await db.execute(REPAIR_BATCH_SQL, {"ids": list(ids)})
+    return ids[-1], result.rowcount
+
+
+async def reconcile_comment_counts(db: AsyncSession, batch_size: int = RECONCILE_BATCH_SIZE) -> int:
+    """Reconcile every post, committing per batch. Returns posts repaired."""
+    repaired = 0
+    after_id = 0
+    while True:
+        after_id, fixed = await reconcile_batch(db, after_id, batch_size)
+        await db.commit()
+        if after_id is None:
+            return repaired
+        repaired += fixed
+
+
+@job_handler(RECONCILE_JOB)
+async def run_reconcile(payload: dict, db: AsyncSession):
+    # One batch per job, each committed with the job row; the next batch is its own job
+    batch_size = payload.get("batch_size", RECONCILE_BATCH_SIZE)
+    after_id, fixed = await reconcile_batch(db, payload.get("after_id", 0), batch_size)
+    if fixed:
+        print(f"[RECONCILE] repaired {fixed} post(s) up to id {after_id}")
+    if after_id is not None:
+        await enqueue_job(db, RECONCILE_JOB, {"after_id": after_id, "batch_size": batch_size})
@@ -0,0 +1,155 @@
+# services/comment_stats.py
+# Daily comment counts served from the comment_daily_stats rollup. The comments
+# triggers keep past days current, the close_comment_stats job writes each day
+# once it is over, and the backfill rebuilds the rollup from raw comments.
+
+from datetime import date, datetime, time, timedelta, timezone
+
+from decouple import config
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.comment_daily_stats import CommentDailyStats  # noqa: F401  (registers the table and triggers)
+from app.models.job import Job
+from app.services.jobs import enqueue_job, job_handler
+
+STATS_BACKFILL_CHUNK_DAYS = config("STATS_BACKFILL_CHUNK_DAYS", default=7, cast=int)
+STATS_CLOSE_DAYS = config("STATS_CLOSE_DAYS", default=2, cast=int)
+STATS_CLOSE_INTERVAL_SEC = config("STATS_CLOSE_INTERVAL_SEC", default=3600, cast=int)
+
+STATS_ROLLUP_JOB = "close_comment_stats"
+
+ROLLUP_SQL = text("""
+    SELECT day, total_comments, blocked_comments
+    FROM comment_daily_stats
+    WHERE day BETWEEN :date_from AND :date_to AND total_comments > 0
+    ORDER BY day
+""")
+
+# Range bounds on the raw timestamp, so ix_comments_created_at serves it
+LIVE_DAY_SQL = text("""
+    SELECT COUNT(*) AS total_comments, COUNT(*) FILTER (WHERE is_blocked) AS blocked_comments
+    FROM comments
+    WHERE created_at >= :start AND created_at < :end
+""")
+
+# Counts the range from one snapshot and adds the difference to the stored rows.
+# Only rows that are off get written (and locked); a trigger delta committed
+# meanwhile is already in the row the upsert adds to, so it is not overwritten.
+REBUILD_DAYS_SQL = text("""
+    WITH counted AS (
+        SELECT (created_at AT TIME ZONE 'UTC')::date AS day,
+               COUNT(*) AS total,
+               COUNT(*) FILTER (WHERE is_blocked) AS blocked
+        FROM comments
+        WHERE created_at >= :start AND created_at < :end
+        GROUP BY day
+    ), stored AS (
+        SELECT day, total_comments AS total, blocked_comments AS blocked
+        FROM comment_daily_stats
+        WHERE day >= :date_from AND day < :date_to
+    )
+    INSERT INTO comment_daily_stats AS s (day, total_comments, blocked_comments)
+    SELECT COALESCE(c.day, r.day),
+           COALESCE(c.total, 0) - COALESCE(r.total, 0),
+           COALESCE(c.blocked, 0) - COALESCE(r.blocked, 0)
+    FROM counted c FULL JOIN stored r ON r.day = c.day
+    WHERE (COALESCE(c.total, 0), COALESCE(c.blocked, 0)) <> (COALESCE(r.total, 0), COALESCE(r.blocked, 0))
+    ON CONFLICT (day) DO UPDATE SET
+        total_comments = s.total_comments + EXCLUDED.total_comments,
+        blocked_comments = s.blocked_comments + EXCLUDED.blocked_comments
+""")
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+async def get_daily_breakdown(db: AsyncSession, date_from: date, date_to: date) -> list[dict]:
+    today = _today()
+    result = await db.execute(
+        ROLLUP_SQL, {"date_from": date_from, "date_to": min(date_to, today - timedelta(days=1))}
+    )
+    days = [
+        {"date": str(row.day), "total_comments": row.total_comments, "blocked_comments": row.blocked_comments}
+        for row in result
+    ]
+
+    # Today has no rollup row yet (the triggers skip it), so it is counted live (one day of index)
+    if date_from <= today <= date_to:
+        live = (await db.execute(
+            LIVE_DAY_SQL, {"start": _day_start(today), "end": _day_start(today + timedelta(days=1))}
+        )).one()
+        if live.total_comments:
+            days.append({
+                "date": str(today),
+                "total_comments": live.total_comments,
+                "blocked_comments": live.blocked_comments,
+            })
+    return days
+
+
+async def rebuild_days(db: AsyncSession, date_from: date, date_to: date) -> int:
+    """Correct the rollup for [date_from, date_to]; the caller commits. Returns days corrected."""
+    end = date_to + timedelta(days=1)
+    result = await db.execute(REBUILD_DAYS_SQL, {
+        "start": _day_start(date_from), "end": _day_start(end), "date_from": date_from, "date_to": end,
+    })
+    return result.rowcount
+
+
+async def backfill_comment_daily_stats(
+    db: AsyncSession,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    chunk_days: int = STATS_BACKFILL_CHUNK_DAYS,
+) -> int:
+    """Rebuild the rollup for [date_from, date_to] (default: all history). Returns days corrected."""
+    if date_from is None or date_to is None:
+        bounds = (await db.execute(text(
+            "SELECT MIN(created_at), MAX(created_at) FROM comments"
+        ))).one()
+        await db.commit()
+        if bounds[0] is None:
+            return 0
+        date_from = date_from or bounds[0].astimezone(timezone.utc).date()
+        date_to = date_to or bounds[1].astimezone(timezone.utc).date()
+    # The current day has no row until close_comment_stats writes it
+    date_to = min(date_to, _today() - timedelta(days=1))
+
+    written = 0
+    day = date_from
+    while day <= date_to:
+        last = min(day + timedelta(days=chunk_days - 1), date_to)
+        written += await rebuild_days(db, day, last)
+        await db.commit()
+        day = last + timedelta(days=1)
+    return written
+
+
+async def schedule_stats_rollup(db: AsyncSession) -> None:
+    """Enqueue close_comment_stats unless one is already queued; commits."""
+    # Serializes processes starting together, so only one of them enqueues
+    await db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:kind))"), {"kind": STATS_ROLLUP_JOB})
+    queued = (await db.execute(
+        select(Job.id).where(Job.kind == STATS_ROLLUP_JOB, Job.status.in_(("pending", "running"))).limit(1)
+    )).first()
+    if queued is None:
+        await enqueue_job(db, STATS_ROLLUP_JOB, {})
+    await db.commit()
+
+
+@job_handler(STATS_ROLLUP_JOB)
+async def run_stats_rollup(payload: dict, db: AsyncSession):
+    # The triggers skip the current day, so a day gets its row here once it is over.
+    # The last STATS_CLOSE_DAYS days are recounted each time, which also picks up
+    # comments from transactions that were still open at midnight.
+    yesterday = _today() - timedelta(days=1)
+    fixed = await rebuild_days(db, yesterday - timedelta(days=STATS_CLOSE_DAYS - 1), yesterday)
+    if fixed:
+        print(f"[STATS ROLLUP] wrote {fixed} day(s) up to {yesterday}")
+    await enqueue_job(db, STATS_ROLLUP_JOB, {}, delay_sec=STATS_CLOSE_INTERVAL_SEC)
@@ -0,0 +1,90 @@
+# services/export.py
+# Streaming exports of posts and comments. Rows come from a server-side cursor
+# in batches of EXPORT_BATCH_SIZE and are written out batch by batch, so memory
+# stays flat however many rows match.
+
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from typing import AsyncIterator
+
+from decouple import config
+from sqlalchemy import Select, select
+
+from app.core.replicas import read_session
+from app.models.comment import Comment
+from app.models.post import Post
+
+EXPORT_BATCH_SIZE = config("EXPORT_BATCH_SIZE", default=1000, cast=int)
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+POST_COLUMNS = [Post.id, Post.user_id, Post.content, Post.is_blocked, Post.auto_reply_enabled,
+                Post.reply_delay_sec, Post.created_at, Post.comment_count, Post.blocked_comment_count]
+COMMENT_COLUMNS = [Comment.id, Comment.post_id, Comment.user_id, Comment.parent_id, Comment.content,
+                   Comment.is_blocked, Comment.created_at]
+
+
+def _date_range(stmt: Select, column, date_from: date | None, date_to: date | None) -> Select:
+    # UTC days, both ends inclusive, as in the analytics endpoints
+    if date_from is not None:
+        stmt = stmt.where(column >= datetime.combine(date_from, time.min, tzinfo=timezone.utc))
+    if date_to is not None:
+        stmt = stmt.where(column < datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=timezone.utc))
+    return stmt
+
+
+def posts_query(user_id: int | None = None, date_from: date | None = None, date_to: date | None = None) -> Select:
+    stmt = select(*POST_COLUMNS)
+    if user_id is not None:
+        stmt = stmt.where(Post.user_id == user_id)
+    return _date_range(stmt, Post.created_at, date_from, date_to).order_by(Post.id)
+
+
+def comments_query(
+    user_id: int | None = None,
+    post_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> Select:
+    stmt = select(*COMMENT_COLUMNS)
+    if user_id is not None:
+        stmt = stmt.where(Comment.user_id == user_id)
+    if post_id is not None:
+        stmt = stmt.where(Comment.post_id == post_id)
+    return _date_range(stmt, Comment.created_at, date_from, date_to).order_by(Comment.id)
+
+
+def _ndjson_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def stream_rows(stmt: Select, fmt: str, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """
+    Encoded chunks of `stmt`'s rows, one chunk per fetched batch. Opens its own
+    read session: a request's dependency session is closed before a streaming
+    body is sent.
+    """
+    columns = [column.key for column in stmt.selected_columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(columns)
+
+    async with read_session() as db:
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            if fmt == "csv":
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    buffer.write(json.dumps(dict(zip(columns, map(_ndjson_value, row)))))
+                    buffer.write("\n")
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    # Header only, when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -0,0 +1,187 @@
+# services/feed.py
+# Home feed: the visible posts of the users someone follows, newest first.
+# Built on read by a k-way merge over each followee's ix_posts_feed index and
+# kept warm in app.core.feeds.
+
+import heapq
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from decouple import config
+from fastapi import HTTPException
+from sqlalchemy import delete, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.feeds import FeedKey, FeedWindow, feed_cache
+from app.models.follow import Follow
+from app.models.post import Post
+from app.models.user import User
+from app.services.post import LIST_COLUMNS
+from app.utils.pagination import Cursor, encode_cursor
+
+# Posts read per followee in the first merge round; a followee whose run is used
+# up is read again with twice as many
+FEED_MERGE_CHUNK = config("FEED_MERGE_CHUNK", default=2, cast=int)
+
+# One round of the merge: the next `n` visible posts of each author older than
+# their own cursor, each an index-only scan of ix_posts_feed
+AUTHOR_RUNS_SQL = text("""
+    SELECT a.user_id, p.created_at, p.id
+    FROM unnest(
+        CAST(:authors AS int[]), CAST(:created_before AS timestamptz[]),
+        CAST(:id_before AS int[]), CAST(:counts AS int[])
+    ) AS a(user_id, created_at, id, n)
+    CROSS JOIN LATERAL (
+        SELECT p.created_at, p.id
+        FROM posts p
+        WHERE p.user_id = a.user_id AND p.is_blocked IS NOT TRUE
+          AND (p.created_at, p.id) < (a.created_at, a.id)
+        ORDER BY p.created_at DESC, p.id DESC
+        LIMIT a.n
+    ) p
+""")
+
+# Stands in for "no cursor"; newer than any post
+_END_OF_TIME: FeedKey = (datetime(9999, 1, 1, tzinfo=timezone.utc), 2**31 - 1)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _newest_first(key: FeedKey) -> tuple[int, int]:
+    # heapq pops the smallest entry; exact integer microseconds, no float rounding
+    return -((key[0] - _EPOCH) // timedelta(microseconds=1)), -key[1]
+
+
+async def _author_runs(db: AsyncSession, cursors: dict[int, FeedKey], counts: dict[int, int]) -> dict[int, list]:
+    authors = list(cursors)
+    rows = await db.execute(AUTHOR_RUNS_SQL, {
+        "authors": authors,
+        "created_before": [cursors[author][0] for author in authors],
+        "id_before": [cursors[author][1] for author in authors],
+        "counts": [counts[author] for author in authors],
+    })
+    runs: dict[int, list] = {}
+    for author, created_at, post_id in rows.tuples():
+        runs.setdefault(author, []).append((created_at, post_id))
+    for run in runs.values():
+        run.sort(reverse=True)
+    return runs
+
+
+async def merge_feed(
+    db: AsyncSession,
+    authors,
+    count: int,
+    before: FeedKey | None = None,
+) -> tuple[list[FeedKey], bool]:
+    """
+    The newest `count` keys of the authors' visible posts older than `before`,
+    newest first, and whether their posts ran out. Every author is read once with
+    a small run; later rounds read only the authors whose run the merge used up.
+    """
+    authors = list(authors)
+    if not authors or count <= 0:
+        return [], True
+    cursors = {author: before or _END_OF_TIME for author in authors}
+    counts = dict.fromkeys(authors, min(count, max(FEED_MERGE_CHUNK, -(-count // len(authors)))))
+    buffers: dict[int, deque] = {}
+    heap: list = []
+    refill = authors
+    keys: list[FeedKey] = []
+    while len(keys) < count:
+        if refill:
+            runs = await _author_runs(db, {author: cursors[author] for author in refill}, counts)
+            for author in refill:
+                run = runs.get(author, [])
+                if len(run) < counts[author]:
+                    # Nothing older left for this author
+                    counts[author] = 0
+                else:
+                    counts[author] = min(counts[author] * 2, count)
+                if run:
+                    buffers[author] = deque(run)
+                    heapq.heappush(heap, (_newest_first(run[0]), author))
+            refill = []
+        if not heap:
+            break
+        _, author = heapq.heappop(heap)
+        key = buffers[author].popleft()
+        keys.append(key)
+        cursors[author] = key
+        if buffers[author]:
+            heapq.heappush(heap, (_newest_first(buffers[author][0]), author))
+        elif counts[author]:
+            # This author may have older posts than the rest: read on before the next pop
+            refill = [author]
+    return keys, not heap and not refill
+
+
+async def feed_window(user_id: int, db: AsyncSession) -> FeedWindow:
+    window = feed_cache.get(user_id)
+    if window is None:
+        followees = (await db.execute(
+            select(Follow.followee_id).where(Follow.follower_id == user_id)
+        )).scalars().all()
+        keys, complete = await merge_feed(db, followees, feed_cache.size)
+        window = FeedWindow(frozenset(followees), keys[::-1], complete)
+        feed_cache.set(user_id, window)
+    return window
+
+
+async def get_feed(
+    user_id: int,
+    db: AsyncSession,
+    limit: int,
+    cursor: Cursor | None = None,
+) -> tuple[list, str | None]:
+    window = await feed_window(user_id, db)
+    # One extra key tells whether another page exists
+    keys = window.page(cursor, limit + 1)
+    if len(keys) <= limit and not window.complete:
+        # Past the cached window: merge straight from the followees' indexes
+        older, _ = await merge_feed(db, window.followees, limit + 1 - len(keys), keys[-1] if keys else cursor)
+        keys += older
+
+    next_cursor = None
+    if len(keys) > limit:
+        keys = keys[:limit]
+        next_cursor = encode_cursor(*keys[-1])
+    if not keys:
+        return [], next_cursor
+
+    rows = await db.execute(
+        select(*LIST_COLUMNS).where(Post.id.in_([key[1] for key in keys]), Post.is_blocked.isnot(True))
+    )
+    by_id = {row.id: row for row in rows}
+    # A cached key can outlive its post (deleted, or blocked on edit)
+    return [by_id[post_id] for _, post_id in keys if post_id in by_id], next_cursor
+
+
+async def follow_user(user_id: int, followee_id: int, db: AsyncSession) -> None:
+    if followee_id == user_id:
+        raise HTTPException(status_code=400, detail="You cannot follow yourself")
+    result = await db.execute(
+        insert(Follow)
+        .from_select(["follower_id", "followee_id"], select(literal(user_id), User.id).where(User.id == followee_id))
+        .on_conflict_do_nothing()
+        .returning(Follow.followee_id)
+    )
+    if result.scalar_one_or_none() is None:
+        # Already followed, or no such user
+        if (await db.execute(select(User.id).where(User.id == followee_id))).scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return
+    await db.commit()
+    feed_cache.drop(user_id)
+
+
+async def unfollow_user(user_id: int, followee_id: int, db: AsyncSession) -> None:
+    result = await db.execute(
+        delete(Follow)
+        .where(Follow.follower_id == user_id, Follow.followee_id == followee_id)
+        .returning(Follow.followee_id)
+    )
+    if result.scalar_one_or_none() is None:
+        return
+    await db.commit()
+    feed_cache.drop(user_id)
@@ -0,0 +1,236 @@
+# services/jobs.py
+# Postgres-backed job queue: rows in `jobs` are claimed with FOR UPDATE SKIP LOCKED,
+# so any number of in-process or standalone workers can share the table.
+
+import asyncio
+import random
+import traceback
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+from decouple import config
+from sqlalchemy import insert, select, update, func, and_, any_, literal, literal_column, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.models.job import Job
+
+JOB_MAX_ATTEMPTS = config("JOB_MAX_ATTEMPTS", default=5, cast=int)
+JOB_BACKOFF_BASE_SEC = config("JOB_BACKOFF_BASE_SEC", default=2.0, cast=float)
+JOB_BACKOFF_MAX_SEC = config("JOB_BACKOFF_MAX_SEC", default=300.0, cast=float)
+JOB_WORKER_CONCURRENCY = config("JOB_WORKER_CONCURRENCY", default=4, cast=int)
+JOB_POLL_INTERVAL_SEC = config("JOB_POLL_INTERVAL_SEC", default=1.0, cast=float)
+JOB_VISIBILITY_TIMEOUT_SEC = config("JOB_VISIBILITY_TIMEOUT_SEC", default=300.0, cast=float)
+
+# Status filters are inlined as literals: with a bound parameter a generic (cached)
+# plan cannot prove the partial indexes' predicates and falls back to scanning
+PENDING = literal_column("'pending'")
+RUNNING = literal_column("'running'")
+
+JobHandler = Callable[[dict, AsyncSession], Awaitable[None]]
+
+JOB_HANDLERS: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str):
+    def register(func: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+def on_commit(db: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Called from a handler: run `callback` once run_job has committed the handler's writes."""
+    db.info.setdefault("on_commit", []).append(callback)
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    kind: str,
+    payload: dict,
+    delay_sec: float = 0,
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+) -> Job:
+    # No commit here: the job becomes visible together with the caller's transaction
+    job = Job(
+        kind=kind,
+        payload=payload,
+        run_at=func.now() + timedelta(seconds=delay_sec),
+        max_attempts=max_attempts,
+    )
+    db.add(job)
+    return job
+
+
+async def enqueue_jobs(
+    db: AsyncSession,
+    kind: str,
+    payloads: list[tuple[dict, float]],
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+) -> None:
+    """(payload, delay_sec) pairs, written with one multi-row INSERT; no commit, like enqueue_job."""
+    if not payloads:
+        return
+    await db.execute(insert(Job).values([
+        {
+            "kind": kind,
+            "payload": payload,
+            "run_at": func.now() + timedelta(seconds=delay_sec),
+            "max_attempts": max_attempts,
+        }
+        for payload, delay_sec in payloads
+    ]))
+
+
+def backoff_delay(attempts: int) -> float:
+    delay = min(JOB_BACKOFF_MAX_SEC, JOB_BACKOFF_BASE_SEC * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+async def claim_jobs(db: AsyncSession, limit: int) -> list[Job]:
+    due = (
+        select(Job.id)
+        .where(Job.status == PENDING, Job.run_at <= func.now())
+        .order_by(Job.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    # id = ANY(ARRAY(...)) locks the due rows once, then hits the primary key per id
+    stmt = (
+        update(Job)
+        .where(Job.id == any_(func.array(due)))
+        .values(status="running", locked_at=func.now(), attempts=Job.attempts + 1)
+        .returning(Job)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    jobs = list(result.scalars().all())
+    await db.commit()
+    return jobs
+
+
+async def requeue_stale_jobs(db: AsyncSession) -> int:
+    # Jobs whose worker died mid-run go back to the queue after the visibility timeout
+    stmt = (
+        update(Job)
+        .where(
+            and_(
+                Job.status == RUNNING,
+                Job.locked_at < func.now() - timedelta(seconds=JOB_VISIBILITY_TIMEOUT_SEC),
+            )
+        )
+        .values(status="pending", locked_at=None, run_at=func.now())
+    )
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount
+
+
+async def queue_depth(db: AsyncSession) -> list:
+    """Pending and running jobs per kind; overdue_sec is how long the oldest due pending job has waited."""
+    overdue = func.extract("epoch", func.now() - func.min(Job.run_at).filter(Job.run_at <= func.now()))
+    pending = (
+        select(Job.kind, PENDING.label("status"), func.count().label("jobs"), func.coalesce(overdue, 0).label("overdue_sec"))
+        .where(Job.status == PENDING)
+        .group_by(Job.kind)
+    )
+    running = (
+        select(Job.kind, RUNNING, func.count(), literal(0))
+        .where(Job.status == RUNNING)
+        .group_by(Job.kind)
+    )
+    return (await db.execute(union_all(pending, running))).all()
+
+
+async def run_job(job: Job) -> None:
+    handler = JOB_HANDLERS.get(job.kind)
+    async with AsyncSessionLocal() as db:
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind {job.kind!r}")
+            await handler(job.payload, db)
+            # The handler's writes and the job completion commit together
+            await db.execute(
+                update(Job).where(Job.id == job.id).values(status="done", locked_at=None, last_error=None)
+            )
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            print("[JOB ERROR]", job.kind, job.id, e)
+            if job.attempts >= job.max_attempts:
+                values = {"status": "failed", "locked_at": None}
+            else:
+                values = {
+                    "status": "pending",
+                    "locked_at": None,
+                    "run_at": func.now() + timedelta(seconds=backoff_delay(job.attempts)),
+                }
+            values["last_error"] = "".join(traceback.format_exception_only(type(e), e)).strip()
+            await db.execute(update(Job).where(Job.id == job.id).values(**values))
+            await db.commit()
+            return
+
+        for callback in db.info.pop("on_commit", []):
+            try:
+                await callback()
+            except Exception as e:
+                print("[JOB ON_COMMIT ERROR]", job.kind, job.id, e)
+
+
+class JobWorker:
+    """Polls the jobs table and runs up to `concurrency` jobs at a time, each in its own session."""
+
+    def __init__(
+        self,
+        concurrency: int = JOB_WORKER_CONCURRENCY,
+        poll_interval: float = JOB_POLL_INTERVAL_SEC,
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._running: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self._loop_task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._loop_task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._loop_task is not None:
+            await self._loop_task
+            self._loop_task = None
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def run_once(self) -> int:
+        free = self.concurrency - len(self._running)
+        if free <= 0:
+            return 0
+        async with AsyncSessionLocal() as db:
+            jobs = await claim_jobs(db, free)
+        for job in jobs:
+            task = asyncio.create_task(run_job(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+        return len(jobs)
+
+    async def run_forever(self) -> None:
+        polls = 0
+        while not self._stopping.is_set():
+            try:
+                if polls % 60 == 0:
+                    async with AsyncSessionLocal() as db:
+                        await requeue_stale_jobs(db)
+                polls += 1
+                claimed = await self.run_once()
+            except Exception as e:
+                print("[JOB WORKER ERROR]", e)
+                claimed = 0
+            if claimed:
+                continue
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,126 @@
+# services/moderation_cache.py
+# Verdict cache keyed by a hash of the normalized text: an in-process LRU with TTL,
+# optionally backed by the shared `moderation_verdicts` table so all workers reuse verdicts.
+
+import asyncio
+import hashlib
+import unicodedata
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.db import AsyncSessionLocal
+from app.models.moderation_verdict import ModerationVerdict
+from app.utils.lru import LRUTTLCache
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class VerdictCache:
+    """
+    Two-tier verdict cache. Concurrent lookups of the same text share one
+    computation, so a burst of identical comments costs a single model call.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 86_400.0, shared: bool = False):
+        self.local = LRUTTLCache(maxsize, ttl)
+        self.ttl = ttl
+        self.shared = shared
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits_local = 0
+        self.hits_shared = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.shared_errors = 0
+
+    async def _get_shared(self, key: str) -> bool | None:
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(ModerationVerdict.is_toxic).where(
+                        ModerationVerdict.text_hash == key,
+                        ModerationVerdict.expires_at > func.now(),
+                    )
+                )
+                return result.scalar_one_or_none()
+        except Exception as e:
+            self.shared_errors += 1
+            print("[MODERATION CACHE ERROR]", e)
+            return None
+
+    async def _set_shared(self, key: str, verdict: bool) -> None:
+        expires_at = func.now() + timedelta(seconds=self.ttl)
+        stmt = insert(ModerationVerdict).values(text_hash=key, is_toxic=verdict, expires_at=expires_at)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ModerationVerdict.text_hash],
+            set_={"is_toxic": stmt.excluded.is_toxic, "expires_at": stmt.excluded.expires_at},
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            self.shared_errors += 1
+            print("[MODERATION CACHE ERROR]", e)
+
+    async def get_or_compute(self, text: str, compute: Callable[[str], Awaitable[bool | None]]) -> bool | None:
+        key = text_key(text)
+
+        verdict = self.local.get(key)
+        if verdict is not None:
+            self.hits_local += 1
+            return verdict
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            verdict = await self._get_shared(key) if self.shared else None
+            if verdict is not None:
+                self.hits_shared += 1
+            else:
+                self.misses += 1
+                verdict = await compute(text)
+                # None means "no verdict" (model error/timeout) and is never cached
+                if verdict is not None and self.shared:
+                    await self._set_shared(key, verdict)
+            if verdict is not None:
+                self.local.set(key, verdict)
+            future.set_result(verdict)
+            return verdict
+        except Exception as e:
+            future.set_exception(e)
+            # Keep "exception was never retrieved" quiet when nobody else was waiting
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits_local + self.hits_shared + self.misses
+        return {
+            "size": len(self.local),
+            "hits_local": self.hits_local,
+            "hits_shared": self.hits_shared,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.local.evictions,
+            "shared_errors": self.shared_errors,
+            "hit_ratio": round((self.hits_local + self.hits_shared) / lookups, 4) if lookups else 0.0,
+        }
+
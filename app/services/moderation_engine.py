@@ -0,0 +1,426 @@
+# services/moderation_engine.py
+
+import asyncio
+import functools
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from google.genai.types import GenerateContentConfig
+
+from app.core.metrics import MODERATION_CALL_SECONDS
+
+TOXICITY_PROMPT = (
+    "Determine if the following text is offensive, toxic, or inappropriate. "
+    "Answer only 'YES' or 'NO'.\n\n"
+    "Text: {text}"
+)
+
+BATCH_TOXICITY_PROMPT = (
+    "Determine for each numbered text below whether it is offensive, toxic, or inappropriate. "
+    "Answer with exactly one line per text in the form '<number>: YES' or '<number>: NO'.\n\n"
+    "{items}"
+)
+
+REPLY_PROMPT = (
+    "Generate a short, relevant reply in English to this comment, considering the post content. "
+    "The reply should be simple, sincere, and informal. "
+    "No unnecessary explanations, no introductions, no quotes, no formatting. "
+    "Write only the reply — one to two sentences maximum.\n\n"
+    "Post: {post}\n"
+    "Comment: {comment}"
+)
+
+FALLBACK_REPLY = "Thank you for your comment!"
+
+_BATCH_ANSWER_RE = re.compile(r"^\s*(\d+)\s*[:.)-]\s*(YES|NO)\b", re.IGNORECASE | re.MULTILINE)
+_BATCH_ITEM_RE = re.compile(r"^(\d+)\. (.*)$", re.MULTILINE)
+
+
+def _one_line(text: str) -> str:
+    # Batch prompts are line-oriented, so every text has to fit on one line
+    return " ".join(text.split())
+
+
+def build_batch_prompt(texts: list[str]) -> str:
+    items = "\n".join(f"{i}. {_one_line(text)}" for i, text in enumerate(texts, start=1))
+    return BATCH_TOXICITY_PROMPT.format(items=items)
+
+
+def parse_batch_answer(answer: str, size: int) -> list[bool | None]:
+    verdicts: list[bool | None] = [None] * size
+    for match in _BATCH_ANSWER_RE.finditer(answer):
+        index = int(match.group(1)) - 1
+        if 0 <= index < size:
+            verdicts[index] = match.group(2).lower() == "yes"
+    return verdicts
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+class ModerationBackend:
+    """Sends one prompt to a language model and returns the stripped answer text."""
+
+    name = "base"
+
+    async def generate(self, prompt: str, temperature: float, max_output_tokens: int) -> str:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        return None
+
+
+class GeminiAsyncBackend(ModerationBackend):
+    """Uses the native async genai client (`client.aio`), nothing touches the event loop thread."""
+
+    name = "async"
+
+    def __init__(self, client, model: str):
+        self.client = client
+        self.model = model
+
+    async def generate(self, prompt: str, temperature: float, max_output_tokens: int) -> str:
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=GenerateContentConfig(
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+            ),
+        )
+        return (response.text or "").strip()
+
+
+class GeminiThreadPoolBackend(ModerationBackend):
+    """Runs the blocking genai client in a bounded thread pool."""
+
+    name = "threads"
+
+    def __init__(self, client, model: str, max_workers: int = 8):
+        self.client = client
+        self.model = model
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="moderation")
+
+    def _generate_sync(self, prompt: str, temperature: float, max_output_tokens: int) -> str:
+        response = self.client.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=GenerateContentConfig(
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+            ),
+        )
+        return (response.text or "").strip()
+
+    async def generate(self, prompt: str, temperature: float, max_output_tokens: int) -> str:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self._generate_sync, prompt, temperature, max_output_tokens)
+        return await loop.run_in_executor(self.executor, call)
+
+    async def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class FakeBackend(ModerationBackend):
+    """
+    Offline stand-in for Gemini, used by tests and benchmarks.
+    Marks a text toxic when it contains one of `toxic_words`, after a simulated latency.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 0.0,
+        toxic_words: tuple[str, ...] = ("toxic",),
+        reply: str = "Thanks for sharing!",
+        error_rate: float = 0.0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.toxic_words = tuple(word.lower() for word in toxic_words)
+        self.reply = reply
+        self.error_rate = error_rate
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _is_toxic(self, text: str) -> bool:
+        lowered = text.lower()
+        return any(word in lowered for word in self.toxic_words)
+
+    def _answer(self, prompt: str) -> str:
+        if prompt.startswith(BATCH_TOXICITY_PROMPT.split("{", 1)[0]):
+            return "\n".join(
+                f"{number}: {'YES' if self._is_toxic(text) else 'NO'}"
+                for number, text in _BATCH_ITEM_RE.findall(prompt)
+            )
+        if "\nText: " in prompt:
+            return "YES" if self._is_toxic(prompt.split("\nText: ", 1)[1]) else "NO"
+        return self.reply
+
+    async def generate(self, prompt: str, temperature: float, max_output_tokens: int) -> str:
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+            await asyncio.sleep(delay / 1000)
+            if self.error_rate and random.random() < self.error_rate:
+                raise RuntimeError("fake backend error")
+            return self._answer(prompt)
+        finally:
+            self.in_flight -= 1
+
+
+# -----------------------------
+# Circuit breaker
+# -----------------------------
+class CircuitOpenError(Exception):
+    """The model is not being called: the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    closed: calls go through; `failure_threshold` failures in a row (errors and
+    timeouts) open the breaker. open: calls fail at once for `reset_timeout`
+    seconds. half_open: one probe call goes through while the others keep
+    failing fast; its success closes the breaker, its failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self.failures = 0
+        self.trips = 0
+        self.short_circuits = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED or (state == self.HALF_OPEN and not self._probing):
+            self._probing = state == self.HALF_OPEN
+            return True
+        self.short_circuits += 1
+        return False
+
+    def record_success(self) -> None:
+        if self._state != self.CLOSED:
+            print("[AI CIRCUIT CLOSED]")
+        self._state = self.CLOSED
+        self._probing = False
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.trips += 1
+                print("[AI CIRCUIT OPEN]", self.failures, "failures")
+            self._state = self.OPEN
+            self._opened_at = self.clock()
+        self._probing = False
+
+    def release(self) -> None:
+        # A probe that ended without an outcome (cancelled): let the next call probe
+        self._probing = False
+
+    def stats(self) -> dict:
+        state = self.state
+        return {
+            "state": state,
+            "open": int(state == self.OPEN),
+            "half_open": int(state == self.HALF_OPEN),
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "short_circuits": self.short_circuits,
+        }
+
+
+# -----------------------------
+# Engine
+# -----------------------------
+class ModerationEngine:
+    """
+    Async front door to the model: bounds concurrent calls with a semaphore,
+    applies a per-call timeout, fails fast while `breaker` is open and
+    optionally micro-batches toxicity checks
+    (texts queued within `batch_window_ms` share one prompt, up to `max_batch_size`;
+    bulk imports always batch, up to `bulk_batch_size`).
+    `check` returns None when the model gave no usable verdict (error, timeout,
+    open breaker, unparseable answer); `is_toxic` fails open on that, like the
+    original synchronous implementation.
+    """
+
+    def __init__(
+        self,
+        backend: ModerationBackend,
+        max_concurrency: int = 8,
+        timeout: float = 10.0,
+        max_batch_size: int = 1,
+        batch_window_ms: float = 20.0,
+        bulk_batch_size: int = 20,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.backend = backend
+        self.breaker = breaker or CircuitBreaker()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_batch_size = max(1, max_batch_size)
+        self.batch_window_ms = batch_window_ms
+        self.bulk_batch_size = max(self.max_batch_size, bulk_batch_size)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        # Primitives are per event loop; tests and CLI tools may run several loops in turn
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._pending = []
+            self._flush_handle = None
+            self._tasks = set()
+        return loop
+
+    async def _call(self, prompt: str, temperature: float, max_output_tokens: int, call: str) -> str:
+        self._bind_loop()
+        # Checked before the semaphore: while the model is down, calls cost no wait at all
+        if not self.breaker.allow():
+            raise CircuitOpenError(call)
+        async with self._semaphore:
+            # Timed inside the semaphore: the model's latency, not the wait for a slot
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                content = await asyncio.wait_for(
+                    self.backend.generate(prompt, temperature, max_output_tokens),
+                    timeout=self.timeout,
+                )
+                outcome = "ok"
+                return content
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                raise
+            except asyncio.CancelledError:
+                # The caller went away: no news about the model
+                outcome = "cancelled"
+                raise
+            finally:
+                MODERATION_CALL_SECONDS.labels(call, outcome).observe(time.perf_counter() - started)
+                if outcome == "ok":
+                    self.breaker.record_success()
+                elif outcome == "cancelled":
+                    self.breaker.release()
+                else:
+                    self.breaker.record_failure()
+
+    async def is_toxic(self, text: str) -> bool:
+        return bool(await self.check(text))
+
+    async def check(self, text: str, bulk: bool = False) -> bool | None:
+        batch_size = self.bulk_batch_size if bulk else self.max_batch_size
+        if batch_size == 1:
+            return await self._check_single(text)
+
+        loop = self._bind_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= batch_size:
+            self._flush(batch_size)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window_ms / 1000, self._flush, batch_size)
+        return await future
+
+    async def _check_single(self, text: str) -> bool | None:
+        try:
+            content = await self._call(TOXICITY_PROMPT.format(text=text), 0.2, 20, "check")
+            print("[AI TOXICITY RESPONSE]", content)
+            return "yes" in content.lower()
+        except CircuitOpenError:
+            return None
+        except asyncio.TimeoutError:
+            print("[AI MODERATION TIMEOUT]", self.timeout)
+            return None
+        except Exception as e:
+            print("[AI MODERATION ERROR]", e)
+            return None
+
+    def _flush(self, batch_size: int) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending[:batch_size], self._pending[batch_size:]
+        if self._pending:
+            self._flush_handle = self._loop.call_later(self.batch_window_ms / 1000, self._flush, batch_size)
+        if not batch:
+            return
+        task = self._loop.create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in batch]
+        if len(texts) == 1:
+            verdicts: list[bool | None] = [await self._check_single(texts[0])]
+        else:
+            try:
+                # ~4 output tokens per "<n>: YES" line
+                content = await self._call(build_batch_prompt(texts), 0.2, 8 * len(texts) + 10, "batch")
+                print("[AI BATCH TOXICITY RESPONSE]", content.replace("\n", " | "))
+                verdicts = parse_batch_answer(content, len(texts))
+            except CircuitOpenError:
+                verdicts = [None] * len(texts)
+            except asyncio.TimeoutError:
+                print("[AI MODERATION TIMEOUT]", self.timeout)
+                verdicts = [None] * len(texts)
+            except Exception as e:
+                print("[AI MODERATION ERROR]", e)
+                verdicts = [None] * len(texts)
+
+        for (_, future), verdict in zip(batch, verdicts):
+            if not future.done():
+                future.set_result(verdict)
+
+    async def generate_reply(self, post_text: str, comment_text: str, fallback: str | None = FALLBACK_REPLY) -> str:
+        """The model's reply, or `fallback` when there is none; with `fallback=None` the failure is raised."""
+        try:
+            reply = await self._call(REPLY_PROMPT.format(post=post_text, comment=comment_text), 0.4, 50, "reply")
+            print("[AI REPLY GENERATED]", reply)
+            return reply or FALLBACK_REPLY
+        except CircuitOpenError:
+            if fallback is None:
+                raise
+            return fallback
+        except asyncio.TimeoutError:
+            print("[AI REPLY TIMEOUT]", self.timeout)
+            if fallback is None:
+                raise
+            return fallback
+        except Exception as e:
+            print("[AI REPLY ERROR]", e)
+            if fallback is None:
+                raise
+            return fallback
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await self.backend.close()
@@ -1,29 +1,53 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import COMMENT_STATS_TAG, post_comments_tag, response_cache
+from app.core.feeds import feed_cache
 from app.models.post import Post
 from app.schemas.post import PostCreate
-from app.services.ai_moderation import is_text_toxic
-from sqlalchemy import select
+from app.services.ai_moderation import check_text, needs_remoderation, resolve_verdict
+from app.services.remoderation import schedule_remoderation
+from app.utils.pagination import Cursor, keyset_page, split_page
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.exc import NoResultFound
 from fastapi import HTTPException
 
+# Listing columns: the search vector stays in the database
+LIST_COLUMNS = [column for column in Post.__table__.c if column.key != "search_vector"]
+
 async def create_post(user_id: int, data: PostCreate, db: AsyncSession):
-    is_blocked = is_text_toxic(data.content)
+    verdict = await check_text(data.content)
+    is_blocked = resolve_verdict(verdict)
 
-    post = Post(
-        user_id=user_id,
-        content=data.content,
-        is_blocked=is_blocked,
-        auto_reply_enabled=data.auto_reply_enabled,
-        reply_delay_sec=data.reply_delay_sec,
+    # RETURNING brings back the server defaults, so no refresh SELECT follows
+    result = await db.execute(
+        insert(Post).values(
+            user_id=user_id,
+            content=data.content,
+            is_blocked=is_blocked,
+            auto_reply_enabled=data.auto_reply_enabled,
+            reply_delay_sec=data.reply_delay_sec,
+        ).returning(*LIST_COLUMNS)
     )
-    db.add(post)
+    post = result.one()
+    if needs_remoderation(verdict):
+        await schedule_remoderation(db, "post", [post.id])
     await db.commit()
-    await db.refresh(post)
+    if not post.is_blocked:
+        feed_cache.publish(user_id, post.created_at, post.id)
     return post
 
-async def get_posts_by_user(user_id: int, db: AsyncSession) -> list[Post]:
-    result = await db.execute(Post.__table__.select().where(Post.user_id == user_id))
-    return result.fetchall()
+async def get_posts_by_user(
+    user_id: int,
+    db: AsyncSession,
+    limit: int,
+    cursor: Cursor | None = None,
+) -> tuple[list, str | None]:
+    # Newest first
+    stmt = keyset_page(
+        select(*LIST_COLUMNS).where(Post.user_id == user_id),
+        Post.created_at, Post.id, cursor, limit, descending=True,
+    )
+    result = await db.execute(stmt)
+    return split_page(result.fetchall(), limit)
 
 async def get_post(post_id: int, user_id: int, db: AsyncSession) -> Post:
     result = await db.execute(select(Post).where(Post.id == post_id, Post.user_id == user_id))
@@ -33,16 +57,35 @@ async def get_post(post_id: int, user_id: int, db: AsyncSession) -> Post:
     return post
 
 async def update_post(post_id: int, user_id: int, data: PostCreate, db: AsyncSession):
-    post = await get_post(post_id, user_id, db)
-    post.content = data.content
-    post.auto_reply_enabled = data.auto_reply_enabled
-    post.reply_delay_sec = data.reply_delay_sec
-    post.is_blocked = is_text_toxic(data.content)
+    verdict = await check_text(data.content)
+    is_blocked = resolve_verdict(verdict)
+    # Ownership check, write and read-back in one statement
+    result = await db.execute(
+        update(Post)
+        .where(Post.id == post_id, Post.user_id == user_id)
+        .values(
+            content=data.content,
+            is_blocked=is_blocked,
+            auto_reply_enabled=data.auto_reply_enabled,
+            reply_delay_sec=data.reply_delay_sec,
+        )
+        .returning(*LIST_COLUMNS)
+    )
+    post = result.one_or_none()
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if needs_remoderation(verdict):
+        await schedule_remoderation(db, "post", [post.id])
     await db.commit()
-    await db.refresh(post)
+    await response_cache.invalidate(post_comments_tag(post_id))
     return post
 
 async def delete_post(post_id: int, user_id: int, db: AsyncSession):
-    post = await get_post(post_id, user_id, db)
-    await db.delete(post)
-    await db.commit()
\ No newline at end of file
+    result = await db.execute(
+        delete(Post).where(Post.id == post_id, Post.user_id == user_id).returning(Post.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    await db.commit()
+    # The post's comments went with it (ON DELETE CASCADE)
+    await response_cache.invalidate(post_comments_tag(post_id), COMMENT_STATS_TAG)
\ No newline at end of file
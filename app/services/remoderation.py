@@ -0,0 +1,50 @@
+# services/remoderation.py
+# With MODERATION_CHECK_FALLBACK=queue, posts and comments saved without a model
+# verdict are checked again from a job. The job fails, and is retried with
+# backoff, until the model answers; toxic content is then blocked.
+
+from decouple import config
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import COMMENT_STATS_TAG, post_comments_tag, response_cache
+from app.models.comment import Comment
+from app.models.post import Post
+from app.services.ai_moderation import MODERATION_BREAKER_RESET_SEC, check_text
+from app.services.jobs import enqueue_jobs, job_handler, on_commit
+
+REMODERATE_JOB = "remoderate"
+# Enough attempts to outlast an outage of about an hour at the maximum job backoff
+REMODERATE_MAX_ATTEMPTS = config("REMODERATE_MAX_ATTEMPTS", default=20, cast=int)
+
+MODELS = {"post": Post, "comment": Comment}
+
+
+async def schedule_remoderation(db: AsyncSession, kind: str, ids: list[int]) -> None:
+    # First attempt once the breaker would let a probe through; no commit, like enqueue_jobs
+    await enqueue_jobs(
+        db, REMODERATE_JOB, [({"kind": kind, "id": row_id}, MODERATION_BREAKER_RESET_SEC) for row_id in ids],
+        max_attempts=REMODERATE_MAX_ATTEMPTS,
+    )
+
+
+@job_handler(REMODERATE_JOB)
+async def run_remoderation(payload: dict, db: AsyncSession):
+    model = MODELS[payload["kind"]]
+    post_id = model.id if model is Post else model.post_id
+    row = (await db.execute(
+        select(model.content, model.is_blocked, post_id.label("post_id")).where(model.id == payload["id"])
+    )).one_or_none()
+    if row is None or row.is_blocked:
+        return
+
+    verdict = await check_text(row.content, admit=False)
+    if verdict is None:
+        raise RuntimeError("No moderation verdict yet")
+    if not verdict:
+        return
+    # Only the text that was checked: an edit since then was moderated on its own
+    await db.execute(
+        update(model).where(model.id == payload["id"], model.content == row.content).values(is_blocked=True)
+    )
+    on_commit(db, lambda: response_cache.invalidate(post_comments_tag(row.post_id), COMMENT_STATS_TAG))
@@ -0,0 +1,85 @@
+# services/search.py
+# Full-text search over the generated, GIN-indexed search_vector columns.
+# Results are ordered by ts_rank (then id) and paged with a (rank, id) cursor.
+
+from decouple import config
+from sqlalchemy import Select, func, literal_column, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.comment import Comment
+from app.models.post import Post
+from app.models.search import TS_CONFIG
+from app.services.comment import LIST_COLUMNS as COMMENT_COLUMNS
+from app.services.post import LIST_COLUMNS as POST_COLUMNS
+from app.utils.pagination import RankCursor, encode_rank_cursor
+
+# Ranking reads every candidate row, so a term found in most rows would rank the
+# whole table; only this many of the newest matches are ranked
+SEARCH_MAX_CANDIDATES = config("SEARCH_MAX_CANDIDATES", default=2000, cast=int)
+
+
+def _ranked_page(
+    model,
+    columns: list,
+    q: str,
+    limit: int,
+    cursor: RankCursor | None,
+    include_blocked: bool,
+    *filters,
+) -> Select:
+    # websearch syntax: quoted phrases, OR, and -word for exclusion
+    query = func.websearch_to_tsquery(literal_column(f"'{TS_CONFIG}'::regconfig"), q)
+    matches = model.search_vector.op("@@")(query)
+    if not include_blocked:
+        filters += (model.is_blocked.isnot(True),)
+    candidates = (
+        select(model.id).where(matches, *filters)
+        .order_by(model.id.desc()).limit(SEARCH_MAX_CANDIDATES)
+    )
+    rank = func.ts_rank(model.search_vector, query)
+    stmt = select(*columns, rank.label("rank")).where(model.id.in_(candidates))
+    if cursor is not None:
+        stmt = stmt.where(tuple_(rank, model.id) < tuple_(*cursor))
+    # One extra row tells whether another page exists
+    return stmt.order_by(rank.desc(), model.id.desc()).limit(limit + 1)
+
+
+async def _execute(db: AsyncSession, stmt: Select):
+    # The best candidate scan depends on how common the terms are: newest-first on the
+    # primary key for common ones, the GIN index for rare ones. A cached generic plan
+    # picks one for every query, so plan each search for its own terms.
+    await db.execute(text("SET LOCAL plan_cache_mode = force_custom_plan"))
+    return (await db.execute(stmt)).fetchall()
+
+
+def _split(rows: list, limit: int) -> tuple[list, str | None]:
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    return page, encode_rank_cursor(page[-1].rank, page[-1].id)
+
+
+async def search_posts(
+    db: AsyncSession,
+    q: str,
+    limit: int,
+    cursor: RankCursor | None = None,
+    user_id: int | None = None,
+    include_blocked: bool = False,
+) -> tuple[list, str | None]:
+    filters = (Post.user_id == user_id,) if user_id is not None else ()
+    stmt = _ranked_page(Post, POST_COLUMNS, q, limit, cursor, include_blocked, *filters)
+    return _split(await _execute(db, stmt), limit)
+
+
+async def search_comments(
+    db: AsyncSession,
+    q: str,
+    limit: int,
+    cursor: RankCursor | None = None,
+    post_id: int | None = None,
+    include_blocked: bool = False,
+) -> tuple[list, str | None]:
+    filters = (Comment.post_id == post_id,) if post_id is not None else ()
+    stmt = _ranked_page(Comment, COMMENT_COLUMNS, q, limit, cursor, include_blocked, *filters)
+    return _split(await _execute(db, stmt), limit)
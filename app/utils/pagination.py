@@ -0,0 +1,108 @@
+# utils/pagination.py
+# Keyset pagination on (created_at, id) with opaque cursors.
+
+import base64
+import json
+from datetime import datetime
+
+from decouple import config
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, tuple_
+
+PAGE_DEFAULT_LIMIT = config("PAGE_DEFAULT_LIMIT", default=50, cast=int)
+PAGE_MAX_LIMIT = config("PAGE_MAX_LIMIT", default=200, cast=int)
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+Cursor = tuple[datetime, int]
+# Search results are ordered by relevance instead of time
+RankCursor = tuple[float, int]
+# Comment threads are ordered by id, the order of their materialized paths
+IdCursor = int
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    return _encode([created_at.isoformat(), row_id])
+
+
+def decode_cursor(cursor: str | None) -> Cursor | None:
+    if not cursor:
+        return None
+    try:
+        created_at, row_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_rank_cursor(rank: float, row_id: int) -> str:
+    return _encode([rank, row_id])
+
+
+def decode_rank_cursor(cursor: str | None) -> RankCursor | None:
+    if not cursor:
+        return None
+    try:
+        rank, row_id = _decode(cursor)
+        return float(rank), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_id_cursor(row_id: int) -> str:
+    return _encode([row_id])
+
+
+def decode_id_cursor(cursor: str | None) -> IdCursor | None:
+    if not cursor:
+        return None
+    try:
+        [row_id] = _decode(cursor)
+        return int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(
+    stmt: Select,
+    created_col,
+    id_col,
+    cursor: Cursor | None,
+    limit: int,
+    descending: bool = False,
+) -> Select:
+    # The row comparison matches a composite (…, created_at, id) index exactly
+    if cursor is not None:
+        key = tuple_(created_col, id_col)
+        stmt = stmt.where(key < tuple_(*cursor) if descending else key > tuple_(*cursor))
+    if descending:
+        stmt = stmt.order_by(created_col.desc(), id_col.desc())
+    else:
+        stmt = stmt.order_by(created_col, id_col)
+    # One extra row tells whether another page exists
+    return stmt.limit(limit + 1)
+
+
+def split_page(rows: list, limit: int) -> tuple[list, str | None]:
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
+
+
+def set_next_cursor(response: Response, next_cursor: str | None) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
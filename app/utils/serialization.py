@@ -0,0 +1,61 @@
+# utils/serialization.py
+# JSON for list endpoints straight from result rows. A RowEncoder turns each row
+# into a dict keyed by its response schema's fields with a function generated once
+# per column layout, and orjson encodes the list: no Pydantic model per row and no
+# second validation against response_model. The output matches the schema's own
+# model_dump_json byte for byte, so ETags do not change.
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+from app.utils.pagination import set_next_cursor
+
+# Aware datetimes in UTC as "...Z", like Pydantic
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+class RowEncoder:
+    """
+    Encodes rows (anything with `_fields` and positional access, such as
+    SQLAlchemy Rows) that carry the fields of `schema` by name. Extra columns are
+    ignored; a missing column takes the field's default.
+    """
+
+    def __init__(self, schema: type[BaseModel]):
+        self.schema = schema
+        self.fields = schema.model_fields
+        self._converters: dict[tuple[str, ...], object] = {}
+
+    def _converter(self, columns: tuple[str, ...]):
+        convert = self._converters.get(columns)
+        if convert is not None:
+            return convert
+        defaults, items = {}, []
+        for name, field in self.fields.items():
+            if name in columns:
+                items.append(f"{name!r}: row[{columns.index(name)}]")
+            elif field.default is not PydanticUndefined:
+                defaults[name] = field.default
+                items.append(f"{name!r}: defaults[{name!r}]")
+            else:
+                raise ValueError(f"{self.schema.__name__}: rows have no {name!r} column")
+        # One dict literal per row: no per-field lookups or calls
+        convert = eval(f"lambda row: {{{', '.join(items)}}}", {"defaults": defaults})
+        self._converters[columns] = convert
+        return convert
+
+    def to_dicts(self, rows) -> list[dict]:
+        if not rows:
+            return []
+        convert = self._converter(tuple(rows[0]._fields))
+        return [convert(row) for row in rows]
+
+    def encode(self, rows) -> bytes:
+        return orjson.dumps(self.to_dicts(rows), option=ORJSON_OPTIONS)
+
+    def response(self, rows, next_cursor: str | None = None) -> Response:
+        response = Response(content=self.encode(rows), media_type="application/json")
+        set_next_cursor(response, next_cursor)
+        return response
@@ -0,0 +1,29 @@
+# worker.py
+# Standalone job worker: python -m app.worker
+
+import asyncio
+import signal
+
+from app.core.db import AsyncSessionLocal
+from app.services.comment_stats import schedule_stats_rollup
+from app.services.jobs import JobWorker
+from app.services import auto_reply, comment_counts, comment_stats, remoderation  # noqa: F401  (register their job handlers)
+
+async def main():
+    async with AsyncSessionLocal() as db:
+        await schedule_stats_rollup(db)
+    worker = JobWorker()
+    worker.start()
+    print(f"[JOB WORKER] started, concurrency={worker.concurrency}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    await worker.stop()
+    print("[JOB WORKER] stopped")
+
+if __name__ == "__main__":
+    asyncio.run(main())
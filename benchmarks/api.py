@@ -0,0 +1,283 @@
+# benchmarks/api.py
+# Load test of the API hot paths: the ASGI app is driven in-process through
+# httpx's ASGITransport (no server, no network) against a seeded database, with
+# the Gemini client replaced by FakeBackend at a configurable latency.
+#
+#   python -m benchmarks.api --users 200 --posts 2000 --comments 200000 --concurrency 32 --duration 10
+#   python -m benchmarks.api --scenarios list_comments analytics --out after.json --baseline before.json
+#
+# Scenarios: login, token_auth, create_comment, list_comments, analytics. Each runs
+# `--concurrency` clients for `--duration` seconds after a short warm-up. Prints
+# one JSON object for the run (commit, settings) and one per scenario (requests/s,
+# p50/p95/p99 ms, errors). --out saves the whole report. --baseline adds the
+# change against an earlier report to each scenario. The seed is deleted
+# afterwards unless --keep is given.
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import time
+import uuid
+from datetime import date, timedelta
+
+# Read at import by the app's settings: never call the real model from a benchmark
+os.environ.setdefault("MODERATION_BACKEND", "fake")
+# A few seeded users post far beyond any client's rate limit; measure the app, not the limiter
+os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from app.core.db import AsyncSessionLocal, engine
+from app.core.security import create_access_token, hash_password, user_claims
+from app.main import app
+from app.services import ai_moderation
+from app.services.moderation_engine import FakeBackend
+from benchmarks.moderation import percentile
+
+SCENARIOS = ["login", "token_auth", "create_comment", "list_comments", "analytics"]
+
+PASSWORD = "bench-password"
+
+SEED_USERS_SQL = text("""
+    INSERT INTO users (email, hashed_password)
+    SELECT :prefix || g || '@example.com', :hashed FROM generate_series(1, CAST(:n AS int)) g
+    RETURNING id, email
+""")
+
+SEED_POSTS_SQL = text("""
+    INSERT INTO posts (user_id, content, is_blocked, auto_reply_enabled, reply_delay_sec, created_at)
+    SELECT users[1 + g % array_length(users, 1)], 'bench post ' || g, false, false, 0,
+           now() - random() * interval '90 days'
+    FROM generate_series(1, CAST(:n AS int)) g, CAST(:user_ids AS int[]) users
+    RETURNING id
+""")
+
+# Popularity is skewed: a few posts collect most of the comments
+SEED_COMMENTS_SQL = text("""
+    INSERT INTO comments (post_id, user_id, content, is_blocked, created_at)
+    SELECT posts[1 + floor(power(random(), 3) * array_length(posts, 1))::int],
+           users[1 + g % array_length(users, 1)],
+           'bench comment ' || g,
+           random() < 0.05,
+           now() - random() * interval '90 days'
+    FROM generate_series(CAST(:start AS int), CAST(:stop AS int)) g,
+         CAST(:post_ids AS int[]) posts,
+         CAST(:user_ids AS int[]) users
+""")
+
+
+class Seed:
+    def __init__(self, prefix: str, users: list, post_ids: list[int]):
+        self.prefix = prefix
+        self.users = users
+        self.post_ids = post_ids
+        self.tokens = [create_access_token(user_claims(user)) for user in users]
+
+    def hot_post(self, rng: random.Random) -> int:
+        # Same skew as the seeded comments, so the busiest threads are read most
+        return self.post_ids[min(len(self.post_ids) - 1, int(rng.random() ** 3 * len(self.post_ids)))]
+
+
+async def seed(args) -> Seed:
+    prefix = f"bench_api_{uuid.uuid4().hex[:8]}_"
+    hashed = await hash_password(PASSWORD)
+    async with AsyncSessionLocal() as db:
+        users = (await db.execute(SEED_USERS_SQL, {"prefix": prefix, "hashed": hashed, "n": args.users})).all()
+        user_ids = [user.id for user in users]
+        post_ids = (await db.execute(SEED_POSTS_SQL, {"n": args.posts, "user_ids": user_ids})).scalars().all()
+        await db.commit()
+
+        started = time.perf_counter()
+        # Chunked so no single transaction holds millions of rows
+        for start in range(0, args.comments, args.chunk):
+            await db.execute(SEED_COMMENTS_SQL, {
+                "start": start, "stop": min(args.comments, start + args.chunk) - 1,
+                "post_ids": post_ids, "user_ids": user_ids,
+            })
+            await db.commit()
+        seed_sec = time.perf_counter() - started
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE users, posts, comments, comment_daily_stats"))
+    print(json.dumps({"seeded": {"users": args.users, "posts": args.posts, "comments": args.comments},
+                      "seed_sec": round(seed_sec, 1)}))
+    return Seed(prefix, users, list(post_ids))
+
+
+async def cleanup(seed: Seed) -> None:
+    async with AsyncSessionLocal() as db:
+        # Posts and comments (including the ones written by the run) go with their users
+        await db.execute(text("DELETE FROM users WHERE email LIKE :pattern"), {"pattern": f"{seed.prefix}%"})
+        await db.commit()
+
+
+def build_requests(seed: Seed, args):
+    today = date.today()
+
+    async def login(client: AsyncClient, rng: random.Random):
+        user = rng.choice(seed.users)
+        return await client.post("/auth/login", data={"username": user.email, "password": PASSWORD})
+
+    async def token_auth(client: AsyncClient, rng: random.Random):
+        return await client.get("/auth/me", headers={"Authorization": f"Bearer {rng.choice(seed.tokens)}"})
+
+    async def create_comment(client: AsyncClient, rng: random.Random):
+        # Unique text: every comment is a moderation cache miss and pays the model latency
+        return await client.post(
+            "/comments/",
+            json={"post_id": rng.choice(seed.post_ids), "content": f"load test {uuid.uuid4().hex}"},
+            headers={"Authorization": f"Bearer {rng.choice(seed.tokens)}"},
+        )
+
+    async def list_comments(client: AsyncClient, rng: random.Random):
+        return await client.get(f"/comments/post/{seed.hot_post(rng)}", params={"limit": args.page_size})
+
+    async def analytics(client: AsyncClient, rng: random.Random):
+        date_to = today - timedelta(days=rng.randrange(0, 60))
+        return await client.get("/api/comments-daily-breakdown", params={
+            "date_from": str(date_to - timedelta(days=29)), "date_to": str(date_to),
+        })
+
+    return {
+        "login": login,
+        "token_auth": token_auth,
+        "create_comment": create_comment,
+        "list_comments": list_comments,
+        "analytics": analytics,
+    }
+
+
+async def drive(client: AsyncClient, request, concurrency: int, duration: float, seed_value: int) -> tuple:
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def one_client(rng: random.Random):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            resp = await request(client, rng)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_client(random.Random(seed_value + i)) for i in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+async def run_scenario(name: str, request, client: AsyncClient, args) -> dict:
+    if args.warmup > 0:
+        await drive(client, request, args.concurrency, args.warmup, 0)
+    latencies, statuses, elapsed = await drive(client, request, args.concurrency, args.duration, 1000)
+    return {
+        "scenario": name,
+        "concurrency": args.concurrency,
+        "requests": len(latencies),
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "elapsed_sec": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(max(latencies, default=0.0), 3),
+        },
+    }
+
+
+def _change_pct(now: float, before: float) -> float | None:
+    return round((now - before) / before * 100, 1) if before else None
+
+
+def compare(result: dict, baseline: dict | None) -> dict:
+    if not baseline:
+        return result
+    result["vs_baseline"] = {
+        "commit": baseline["commit"],
+        "rps_pct": _change_pct(result["rps"], baseline["rps"]),
+        **{
+            f"{key}_pct": _change_pct(result["latency_ms"][key], baseline["latency_ms"][key])
+            for key in ("p50", "p95", "p99")
+        },
+    }
+    return result
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--comments", type=int, default=200_000)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds measured per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds run and discarded first")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--moderation-latency-ms", type=float, default=200.0)
+    parser.add_argument("--moderation-jitter-ms", type=float, default=20.0)
+    parser.add_argument("--moderation-error-rate", type=float, default=0.0)
+    parser.add_argument("--out", help="write the report (run + results) to this JSON file")
+    parser.add_argument("--baseline", help="report from an earlier run to compare against")
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's per-request log lines")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            report = json.load(f)
+        baseline = {
+            result["scenario"]: {**result, "commit": report["run"]["commit"]} for result in report["results"]
+        }
+
+    ai_moderation.engine.backend = FakeBackend(
+        latency_ms=args.moderation_latency_ms,
+        jitter_ms=args.moderation_jitter_ms,
+        error_rate=args.moderation_error_rate,
+    )
+    run = {"commit": current_commit(), "settings": {
+        key: value for key, value in vars(args).items() if key not in ("out", "baseline", "verbose")
+    }}
+    print(json.dumps({"run": run}))
+
+    data = await seed(args)
+    results = []
+    requests = build_requests(data, args)
+    try:
+        transport = ASGITransport(app=app)
+        async with LifespanManager(app), AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in args.scenarios:
+                quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+                with quiet:
+                    result = await run_scenario(name, requests[name], client, args)
+                results.append(compare(result, (baseline or {}).get(name)))
+                print(json.dumps(result))
+    finally:
+        if not args.keep:
+            await cleanup(data)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"run": run, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
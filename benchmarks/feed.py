@@ -0,0 +1,162 @@
+# benchmarks/feed.py
+# Home feed of a reader who follows thousands of authors: get_feed cold (window
+# built by the k-way merge), warm (served from the cached window) and past the
+# window, against the two single-query alternatives.
+#
+#   python -m benchmarks.feed --followees 5000 --posts-per-author 40 --repeat 20
+#
+# Seeds --followees authors with --posts-per-author posts each at random times
+# (5% blocked) and one reader who follows them all. The seed is deleted afterwards
+# unless --keep is given. Prints one JSON object per path.
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+from sqlalchemy import event, text
+
+from app.core.db import AsyncSessionLocal, engine
+from app.core.feeds import feed_cache
+from app.models import comment  # noqa: F401  (resolve Post's relationships)
+from app.services.feed import get_feed
+from benchmarks.moderation import percentile
+
+SEED_AUTHORS_SQL = text("""
+    INSERT INTO users (email, hashed_password)
+    SELECT :prefix || g || '@example.com', 'x' FROM generate_series(1, CAST(:n AS int)) g
+    RETURNING id
+""")
+
+SEED_POSTS_SQL = text("""
+    INSERT INTO posts (user_id, content, is_blocked, auto_reply_enabled, reply_delay_sec, created_at)
+    SELECT author, 'bench feed post', random() < 0.05, false, 0, now() - random() * interval '365 days'
+    FROM unnest(CAST(:authors AS int[])) author, generate_series(1, CAST(:per_author AS int))
+""")
+
+SEED_FOLLOWS_SQL = text("""
+    INSERT INTO follows (follower_id, followee_id)
+    SELECT :reader, author FROM unnest(CAST(:authors AS int[])) author
+""")
+
+# All followees' posts through one index condition, sorted together
+IN_LIST_SQL = text("""
+    SELECT p.id, p.created_at FROM posts p
+    WHERE p.user_id IN (SELECT followee_id FROM follows WHERE follower_id = :reader)
+      AND p.is_blocked IS NOT TRUE
+    ORDER BY p.created_at DESC, p.id DESC
+    LIMIT :limit
+""")
+
+# Each followee's newest `limit` posts, then one sort: reads limit rows per followee
+LATERAL_SQL = text("""
+    SELECT p.id, p.created_at FROM follows f
+    CROSS JOIN LATERAL (
+        SELECT p.id, p.created_at FROM posts p
+        WHERE p.user_id = f.followee_id AND p.is_blocked IS NOT TRUE
+        ORDER BY p.created_at DESC, p.id DESC
+        LIMIT :limit
+    ) p
+    WHERE f.follower_id = :reader
+    ORDER BY p.created_at DESC, p.id DESC
+    LIMIT :limit
+""")
+
+
+async def seed(args) -> tuple[str, int]:
+    prefix = f"bench_feed_{uuid.uuid4().hex[:8]}_"
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        authors = (await db.execute(SEED_AUTHORS_SQL, {"prefix": prefix, "n": args.followees})).scalars().all()
+        reader = (await db.execute(SEED_AUTHORS_SQL, {"prefix": prefix + "reader_", "n": 1})).scalar_one()
+        for start in range(0, len(authors), args.chunk):
+            await db.execute(SEED_POSTS_SQL, {"authors": authors[start:start + args.chunk],
+                                              "per_author": args.posts_per_author})
+        await db.execute(SEED_FOLLOWS_SQL, {"reader": reader, "authors": authors})
+        await db.commit()
+    # VACUUM sets the visibility map, as autovacuum would have: index-only scans skip the heap
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE users, posts, follows"))
+    print(json.dumps({"seeded": {"followees": args.followees, "posts": args.followees * args.posts_per_author},
+                      "seed_sec": round(time.perf_counter() - started, 1)}))
+    return prefix, reader
+
+
+async def measure(name: str, repeat: int, func) -> dict:
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    rows = await func()
+    samples = []
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await func()
+            samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+    return {
+        "path": name,
+        "rows": len(rows),
+        "statements": round(len(statements) / repeat, 1),
+        "ms": {
+            "mean": round(statistics.fmean(samples), 3),
+            "p50": round(percentile(samples, 50), 3),
+            "p95": round(percentile(samples, 95), 3),
+        },
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--followees", type=int, default=5000)
+    parser.add_argument("--posts-per-author", type=int, default=40)
+    parser.add_argument("--chunk", type=int, default=1000, help="authors seeded per statement")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    args = parser.parse_args()
+
+    prefix, reader = await seed(args)
+    try:
+        async with AsyncSessionLocal() as db:
+            async def cold():
+                feed_cache.drop(reader)
+                rows, _ = await get_feed(reader, db, args.limit)
+                return rows
+
+            async def warm():
+                rows, _ = await get_feed(reader, db, args.limit)
+                return rows
+
+            await warm()
+            # The oldest post in the window: pages after it are merged on every read
+            past_window = feed_cache.windows.get(reader).keys[0]
+
+            async def beyond():
+                rows, _ = await get_feed(reader, db, args.limit, past_window)
+                return rows
+
+            async def single(stmt):
+                return (await db.execute(stmt, {"reader": reader, "limit": args.limit})).fetchall()
+
+            print(json.dumps(await measure("get_feed cold (merge, window built)", args.repeat, cold)))
+            print(json.dumps(await measure("get_feed warm (cached window)", args.repeat, warm)))
+            print(json.dumps(await measure("get_feed past the window (merge)", args.repeat, beyond)))
+            print(json.dumps(await measure("IN (followees) + sort", args.repeat, lambda: single(IN_LIST_SQL))))
+            print(json.dumps(await measure("LATERAL limit per followee + sort", args.repeat, lambda: single(LATERAL_SQL))))
+    finally:
+        if not args.keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(text("DELETE FROM users WHERE email LIKE :pattern"), {"pattern": f"{prefix}%"})
+                await db.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+# benchmarks/moderation.py
+# Offline latency/throughput benchmark for the moderation engine using the fake backend.
+#
+#   python -m benchmarks.moderation --requests 500 --concurrency 100 --latency-ms 200
+#
+# Prints one JSON object per mode so results can be diffed between commits.
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import time
+
+from app.services.moderation_engine import FakeBackend, ModerationEngine
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_mode(name: str, args, batch_size: int) -> dict:
+    backend = FakeBackend(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    engine = ModerationEngine(
+        backend,
+        max_concurrency=args.max_concurrency,
+        timeout=args.timeout,
+        max_batch_size=batch_size,
+        batch_window_ms=args.batch_window_ms,
+    )
+    texts = [f"comment number {i}" + (" toxic" if i % 10 == 0 else "") for i in range(args.requests)]
+    gate = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+
+    async def one(text: str) -> bool:
+        async with gate:
+            start = time.perf_counter()
+            verdict = await engine.is_toxic(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+            return verdict
+
+    started = time.perf_counter()
+    verdicts = await asyncio.gather(*(one(text) for text in texts))
+    elapsed = time.perf_counter() - started
+    await engine.close()
+
+    return {
+        "mode": name,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "backend_latency_ms": args.latency_ms,
+        "backend_calls": backend.calls,
+        "max_in_flight": backend.max_in_flight,
+        "flagged": sum(verdicts),
+        "elapsed_sec": round(elapsed, 4),
+        "rps": round(args.requests / elapsed, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3),
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+        },
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--batch-window-ms", type=float, default=20.0)
+    parser.add_argument("--verbose", action="store_true", help="keep the engine's per-call log lines")
+    args = parser.parse_args()
+
+    for name, batch_size in (("single", 1), ("batched", args.batch_size)):
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with quiet:
+            result = await run_mode(name, args, batch_size)
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+# benchmarks/passwords.py
+# Login throughput under concurrency: bcrypt verification inline on the event loop
+# (the old behaviour) versus the worker pool, at the configured cost.
+#
+#   python -m benchmarks.passwords --logins 64 --concurrency 32 --rounds 12
+#
+# Prints one JSON object per mode. "loop_stall_ms" is the longest the event loop
+# went without running a 1 ms ticker, i.e. how long every other request waited.
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from app.core.passwords import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PasswordHasher
+from benchmarks.moderation import percentile
+
+
+async def run_mode(name: str, args, hasher: PasswordHasher, hashed: str) -> dict:
+    gate = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    stall = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    async def login() -> bool:
+        async with gate:
+            if name == "inline":
+                valid = hasher.context.verify(args.password, hashed)
+            else:
+                valid = await hasher.verify(args.password, hashed)
+            # All logins arrive at once, so latency counts from the start of the burst
+            latencies.append((time.perf_counter() - started) * 1000)
+            return valid
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(args.logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick
+
+    return {
+        "mode": name,
+        "logins": args.logins,
+        "concurrency": args.concurrency,
+        "rounds": args.rounds,
+        "workers": hasher.workers if name != "inline" else 0,
+        "valid": sum(results),
+        "elapsed_sec": round(elapsed, 4),
+        "logins_per_sec": round(args.logins / elapsed, 2),
+        "loop_stall_ms": round(stall * 1000, 3),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3),
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+        },
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS)
+    parser.add_argument("--workers", type=int, nargs="+", default=[PASSWORD_HASH_WORKERS])
+    parser.add_argument("--password", default="correct horse battery staple")
+    args = parser.parse_args()
+
+    reference = PasswordHasher(rounds=args.rounds, workers=1)
+    hashed = await reference.hash(args.password)
+    print(json.dumps(await run_mode("inline", args, reference, hashed)))
+    reference.close()
+
+    for workers in args.workers:
+        hasher = PasswordHasher(rounds=args.rounds, workers=workers, max_queue=args.logins)
+        print(json.dumps(await run_mode(f"pool-{workers}", args, hasher, hashed)))
+        hasher.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,152 @@
+# benchmarks/search.py
+# Full-text search over a seeded corpus: search_comments (GIN index, ts_rank order)
+# against the ILIKE '%term%' scan that is the alternative without an index.
+#
+#   python -m benchmarks.search --rows 1000000 --repeat 20
+#
+# Seeds --rows comments (and --rows/10 posts) under a throwaway user, with words
+# drawn from a skewed vocabulary, so terms range from very common to rare. The
+# seed is deleted afterwards unless --keep is given. Prints one JSON object per
+# (query, path).
+
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+import uuid
+
+from sqlalchemy import text
+
+from app.core.db import AsyncSessionLocal, engine
+from app.models import comment, post  # noqa: F401  (resolve User's relationships)
+from app.models.user import User
+from app.services.search import search_comments
+from benchmarks.moderation import percentile
+
+# Placed at log-spaced ranks of the vocabulary, from the most frequent word to a rare one
+WORDS = [
+    "coffee", "garden", "weather", "python", "tomato", "bicycle", "concert", "recipe", "holiday", "library",
+    "mountain", "keyboard", "election", "football", "painting", "harbor", "volcano", "lantern", "orchestra", "glacier",
+]
+SYLLABLES = ["ka", "lo", "mi", "ren", "tu", "sa", "vel", "do", "ri", "pon", "ze", "ba"]
+
+# From a term in most rows down to one in none
+QUERIES = ["coffee", "recipe", "volcano", "glacier", "zeppelin", "coffee garden", '"coffee garden"', "glacier -coffee"]
+
+SEED_COMMENTS_SQL = text("""
+    INSERT INTO comments (post_id, user_id, content, is_blocked, created_at)
+    SELECT posts[1 + g % array_length(posts, 1)], :user_id,
+           (SELECT string_agg(word, ' ') FROM (
+                SELECT vocab[1 + floor(power(random(), 3) * array_length(vocab, 1))::int] AS word
+                FROM generate_series(1, CAST(:words AS int)) WHERE g >= 0
+            ) words),
+           random() < 0.05,
+           now() - random() * interval '1000 days'
+    FROM generate_series(CAST(:start AS int), CAST(:stop AS int)) g,
+         CAST(:post_ids AS int[]) posts,
+         CAST(:vocab AS text[]) vocab
+""")
+
+ILIKE_SQL = text("""
+    SELECT id, content FROM comments
+    WHERE content ILIKE :pattern AND is_blocked IS NOT TRUE
+    ORDER BY id DESC
+    LIMIT :limit
+""")
+
+
+def vocabulary(size: int) -> list[str]:
+    vocab = ["".join(parts) for parts in itertools.product(SYLLABLES, repeat=3)][: size - len(WORDS)]
+    position = -1
+    for i, word in enumerate(WORDS):
+        position = max(position + 1, round(size ** (i / (len(WORDS) - 1))) - 1)
+        vocab.insert(position, word)
+    return vocab
+
+
+async def seed(args) -> int:
+    vocab = vocabulary(args.vocabulary)
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"bench_search_{uuid.uuid4().hex[:8]}@example.com", hashed_password="x")
+        db.add(user)
+        await db.flush()
+        post_ids = (await db.execute(text("""
+            INSERT INTO posts (user_id, content, is_blocked, auto_reply_enabled, reply_delay_sec)
+            SELECT :user_id, 'bench post ' || g, false, false, 0 FROM generate_series(1, CAST(:n AS int)) g
+            RETURNING id
+        """), {"user_id": user.id, "n": max(1, args.rows // 10)})).scalars().all()
+        await db.commit()
+
+        started = time.perf_counter()
+        # Chunked so no single transaction holds millions of rows
+        for start in range(0, args.rows, args.chunk):
+            await db.execute(SEED_COMMENTS_SQL, {
+                "user_id": user.id, "words": args.words, "post_ids": post_ids, "vocab": vocab,
+                "start": start, "stop": min(args.rows, start + args.chunk) - 1,
+            })
+            await db.commit()
+        print(json.dumps({"seeded_rows": args.rows, "seed_sec": round(time.perf_counter() - started, 1)}))
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE posts, comments"))
+    return user.id
+
+
+async def fts(db, query: str, limit: int) -> list:
+    rows, _ = await search_comments(db, query, limit)
+    return rows
+
+
+async def ilike(db, pattern: str, limit: int) -> list:
+    result = await db.execute(ILIKE_SQL, {"pattern": pattern, "limit": limit})
+    return result.fetchall()
+
+
+async def measure(name: str, query: str, repeat: int, func) -> dict:
+    rows = await func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "query": query,
+        "path": name,
+        "rows": len(rows),
+        "ms": {
+            "mean": round(statistics.fmean(samples), 3),
+            "p50": round(percentile(samples, 50), 3),
+            "p95": round(percentile(samples, 95), 3),
+        },
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    parser.add_argument("--words", type=int, default=12, help="words per comment")
+    parser.add_argument("--vocabulary", type=int, default=1500)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    args = parser.parse_args()
+
+    user_id = await seed(args)
+    try:
+        async with AsyncSessionLocal() as db:
+            for query in QUERIES:
+                # Only the first term for ILIKE: it has no phrase or exclusion syntax
+                pattern = f"%{query.strip(chr(34)).split()[0]}%"
+                print(json.dumps(await measure("search_comments", query, args.repeat, lambda: fts(db, query, args.limit))))
+                print(json.dumps(await measure("ILIKE scan", pattern, args.repeat, lambda: ilike(db, pattern, args.limit))))
+    finally:
+        if not args.keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+                await db.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+# benchmarks/serialization.py
+# CPU cost of turning a page of list rows into a JSON body: a Pydantic model per
+# row re-validated against response_model (the previous GET /posts/), models
+# dumped by a TypeAdapter (the previous GET /comments/post/{id}), and RowEncoder
+# straight from the rows.
+#
+#   python -m benchmarks.serialization --rows 10000 --repeat 20
+#
+# The rows come from generate_series, so nothing is seeded. Prints one JSON
+# object per (schema, path) with the milliseconds per --rows rows.
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+from sqlalchemy import text
+
+from app.core.db import AsyncSessionLocal
+from app.schemas.comment import CommentRead
+from app.schemas.post import PostRead
+from app.utils.serialization import RowEncoder
+from benchmarks.moderation import percentile
+
+ROWS_SQL = {
+    PostRead: text("""
+        SELECT g AS id, 'post number ' || g || ' with a few more words in it' AS content,
+               g % 20 = 0 AS is_blocked, g % 2 = 0 AS auto_reply_enabled, 0 AS reply_delay_sec,
+               now() - g * interval '1 minute' AS created_at, g % 50 AS comment_count,
+               g % 3 AS blocked_comment_count
+        FROM generate_series(1, CAST(:n AS int)) g
+    """),
+    CommentRead: text("""
+        SELECT g AS id, 1 AS post_id, g % 100 + 1 AS user_id,
+               CASE WHEN g % 3 = 0 THEN g - 1 END AS parent_id,
+               'comment number ' || g || ' with a few more words in it' AS content,
+               g % 20 = 0 AS is_blocked, now() - g * interval '1 minute' AS created_at
+        FROM generate_series(1, CAST(:n AS int)) g
+    """),
+}
+
+
+def paths(schema, rows) -> dict:
+    field = create_model_field(name="Response", type_=list[schema], mode="serialization")
+    adapter = TypeAdapter(list[schema])
+    encoder = RowEncoder(schema)
+
+    async def response_model(response_class):
+        models = [schema.model_validate(row) for row in rows]
+        content = await serialize_response(field=field, response_content=models)
+        return response_class(content).body
+
+    return {
+        "model_validate + response_model (JSONResponse)": lambda: response_model(JSONResponse),
+        "model_validate + response_model (ORJSONResponse)": lambda: response_model(ORJSONResponse),
+        "model_validate + TypeAdapter.dump_json": lambda: adapter.dump_json([schema.model_validate(row) for row in rows]),
+        "RowEncoder (orjson)": lambda: encoder.encode(rows),
+    }
+
+
+async def measure(schema, name: str, repeat: int, func) -> dict:
+    samples = []
+    for _ in range(repeat + 1):
+        started = time.perf_counter()
+        body = func()
+        if asyncio.iscoroutine(body):
+            body = await body
+        samples.append((time.perf_counter() - started) * 1000)
+    # The first run warms up (converters, schema caches)
+    samples = samples[1:]
+    return {
+        "schema": schema.__name__,
+        "path": name,
+        "bytes": len(body),
+        "ms": {
+            "mean": round(statistics.fmean(samples), 2),
+            "p50": round(percentile(samples, 50), 2),
+            "p95": round(percentile(samples, 95), 2),
+        },
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as db:
+        for schema, stmt in ROWS_SQL.items():
+            rows = (await db.execute(stmt, {"n": args.rows})).fetchall()
+            for name, func in paths(schema, rows).items():
+                print(json.dumps(await measure(schema, name, args.repeat, func)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+# benchmarks/tokens.py
+# Microbenchmark of bearer-token authentication: python-jose's jwt.decode on every
+# request (the previous get_current_user) against TokenService with and without the
+# verified-token memo, per algorithm, plus get_current_user end to end on a warm cache.
+#
+#   python -m benchmarks.tokens --iterations 20000
+#
+# Prints one JSON object per (algorithm, path).
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jose import jwt
+
+from app.core import security
+from app.core.principals import cache_principal, principal_key
+from app.core.tokens import KeySet, KeySetFile, TokenService
+from app.models import comment, post  # noqa: F401  (resolve User's relationships)
+from app.models.user import User
+
+
+def _private_pem(private_key) -> str:
+    return private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+
+def measure(name: str, alg: str, iterations: int, func) -> dict:
+    func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - started
+    return {
+        "alg": alg,
+        "path": name,
+        "iterations": iterations,
+        "us_per_call": round(elapsed / iterations * 1e6, 3),
+        "calls_per_sec": round(iterations / elapsed, 1),
+    }
+
+
+def keysets(workdir: Path) -> dict:
+    keys = {"HS256": KeySet.from_secret("bench", "HS256")}
+    for alg, private_key in (
+        ("RS256", rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+        ("EdDSA", ed25519.Ed25519PrivateKey.generate()),
+    ):
+        path = workdir / f"{alg}.json"
+        path.write_text(json.dumps({
+            "active_kid": "bench",
+            "keys": [{"kid": "bench", "alg": alg, "private_key": _private_pem(private_key)}],
+        }))
+        keys[alg] = KeySetFile(path)
+    return keys
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    claims = {"sub": "bench@example.com", "uid": 1, "exp": datetime.now(timezone.utc) + timedelta(hours=1)}
+    with TemporaryDirectory() as workdir:
+        for alg, keys in keysets(Path(workdir)).items():
+            memo = TokenService(keys, cache_size=10_000)
+            no_memo = TokenService(keys, cache_size=0)
+            token = memo.encode(claims)
+            key = memo.keyset.active
+
+            if alg != "EdDSA":
+                # python-jose has no EdDSA, so there is no previous path to compare with
+                print(json.dumps(measure(
+                    "jose.decode", alg, args.iterations,
+                    lambda: jwt.decode(token, key.verify_key, algorithms=[alg]),
+                )))
+            print(json.dumps(measure("verify, no memo", alg, args.iterations, lambda: no_memo.decode(token))))
+            print(json.dumps(measure("verify, memo hit", alg, args.iterations, lambda: memo.decode(token))))
+
+    # get_current_user on a repeat token: memo hit + principal cache hit, no database
+    token = security.create_access_token(claims)
+    cache_principal(principal_key(1), User(id=1, email="bench@example.com", hashed_password="x"), None)
+    loop = asyncio.new_event_loop()
+    print(json.dumps(measure(
+        "get_current_user, warm", security.token_service.keyset.active.alg, args.iterations,
+        lambda: loop.run_until_complete(security.get_current_user(token, db=None)),
+    )))
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,10 @@
 #          + full DB cleanup after the whole test session.
 
 import asyncio
+import os
 import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import AsyncIterator
 
 import pytest
@@ -13,11 +16,22 @@ from httpx import AsyncClient, ASGITransport
 from asgi_lifespan import LifespanManager
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+from sqlalchemy import event, text
+
+# Never call the real Gemini API from tests
+os.environ.setdefault("MODERATION_BACKEND", "fake")
+os.environ.setdefault("MODERATION_FAKE_LATENCY_MS", "1")
+# Minimum bcrypt cost keeps user fixtures fast
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Tests post far faster than any client should; test_rate_limit installs its own limiter
+os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
 
 from app.main import app
 from app.core.db import get_db, AsyncSessionLocal, engine, Base
+from app.core.replicas import get_read_db
 from app.core.security import create_access_token
+from app.models.post import Post
+from app.models.user import User
 
 # Ensure models are imported so their metadata is registered on Base
 from app.models import user as _user_model  # noqa: F401
@@ -73,6 +87,7 @@ async def override_get_db(db_session: AsyncSession):
         yield db_session
 
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_read_db] = _override_get_db
     try:
         yield
     finally:
@@ -91,6 +106,43 @@ async def client(override_get_db) -> AsyncIterator[AsyncClient]:
             yield ac
 
 
+# Set only inside count_statements(): statements from other tasks (the in-process
+# job worker, lifespan) run in contexts that never see it
+_recorded_statements: ContextVar[list | None] = ContextVar("recorded_statements", default=None)
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    statements = _recorded_statements.get()
+    if statements is not None:
+        statements.append(statement)
+
+
+@pytest.fixture
+def count_statements():
+    """
+    Records the SQL statements the current task sends to the database, e.g. for
+    one request through `client` (BEGIN/COMMIT are not counted):
+
+        with count_statements() as statements:
+            await client.get("/posts/", headers=auth_headers)
+        assert len(statements) == 1
+    """
+    @contextmanager
+    def recording():
+        statements: list[str] = []
+        token = _recorded_statements.set(statements)
+        try:
+            yield statements
+        finally:
+            _recorded_statements.reset(token)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record_statement)
+    try:
+        yield recording
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record_statement)
+
+
 @pytest_asyncio.fixture
 async def test_user(db_session: AsyncSession):
     """
@@ -112,6 +164,40 @@ async def test_user(db_session: AsyncSession):
     return user
 
 
+@pytest.fixture
+def make_user(db_session: AsyncSession):
+    """
+    Factory for users that never log in (no password hashing); flushed, not committed:
+
+        owner = await make_user()
+    """
+    async def make(**fields) -> User:
+        user = User(email=f"user_{uuid.uuid4().hex[:8]}@example.com", hashed_password="x", **fields)
+        db_session.add(user)
+        await db_session.flush()
+        return user
+
+    return make
+
+
+@pytest.fixture
+def make_post(db_session: AsyncSession, make_user):
+    """
+    Factory for posts, by a new user unless one is given; flushed, not committed:
+
+        post = await make_post(test_user, content="hello", auto_reply_enabled=True)
+    """
+    async def make(user: User | None = None, content: str = "post", **fields) -> Post:
+        if user is None:
+            user = await make_user()
+        post = Post(user_id=user.id, content=content, **fields)
+        db_session.add(post)
+        await db_session.flush()
+        return post
+
+    return make
+
+
 @pytest_asyncio.fixture
 async def auth_headers(test_user) -> dict:
     """
@@ -137,5 +223,5 @@ async def cleanup_after_tests():
     async with engine.begin() as conn:
         # порядок не важен из-за CASCADE; RESTART IDENTITY сбрасывает序ции ID
         await conn.execute(
-            text("TRUNCATE TABLE comments, posts, users RESTART IDENTITY CASCADE")
+            text("TRUNCATE TABLE jobs, moderation_verdicts, comment_daily_stats, comments, posts, users RESTART IDENTITY CASCADE")
         )
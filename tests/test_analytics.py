@@ -1,7 +1,24 @@
 # tests/test_analytics.py
 
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+
 import pytest
+import pytest_asyncio
 from httpx import AsyncClient
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.models.comment import Comment
+from app.models.job import Job
+from app.services.comment_stats import (
+    STATS_ROLLUP_JOB,
+    backfill_comment_daily_stats,
+    get_daily_breakdown,
+    run_stats_rollup,
+    schedule_stats_rollup,
+)
 
 
 class TestAnalytics:
@@ -42,3 +59,135 @@ class TestAnalytics:
             assert "date" in row
             assert "total" in row
             assert "blocked" in row
+
+
+@pytest_asyncio.fixture
+async def stats_post(db_session: AsyncSession, make_post):
+    post = await make_post(content="stats")
+    await db_session.commit()
+    return post
+
+
+def _at(day: date) -> datetime:
+    return datetime.combine(day, time(12), tzinfo=timezone.utc)
+
+
+class TestCommentDailyStats:
+    """comment_daily_stats rollup: triggers, backfill and the live current day."""
+
+    @pytest.mark.asyncio
+    async def test_rollup_follows_inserts_blocks_and_deletes(self, db_session, stats_post):
+        day = date(2003, 3, 3)
+        comments = [
+            Comment(post_id=stats_post.id, user_id=stats_post.user_id, content=f"c{i}",
+                    is_blocked=i == 0, created_at=_at(day))
+            for i in range(3)
+        ]
+        db_session.add_all(comments)
+        await db_session.commit()
+        assert await get_daily_breakdown(db_session, day, day) == [
+            {"date": "2003-03-03", "total_comments": 3, "blocked_comments": 1}
+        ]
+
+        comments[1].is_blocked = True
+        await db_session.commit()
+        await db_session.delete(comments[2])
+        await db_session.commit()
+        assert await get_daily_breakdown(db_session, day, day) == [
+            {"date": "2003-03-03", "total_comments": 2, "blocked_comments": 2}
+        ]
+
+        await db_session.delete(stats_post)
+        await db_session.commit()
+        assert await get_daily_breakdown(db_session, day, day) == []
+
+    @pytest.mark.asyncio
+    async def test_backfill_rebuilds_rollup(self, db_session, stats_post):
+        day = date(2004, 4, 4)
+        db_session.add_all(
+            Comment(post_id=stats_post.id, user_id=stats_post.user_id, content=f"c{i}",
+                    is_blocked=i % 2 == 0, created_at=_at(day + timedelta(days=i % 2)))
+            for i in range(5)
+        )
+        await db_session.commit()
+        await db_session.execute(text(
+            "UPDATE comment_daily_stats SET total_comments = 99 WHERE day BETWEEN :a AND :b"
+        ), {"a": day, "b": day + timedelta(days=1)})
+        await db_session.commit()
+
+        written = await backfill_comment_daily_stats(db_session, day, day + timedelta(days=1), chunk_days=1)
+        assert written == 2
+        assert await get_daily_breakdown(db_session, day, day + timedelta(days=1)) == [
+            {"date": "2004-04-04", "total_comments": 3, "blocked_comments": 3},
+            {"date": "2004-04-05", "total_comments": 2, "blocked_comments": 0},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_backfill_leaves_comment_writes_alone(self, db_session, stats_post):
+        day = date(2005, 5, 5)
+        db_session.add(Comment(post_id=stats_post.id, user_id=stats_post.user_id, content="c", created_at=_at(day)))
+        await db_session.commit()
+
+        # A writer on another day holds its rollup row (and a lock on comments) meanwhile
+        async with AsyncSessionLocal() as writer:
+            writer.add(Comment(post_id=stats_post.id, user_id=stats_post.user_id, content="w",
+                               created_at=_at(day + timedelta(days=1))))
+            await writer.flush()
+            written = await asyncio.wait_for(backfill_comment_daily_stats(db_session, day, day), 5)
+            await writer.rollback()
+        assert written == 0
+        assert await get_daily_breakdown(db_session, day, day + timedelta(days=1)) == [
+            {"date": "2005-05-05", "total_comments": 1, "blocked_comments": 0}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_current_day_is_counted_live(self, db_session, stats_post):
+        today = datetime.now(timezone.utc).date()
+        db_session.add(Comment(post_id=stats_post.id, user_id=stats_post.user_id, content="now"))
+        await db_session.commit()
+        # The triggers leave today's row to close_comment_stats
+        stored = (await db_session.execute(
+            text("SELECT COUNT(*) FROM comment_daily_stats WHERE day = :d"), {"d": today}
+        )).scalar()
+        assert stored == 0
+
+        expected = (await db_session.execute(text(
+            "SELECT COUNT(*) FROM comments WHERE (created_at AT TIME ZONE 'UTC')::date = :d"
+        ), {"d": today})).scalar()
+        [row] = await get_daily_breakdown(db_session, today, today)
+        assert row["date"] == str(today)
+        assert row["total_comments"] == expected
+
+    @pytest.mark.asyncio
+    async def test_rollup_job_closes_past_days(self, db_session, stats_post):
+        yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+        db_session.add_all(
+            Comment(post_id=stats_post.id, user_id=stats_post.user_id, content=f"y{i}",
+                    is_blocked=i == 0, created_at=_at(yesterday))
+            for i in range(2)
+        )
+        await db_session.commit()
+        await db_session.execute(text("DELETE FROM comment_daily_stats WHERE day = :d"), {"d": yesterday})
+        # Including the one queued at startup
+        await db_session.execute(text("DELETE FROM jobs WHERE kind = :kind"), {"kind": STATS_ROLLUP_JOB})
+        await db_session.commit()
+
+        await run_stats_rollup({}, db_session)
+        await db_session.commit()
+        live = (await db_session.execute(text("""
+            SELECT COUNT(*), COUNT(*) FILTER (WHERE is_blocked) FROM comments
+            WHERE (created_at AT TIME ZONE 'UTC')::date = :d
+        """), {"d": yesterday})).one()
+        assert await get_daily_breakdown(db_session, yesterday, yesterday) == [
+            {"date": str(yesterday), "total_comments": live[0], "blocked_comments": live[1]}
+        ]
+
+        # The handler queued its next run, so scheduling adds no second one
+        await schedule_stats_rollup(db_session)
+        queued = (await db_session.execute(
+            select(Job.run_at > func.now()).where(Job.kind == STATS_ROLLUP_JOB, Job.status == "pending")
+        )).scalars().all()
+        assert queued == [True]
+        # Not left for the in-process workers of later tests
+        await db_session.execute(text("DELETE FROM jobs WHERE kind = :kind"), {"kind": STATS_ROLLUP_JOB})
+        await db_session.commit()
@@ -0,0 +1,159 @@
+# tests/test_comment_counts.py
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.models.comment import Comment
+from app.models.job import Job
+from app.models.post import Post
+from app.services.comment_counts import RECONCILE_JOB, reconcile_batch, reconcile_comment_counts, run_reconcile
+
+
+@pytest_asyncio.fixture
+async def counted_post(db_session: AsyncSession, test_user):
+    post = Post(user_id=test_user.id, content="counted")
+    db_session.add(post)
+    await db_session.commit()
+    return post
+
+
+async def _counts(db: AsyncSession, post_id: int) -> tuple[int, int]:
+    row = (await db.execute(
+        select(Post.comment_count, Post.blocked_comment_count).where(Post.id == post_id)
+    )).one()
+    return tuple(row)
+
+
+class TestCommentCounts:
+    """posts.comment_count / blocked_comment_count: triggers and reconciliation."""
+
+    @pytest.mark.asyncio
+    async def test_counts_follow_api_writes(self, client: AsyncClient, auth_headers, db_session, counted_post):
+        post_id = counted_post.id
+        await client.post("/comments/", json={"post_id": post_id, "content": "hello"}, headers=auth_headers)
+        resp = await client.post("/comments/bulk", headers=auth_headers, json=[
+            {"post_id": post_id, "content": "one"},
+            {"post_id": post_id, "content": "this is toxic"},
+        ])
+        assert resp.json()["created"] == 2
+
+        # The requests share this session, which still holds the post as loaded before
+        db_session.expire(counted_post)
+        resp = await client.get(f"/posts/{post_id}", headers=auth_headers)
+        assert resp.status_code == 200, resp.text
+        assert (resp.json()["comment_count"], resp.json()["blocked_comment_count"]) == (3, 1)
+
+        [listed] = [p for p in (await client.get("/posts/", headers=auth_headers)).json() if p["id"] == post_id]
+        assert listed["comment_count"] == 3
+
+    @pytest.mark.asyncio
+    async def test_counts_follow_blocks_and_deletes(self, db_session, counted_post):
+        comments = [
+            Comment(post_id=counted_post.id, user_id=counted_post.user_id, content=f"c{i}", is_blocked=i == 0)
+            for i in range(4)
+        ]
+        db_session.add_all(comments)
+        await db_session.commit()
+        assert await _counts(db_session, counted_post.id) == (4, 1)
+
+        comments[1].is_blocked = True
+        comments[2].content = "edited"
+        await db_session.commit()
+        assert await _counts(db_session, counted_post.id) == (4, 2)
+
+        await db_session.execute(text("DELETE FROM comments WHERE id = ANY(:ids)"),
+                                 {"ids": [comments[0].id, comments[3].id]})
+        await db_session.commit()
+        assert await _counts(db_session, counted_post.id) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_moving_a_comment_updates_both_posts(self, db_session, counted_post):
+        other = Post(user_id=counted_post.user_id, content="other")
+        comment = Comment(post_id=counted_post.id, user_id=counted_post.user_id, content="moving", is_blocked=True)
+        db_session.add_all([other, comment])
+        await db_session.commit()
+
+        comment.post_id = other.id
+        await db_session.commit()
+        assert await _counts(db_session, counted_post.id) == (0, 0)
+        assert await _counts(db_session, other.id) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_reconcile_repairs_drift(self, db_session, counted_post):
+        db_session.add_all(
+            Comment(post_id=counted_post.id, user_id=counted_post.user_id, content=f"c{i}", is_blocked=i < 2)
+            for i in range(5)
+        )
+        await db_session.commit()
+        await db_session.execute(
+            text("UPDATE posts SET comment_count = 42, blocked_comment_count = 0 WHERE id = :id"),
+            {"id": counted_post.id},
+        )
+        await db_session.commit()
+
+        last_id, repaired = await reconcile_batch(db_session, counted_post.id - 1, batch_size=1)
+        await db_session.commit()
+        assert (last_id, repaired) == (counted_post.id, 1)
+        assert await _counts(db_session, counted_post.id) == (5, 2)
+
+        # Nothing left to repair
+        assert await reconcile_comment_counts(db_session, batch_size=100) == 0
+
+    @pytest.mark.asyncio
+    async def test_job_handler_enqueues_next_batch(self, db_session, counted_post):
+        await db_session.execute(
+            text("UPDATE posts SET comment_count = 7 WHERE id = :id"), {"id": counted_post.id}
+        )
+        await db_session.commit()
+
+        await run_reconcile({"after_id": counted_post.id - 1, "batch_size": 1}, db_session)
+        await db_session.commit()
+        assert await _counts(db_session, counted_post.id) == (0, 0)
+
+        payloads = (await db_session.execute(
+            select(Job.payload).where(Job.kind == RECONCILE_JOB, Job.payload["after_id"].as_integer() == counted_post.id)
+        )).scalars().all()
+        assert payloads == [{"after_id": counted_post.id, "batch_size": 1}]
+        # Not left for the in-process workers of later tests
+        await db_session.execute(text("DELETE FROM jobs WHERE kind = :kind"), {"kind": RECONCILE_JOB})
+        await db_session.commit()
+
+    @pytest.mark.asyncio
+    async def test_trigger_locks_posts_in_id_order(self, db_session, make_post):
+        low, high = [await make_post(content=name) for name in ("low", "high")]
+        db_session.add_all(Comment(post_id=post.id, user_id=post.user_id, content="c") for post in (high, low))
+        await db_session.commit()
+
+        async with AsyncSessionLocal() as reconciler, AsyncSessionLocal() as writer:
+            await reconcile_batch(reconciler, low.id - 1, batch_size=1)
+            block = asyncio.create_task(writer.execute(
+                text("UPDATE comments SET is_blocked = true WHERE post_id = ANY(:ids)"), {"ids": [high.id, low.id]}
+            ))
+            while not (await db_session.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_stat_activity WHERE wait_event_type = 'Lock' AND query LIKE 'UPDATE comments%')"
+            ))).scalar():
+                await asyncio.sleep(0.01)
+
+            # The writer waits for the lower id before it takes the higher one
+            await reconcile_batch(reconciler, high.id - 1, batch_size=1)
+            await reconciler.commit()
+            await asyncio.wait_for(block, 5)
+            await writer.commit()
+
+        assert await _counts(db_session, low.id) == (1, 1)
+        assert await _counts(db_session, high.id) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_content_edit_moves_no_counts(self, db_session, counted_post):
+        comment = Comment(post_id=counted_post.id, user_id=counted_post.user_id, content="before")
+        db_session.add(comment)
+        await db_session.commit()
+        comment.content = "after"
+        await db_session.commit()
+        assert await _counts(db_session, counted_post.id) == (1, 0)
@@ -0,0 +1,126 @@
+# tests/test_comment_tree.py
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.comment import Comment
+from app.models.post import Post
+from app.services import comment as comment_service
+from app.services.auto_reply import run_auto_reply
+from app.services.comment import tree_depth
+
+
+@pytest_asyncio.fixture
+async def thread_post(db_session: AsyncSession, test_user):
+    post = Post(user_id=test_user.id, content="thread", auto_reply_enabled=True)
+    db_session.add(post)
+    await db_session.commit()
+    return post
+
+
+async def _comment(db: AsyncSession, post: Post, parent: Comment | None = None, content: str = "c") -> Comment:
+    comment = Comment(post_id=post.id, user_id=post.user_id, parent_id=parent and parent.id, content=content)
+    db.add(comment)
+    await db.flush()
+    return comment
+
+
+class TestCommentTree:
+    """parent_id/path on comments and GET /comments/post/{post_id}/tree."""
+
+    @pytest.mark.asyncio
+    async def test_reply_via_api(self, client: AsyncClient, auth_headers, db_session, thread_post):
+        root = (await client.post(
+            "/comments/", json={"post_id": thread_post.id, "content": "root"}, headers=auth_headers
+        )).json()
+        assert root["parent_id"] is None
+        resp = await client.post(
+            "/comments/", json={"post_id": thread_post.id, "parent_id": root["id"], "content": "reply"},
+            headers=auth_headers,
+        )
+        assert resp.status_code == 200, resp.text
+        reply = resp.json()
+        assert reply["parent_id"] == root["id"]
+        path = (await db_session.execute(select(Comment.path).where(Comment.id == reply["id"]))).scalar_one()
+        assert path == [root["id"], reply["id"]]
+
+        # The parent must be on the same post
+        other = Post(user_id=thread_post.user_id, content="other")
+        db_session.add(other)
+        await db_session.commit()
+        resp = await client.post(
+            "/comments/", json={"post_id": other.id, "parent_id": root["id"], "content": "lost"},
+            headers=auth_headers,
+        )
+        assert resp.status_code == 404
+
+        resp = await client.post("/comments/bulk", headers=auth_headers, json=[
+            {"post_id": thread_post.id, "parent_id": reply["id"], "content": "nested"},
+            {"post_id": other.id, "parent_id": reply["id"], "content": "lost"},
+        ])
+        assert [r["status"] for r in resp.json()["results"]] == ["created", "parent_not_found"]
+
+    @pytest.mark.asyncio
+    async def test_tree_limits_and_subtree_pages(self, client: AsyncClient, db_session, thread_post, count_statements):
+        root = await _comment(db_session, thread_post, content="root")
+        children = [await _comment(db_session, thread_post, root, f"child{i}") for i in range(3)]
+        grandchild = await _comment(db_session, thread_post, children[0], "grandchild")
+        await _comment(db_session, thread_post, grandchild, "great-grandchild")
+        second_root = await _comment(db_session, thread_post, content="second root")
+        ids = {"root": root.id, "children": [c.id for c in children], "grandchild": grandchild.id,
+               "second_root": second_root.id}
+        await db_session.commit()
+
+        with count_statements() as statements:
+            resp = await client.get(
+                f"/comments/post/{thread_post.id}/tree", params={"limit": 1, "max_depth": 3, "max_children": 2}
+            )
+        assert resp.status_code == 200, resp.text
+        assert len(statements) == 1
+        [node] = resp.json()
+        assert (node["id"], node["depth"]) == (ids["root"], 1)
+        assert [child["id"] for child in node["replies"]] == ids["children"][:2]
+        # Breadth: the third child is left for the next page of the root's replies
+        assert node["more_replies"] and node["replies_cursor"]
+        [grand] = node["replies"][0]["replies"]
+        assert (grand["id"], grand["depth"]) == (ids["grandchild"], 3)
+        # Depth: the great-grandchild is not loaded, but its existence is flagged
+        assert grand["replies"] == [] and grand["more_replies"] and grand["replies_cursor"] is None
+        assert not node["replies"][1]["more_replies"]
+
+        resp = await client.get(f"/comments/post/{thread_post.id}/tree", params={
+            "limit": 1, "cursor": resp.headers["X-Next-Cursor"],
+        })
+        assert [n["id"] for n in resp.json()] == [ids["second_root"]]
+        assert "X-Next-Cursor" not in resp.headers
+
+        resp = await client.get(f"/comments/post/{thread_post.id}/tree", params={
+            "parent_id": ids["root"], "max_children": 2, "cursor": node["replies_cursor"],
+        })
+        assert [(n["id"], n["depth"]) for n in resp.json()] == [(ids["children"][2], 2)]
+
+        resp = await client.get(f"/comments/post/{thread_post.id}/tree", params={"parent_id": ids["grandchild"]})
+        assert [n["content"] for n in resp.json()] == ["great-grandchild"]
+
+    def test_depth_is_capped_by_node_budget(self, monkeypatch):
+        monkeypatch.setattr(comment_service, "COMMENT_TREE_MAX_NODES", 100)
+        # 10 + 50 fits; another level (250 more) does not
+        assert tree_depth(limit=10, max_children=5, max_depth=5) == 2
+        assert tree_depth(limit=10, max_children=1, max_depth=5) == 5
+
+    @pytest.mark.asyncio
+    async def test_auto_reply_answers_its_comment(self, db_session, thread_post, make_user):
+        commenter = await make_user()
+        comment = Comment(post_id=thread_post.id, user_id=commenter.id, content="question")
+        db_session.add(comment)
+        await db_session.commit()
+
+        await run_auto_reply({"comment_id": comment.id}, db_session)
+        await db_session.commit()
+        reply = (await db_session.execute(
+            select(Comment.parent_id, Comment.path).where(Comment.parent_id == comment.id)
+        )).one()
+        assert reply.path[0] == comment.id and len(reply.path) == 2
@@ -0,0 +1,109 @@
+# tests/test_comments_bulk.py
+
+import json
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.comment import Comment
+from app.models.job import Job
+from app.services.auto_reply import AUTO_REPLY_JOB
+
+
+@pytest_asyncio.fixture
+async def bulk_post(db_session: AsyncSession, make_post):
+    # Owned by someone else, so comments from test_user get auto-replies
+    post = await make_post(content="bulk", auto_reply_enabled=True, reply_delay_sec=30)
+    await db_session.commit()
+    return post
+
+
+class TestBulkComments:
+    """POST /comments/bulk: batched moderation, one INSERT, per-item results."""
+
+    @pytest.mark.asyncio
+    async def test_json_array(self, client: AsyncClient, auth_headers, db_session, bulk_post):
+        items = [
+            {"post_id": bulk_post.id, "content": "first"},
+            {"post_id": bulk_post.id, "content": "this is toxic"},
+            {"post_id": bulk_post.id},
+            {"post_id": 10**9, "content": "nowhere"},
+            {"post_id": bulk_post.id, "content": "last"},
+        ]
+        resp = await client.post("/comments/bulk", json=items, headers=auth_headers)
+        assert resp.status_code == 200, resp.text
+        data = resp.json()
+        assert (data["created"], data["blocked"], data["failed"]) == (3, 1, 2)
+        assert [r["status"] for r in data["results"]] == [
+            "created", "created", "invalid", "post_not_found", "created",
+        ]
+        assert [r["index"] for r in data["results"]] == list(range(5))
+        assert data["results"][1]["is_blocked"] is True
+        assert "content" in data["results"][2]["error"]
+
+        ids = [r["id"] for r in data["results"] if r["status"] == "created"]
+        rows = (await db_session.execute(
+            select(Comment.id, Comment.content).where(Comment.id.in_(ids)).order_by(Comment.id)
+        )).all()
+        assert [row.content for row in rows] == ["first", "this is toxic", "last"]
+        assert [row.id for row in rows] == ids
+
+        # Auto-replies only for the comments that were not blocked
+        jobs = (await db_session.execute(
+            select(Job.payload).where(Job.kind == AUTO_REPLY_JOB, Job.payload["comment_id"].as_integer().in_(ids))
+        )).scalars().all()
+        assert sorted(job["comment_id"] for job in jobs) == [ids[0], ids[2]]
+
+    @pytest.mark.asyncio
+    async def test_ndjson(self, client: AsyncClient, auth_headers, bulk_post):
+        body = "\n".join(
+            [json.dumps({"post_id": bulk_post.id, "content": f"line {i}"}) for i in range(3)] + ["", "{broken"]
+        )
+        resp = await client.post(
+            "/comments/bulk",
+            content=body.encode(),
+            headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+        )
+        assert resp.status_code == 200, resp.text
+        data = resp.json()
+        assert (data["created"], data["failed"]) == (3, 1)
+        assert data["results"][3]["status"] == "invalid"
+
+    @pytest.mark.asyncio
+    async def test_statement_count_does_not_grow_with_items(
+        self, client: AsyncClient, auth_headers, bulk_post, count_statements
+    ):
+        async def post(n: int):
+            items = [{"post_id": bulk_post.id, "content": f"count {n} {i}"} for i in range(n)]
+            return await client.post("/comments/bulk", json=items, headers=auth_headers)
+
+        await post(1)  # warm the principal cache
+        with count_statements() as small_statements:
+            small = await post(2)
+        with count_statements() as large_statements:
+            large = await post(50)
+        assert small.json()["created"] == 2
+        assert large.json()["created"] == 50
+        assert len(large_statements) == len(small_statements) == 3
+
+    @pytest.mark.asyncio
+    async def test_too_many_items(self, client: AsyncClient, auth_headers, bulk_post, monkeypatch):
+        monkeypatch.setattr("app.routers.comment.COMMENTS_BULK_MAX_ITEMS", 2)
+        items = [{"post_id": bulk_post.id, "content": str(i)} for i in range(3)]
+        resp = await client.post("/comments/bulk", json=items, headers=auth_headers)
+        assert resp.status_code == 413
+
+        resp = await client.post(
+            "/comments/bulk",
+            content="\n".join(json.dumps(item) for item in items).encode(),
+            headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+        )
+        assert resp.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_rejects_non_array(self, client: AsyncClient, auth_headers):
+        resp = await client.post("/comments/bulk", json={"post_id": 1, "content": "x"}, headers=auth_headers)
+        assert resp.status_code == 400
@@ -0,0 +1,74 @@
+# tests/test_export.py
+
+import csv
+import io
+import json
+from datetime import date, datetime, time, timezone
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.comment import Comment
+from app.services.export import comments_query, stream_rows
+
+
+@pytest_asyncio.fixture
+async def export_post(db_session: AsyncSession, make_post):
+    post = await make_post(content="export")
+    db_session.add_all(
+        Comment(post_id=post.id, user_id=post.user_id, content=f'c{i}, "quoted"\nline', is_blocked=i == 0,
+                created_at=datetime.combine(date(2005, 5, 1 + i), time(12), tzinfo=timezone.utc))
+        for i in range(5)
+    )
+    await db_session.commit()
+    return post
+
+
+class TestExport:
+    """GET /export/posts and /export/comments stream NDJSON or CSV."""
+
+    @pytest.mark.asyncio
+    async def test_comments_ndjson_with_filters(self, client: AsyncClient, auth_headers, export_post):
+        resp = await client.get("/export/comments", headers=auth_headers, params={
+            "post_id": export_post.id, "date_from": "2005-05-02", "date_to": "2005-05-04",
+        })
+        assert resp.status_code == 200, resp.text
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in resp.text.splitlines()]
+        assert [row["content"].split(",")[0] for row in rows] == ["c1", "c2", "c3"]
+        assert rows[0]["created_at"] == "2005-05-02T12:00:00+00:00"
+        assert set(rows[0]) == {"id", "post_id", "user_id", "parent_id", "content", "is_blocked", "created_at"}
+
+    @pytest.mark.asyncio
+    async def test_comments_csv(self, client: AsyncClient, auth_headers, export_post):
+        resp = await client.get("/export/comments", headers=auth_headers, params={
+            "format": "csv", "user_id": export_post.user_id,
+        })
+        assert resp.status_code == 200, resp.text
+        assert resp.headers["content-disposition"] == 'attachment; filename="comments.csv"'
+        rows = list(csv.DictReader(io.StringIO(resp.text)))
+        assert len(rows) == 5
+        assert rows[0]["content"] == 'c0, "quoted"\nline'
+        assert rows[0]["is_blocked"] == "True"
+
+    @pytest.mark.asyncio
+    async def test_posts_and_empty_result(self, client: AsyncClient, auth_headers, export_post):
+        resp = await client.get("/export/posts", headers=auth_headers, params={"user_id": export_post.user_id})
+        assert [json.loads(line)["id"] for line in resp.text.splitlines()] == [export_post.id]
+
+        resp = await client.get("/export/posts", headers=auth_headers, params={"format": "csv", "user_id": 10**9})
+        assert resp.text.splitlines() == [
+            "id,user_id,content,is_blocked,auto_reply_enabled,reply_delay_sec,created_at,"
+            "comment_count,blocked_comment_count"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_requires_auth(self, client: AsyncClient):
+        assert (await client.get("/export/comments")).status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_streams_in_batches(self, export_post):
+        chunks = [chunk async for chunk in stream_rows(comments_query(post_id=export_post.id), "ndjson", batch_size=2)]
+        assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
@@ -0,0 +1,106 @@
+# tests/test_feed.py
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.feeds import feed_cache
+from app.core.security import create_access_token
+from app.models.follow import Follow
+from app.services import feed as feed_service
+from app.services.feed import merge_feed
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def authors(db_session: AsyncSession, test_user, make_user, make_post):
+    """Three authors with interleaved posts; test_user follows the first two."""
+    users = [await make_user() for _ in range(3)]
+    posts = [
+        await make_post(users[i % 3], content=f"post {i}", is_blocked=i == 4, created_at=START + timedelta(minutes=i))
+        for i in range(12)
+    ]
+    db_session.add_all(Follow(follower_id=test_user.id, followee_id=user.id) for user in users[:2])
+    await db_session.commit()
+    feed_cache.clear()
+    return users, posts
+
+
+async def _read_feed(client: AsyncClient, headers: dict, limit: int) -> list[str]:
+    contents, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        resp = await client.get("/feed", params=params, headers=headers)
+        assert resp.status_code == 200, resp.text
+        contents += [post["content"] for post in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            return contents
+
+
+class TestFeed:
+    """Follows and GET /feed."""
+
+    @pytest.mark.asyncio
+    async def test_feed_merges_followed_authors(self, client: AsyncClient, auth_headers, authors, monkeypatch):
+        users, _ = authors
+        # Visible posts by the first two authors, newest first
+        expected = [f"post {i}" for i in reversed(range(12)) if i % 3 != 2 and i != 4]
+
+        assert await _read_feed(client, auth_headers, limit=3) == expected
+
+        # A small window and single-post runs: pages past the window and merge refills
+        feed_cache.clear()
+        monkeypatch.setattr(feed_cache, "size", 4)
+        monkeypatch.setattr(feed_service, "FEED_MERGE_CHUNK", 1)
+        assert await _read_feed(client, auth_headers, limit=3) == expected
+
+        resp = await client.get("/feed", headers=auth_headers)
+        assert resp.json()[0]["user_id"] == users[1].id
+
+    @pytest.mark.asyncio
+    async def test_merge_feed_before_cursor(self, db_session, authors):
+        users, posts = authors
+        keys, exhausted = await merge_feed(db_session, [user.id for user in users], 3, (posts[6].created_at, posts[6].id))
+        assert [key[1] for key in keys] == [posts[5].id, posts[3].id, posts[2].id]
+        assert not exhausted
+
+        keys, exhausted = await merge_feed(db_session, [users[0].id], 10)
+        assert [key[1] for key in keys] == [posts[i].id for i in (9, 6, 3, 0)]
+        assert exhausted
+
+    @pytest.mark.asyncio
+    async def test_new_posts_reach_cached_feeds(self, client: AsyncClient, auth_headers, authors, count_statements):
+        users, _ = authors
+        await client.get("/feed", headers=auth_headers)
+        author_headers = {"Authorization": f"Bearer {create_access_token(data={'sub': users[0].email})}"}
+
+        resp = await client.post("/posts/", json={"content": "fresh"}, headers=author_headers)
+        assert resp.status_code == 200, resp.text
+        with count_statements() as statements:
+            resp = await client.get("/feed", params={"limit": 2}, headers=auth_headers)
+        assert resp.json()[0]["content"] == "fresh"
+        # Warm window: only the page's posts are read
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_follow_and_unfollow(self, client: AsyncClient, auth_headers, test_user, authors):
+        users, _ = authors
+        assert (await client.put(f"/users/{test_user.id}/follow", headers=auth_headers)).status_code == 400
+        assert (await client.put("/users/999999999/follow", headers=auth_headers)).status_code == 404
+
+        before = await _read_feed(client, auth_headers, limit=50)
+        assert (await client.put(f"/users/{users[2].id}/follow", headers=auth_headers)).status_code == 204
+        # Following twice is not an error
+        assert (await client.put(f"/users/{users[2].id}/follow", headers=auth_headers)).status_code == 204
+        after = await _read_feed(client, auth_headers, limit=50)
+        assert len(after) == len(before) + 4
+
+        assert (await client.delete(f"/users/{users[0].id}/follow", headers=auth_headers)).status_code == 204
+        contents = await _read_feed(client, auth_headers, limit=50)
+        assert contents == [f"post {i}" for i in reversed(range(12)) if i % 3 != 0 and i != 4]
+
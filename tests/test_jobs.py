@@ -0,0 +1,89 @@
+# tests/test_jobs.py
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.core.db import AsyncSessionLocal
+from app.models.job import Job
+from app.services.jobs import JobWorker, enqueue_job, job_handler, on_commit
+
+HANDLED: list[dict] = []
+
+
+@job_handler("test_echo")
+async def _echo(payload: dict, db):
+    HANDLED.append(payload)
+
+
+@job_handler("test_boom")
+async def _boom(payload: dict, db):
+    raise RuntimeError("boom")
+
+
+@job_handler("test_on_commit")
+async def _with_callback(payload: dict, db):
+    async def callback():
+        HANDLED.append({"committed": payload["n"]})
+
+    on_commit(db, callback)
+    if payload.get("fail"):
+        raise RuntimeError("boom")
+
+
+async def _drain(worker: JobWorker):
+    await worker.run_once()
+    await asyncio.gather(*worker._running)
+
+
+async def _reload(job_id: int) -> Job:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(Job).where(Job.id == job_id))).scalar_one()
+
+
+class TestJobQueue:
+    """Postgres job queue: claim, run, retry."""
+
+    @pytest.mark.asyncio
+    async def test_job_runs_once(self, db_session):
+        job = await enqueue_job(db_session, "test_echo", {"n": 1})
+        await db_session.commit()
+
+        worker = JobWorker(concurrency=2)
+        await _drain(worker)
+        await _drain(worker)
+
+        assert HANDLED.count({"n": 1}) == 1
+        job = await _reload(job.id)
+        assert job.status == "done"
+        assert job.attempts == 1
+
+    @pytest.mark.asyncio
+    async def test_delayed_job_is_not_claimed_early(self, db_session):
+        job = await enqueue_job(db_session, "test_echo", {"n": 2}, delay_sec=3600)
+        await db_session.commit()
+
+        await _drain(JobWorker())
+        assert (await _reload(job.id)).status == "pending"
+
+    @pytest.mark.asyncio
+    async def test_failed_job_is_retried_with_backoff(self, db_session):
+        job = await enqueue_job(db_session, "test_boom", {}, max_attempts=2)
+        await db_session.commit()
+
+        await _drain(JobWorker())
+        job = await _reload(job.id)
+        assert job.status == "pending"
+        assert job.attempts == 1
+        assert "boom" in job.last_error
+
+    @pytest.mark.asyncio
+    async def test_on_commit_runs_only_after_success(self, db_session):
+        await enqueue_job(db_session, "test_on_commit", {"n": 3})
+        await enqueue_job(db_session, "test_on_commit", {"n": 4, "fail": True})
+        await db_session.commit()
+
+        await _drain(JobWorker())
+        assert {"committed": 3} in HANDLED
+        assert {"committed": 4} not in HANDLED
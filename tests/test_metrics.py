@@ -0,0 +1,71 @@
+# tests/test_metrics.py
+
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from prometheus_client.parser import text_string_to_metric_families
+
+
+async def _scrape(client: AsyncClient) -> dict[str, list]:
+    resp = await client.get("/metrics")
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"].startswith("text/plain")
+    return {family.name: family.samples for family in text_string_to_metric_families(resp.text)}
+
+
+def _value(samples: list, name: str, **labels) -> float:
+    return sum(
+        sample.value for sample in samples
+        if sample.name == name and all(sample.labels.get(k) == v for k, v in labels.items())
+    )
+
+
+class TestMetrics:
+    """GET /metrics: request, SQL, moderation, pool and queue metrics."""
+
+    @pytest.mark.asyncio
+    async def test_request_and_db_metrics_by_route(self, client: AsyncClient, auth_headers):
+        before = await _scrape(client)
+        post_id = (await client.post("/posts/", json={"content": "metrics"}, headers=auth_headers)).json()["id"]
+        await client.get(f"/posts/{post_id}", headers=auth_headers)
+        await client.get(f"/posts/{post_id + 1000000}", headers=auth_headers)
+        await client.get("/no/such/path")
+        after = await _scrape(client)
+
+        requests = "http_request_duration_seconds_count"
+        route = {"method": "GET", "route": "/posts/{post_id}"}
+        assert (
+            _value(after["http_request_duration_seconds"], requests, status="200", **route)
+            - _value(before.get("http_request_duration_seconds", []), requests, status="200", **route)
+        ) == 1
+        assert _value(after["http_request_duration_seconds"], requests, status="404", **route) >= 1
+        assert _value(after["http_request_duration_seconds"], requests, route="unmatched") >= 1
+
+        # One statement per request, each timed
+        queries = after["http_request_db_queries"]
+        created = {"method": "POST", "route": "/posts/"}
+        assert _value(queries, "http_request_db_queries_sum", **created) >= 1
+        assert _value(after["db_query_duration_seconds"], "db_query_duration_seconds_count",
+                      engine="primary", operation="INSERT") >= 1
+
+    @pytest.mark.asyncio
+    async def test_moderation_stages_and_snapshots(self, client: AsyncClient, auth_headers):
+        post_id = (await client.post("/posts/", json={"content": "metrics"}, headers=auth_headers)).json()["id"]
+        content = f"metrics {uuid.uuid4().hex}"
+        resp = await client.post("/comments/", json={"post_id": post_id, "content": content}, headers=auth_headers)
+        assert resp.status_code == 200, resp.text
+        metrics = await _scrape(client)
+
+        assert _value(metrics["moderation_call_duration_seconds"], "moderation_call_duration_seconds_count",
+                      call="check", outcome="ok") >= 1
+        assert _value(metrics["moderation_verdicts"], "moderation_verdicts_total", source="model") >= 1
+        for stage in ("moderation", "write", "invalidate"):
+            assert _value(metrics["app_stage_duration_seconds"], "app_stage_duration_seconds_count",
+                          stage=f"create_comment.{stage}") >= 1
+
+        assert _value(metrics["db_pool_size"], "db_pool_size", pool="primary") > 0
+        assert "db_pool_checkout_wait_seconds" in metrics
+        assert "app_moderation_cache_misses" in metrics
+        # Present even when empty; labelled per job kind once jobs exist
+        assert "job_queue_depth" in metrics
@@ -0,0 +1,225 @@
+# tests/test_moderation.py
+
+import asyncio
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.models.job import Job
+from app.models.post import Post
+from app.services import ai_moderation
+from app.services.blacklist import BlacklistMatcher
+from app.services.moderation_cache import VerdictCache, text_key
+from app.utils.lru import LRUTTLCache
+from app.services.moderation_engine import (
+    CircuitBreaker,
+    CircuitOpenError,
+    FakeBackend,
+    ModerationEngine,
+    build_batch_prompt,
+    parse_batch_answer,
+)
+from app.services.remoderation import REMODERATE_JOB, run_remoderation
+
+
+class TestModerationEngine:
+    """Async moderation engine against the offline fake backend."""
+
+    @pytest.mark.asyncio
+    async def test_single_verdicts(self):
+        engine = ModerationEngine(FakeBackend(latency_ms=1))
+        assert await engine.is_toxic("this is toxic") is True
+        assert await engine.is_toxic("hello there") is False
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        backend = FakeBackend(latency_ms=10)
+        engine = ModerationEngine(backend, max_concurrency=3)
+        await asyncio.gather(*(engine.is_toxic(f"text {i}") for i in range(20)))
+        assert backend.calls == 20
+        assert backend.max_in_flight <= 3
+
+    @pytest.mark.asyncio
+    async def test_timeout_fails_open(self):
+        engine = ModerationEngine(FakeBackend(latency_ms=500), timeout=0.01)
+        assert await engine.is_toxic("very toxic") is False
+        assert await engine.generate_reply("post", "comment") == "Thank you for your comment!"
+
+    @pytest.mark.asyncio
+    async def test_micro_batching_shares_one_call(self):
+        backend = FakeBackend(latency_ms=1)
+        engine = ModerationEngine(backend, max_batch_size=8, batch_window_ms=50)
+        texts = [f"comment {i}" + (" toxic" if i % 2 else "") for i in range(8)]
+        verdicts = await asyncio.gather(*(engine.is_toxic(text) for text in texts))
+        assert verdicts == [bool(i % 2) for i in range(8)]
+        assert backend.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_bulk_checks_batch_even_when_single(self):
+        backend = FakeBackend(latency_ms=1)
+        engine = ModerationEngine(backend, max_batch_size=1, bulk_batch_size=10, batch_window_ms=50)
+        texts = [f"import {i}" + (" toxic" if i % 3 == 0 else "") for i in range(25)]
+        verdicts = await asyncio.gather(*(engine.check(text, bulk=True) for text in texts))
+        assert verdicts == [i % 3 == 0 for i in range(25)]
+        assert backend.calls == 3
+
+    def test_batch_prompt_round_trip(self):
+        prompt = build_batch_prompt(["first\nline", "second"])
+        assert "1. first line" in prompt
+        assert "2. second" in prompt
+        assert parse_batch_answer("1: YES\n2: no\n7: YES", 3) == [True, False, None]
+
+
+class TestVerdictCache:
+    """Normalized-text verdict cache in front of the model."""
+
+    def test_lru_eviction_and_ttl(self):
+        cache = LRUTTLCache(maxsize=2, ttl=60)
+        cache.set("a", True)
+        cache.set("b", False)
+        cache.get("a")
+        cache.set("c", True)
+        assert cache.get("b") is None
+        assert cache.get("a") is True
+        assert cache.evictions == 1
+
+        cache.set("d", True, ttl=-1)
+        assert cache.get("d") is None
+
+    def test_key_normalization(self):
+        assert text_key("  Hello\n  WORLD ") == text_key("hello world")
+        assert text_key("hello") != text_key("hello!")
+
+    @pytest.mark.asyncio
+    async def test_identical_texts_reach_model_once(self):
+        backend = FakeBackend(latency_ms=5)
+        engine = ModerationEngine(backend)
+        cache = VerdictCache()
+        verdicts = await asyncio.gather(*(cache.get_or_compute("+1", engine.check) for _ in range(10)))
+        assert verdicts == [False] * 10
+        assert await cache.get_or_compute("  +1  ", engine.check) is False
+        assert backend.calls == 1
+        assert cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_verdicts_are_not_cached(self):
+        engine = ModerationEngine(FakeBackend(latency_ms=50), timeout=0.001)
+        cache = VerdictCache()
+        assert await cache.get_or_compute("something", engine.check) is None
+        assert len(cache.local) == 0
+
+    @pytest.mark.asyncio
+    async def test_shared_tier_is_reused_by_another_worker(self, setup_test_environment):
+        text = f"shared {uuid.uuid4().hex}"
+        first = FakeBackend(latency_ms=1)
+        await VerdictCache(shared=True).get_or_compute(text, ModerationEngine(first).check)
+
+        second = FakeBackend(latency_ms=1)
+        other_worker = VerdictCache(shared=True)
+        assert await other_worker.get_or_compute(text, ModerationEngine(second).check) is False
+        assert second.calls == 0
+        assert other_worker.stats()["hits_shared"] == 1
+
+
+class TestBlacklistMatcher:
+    """Compiled local word-list pre-filter."""
+
+    matcher = BlacklistMatcher(["bitch*", "cock", "*fuck*"])
+
+    @pytest.mark.parametrize(
+        "text",
+        ["You Bitch", "BITCHES", "b1tch", "FUUUCK", "motherfucker", "nice c0ck!", "bіtch", "bïtch"],
+    )
+    def test_blocks_variants(self, text):
+        assert self.matcher.is_match(text)
+
+    @pytest.mark.parametrize("text", ["peacock", "cocktail party", "Dickens", "hello there"])
+    def test_respects_word_boundaries(self, text):
+        assert not self.matcher.is_match(text)
+
+    def test_spans_point_into_original_text(self):
+        text = "Ça va, bïtch?"
+        [match] = self.matcher.find(text)
+        assert match.term == "bitch*"
+        assert text[match.start:match.end] == "bïtch"
+
+    def test_default_word_list_loads(self):
+        assert BlacklistMatcher.from_file().is_match("Whore")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Fail fast while the model is down, probe it back, and the fallback policies."""
+
+    @pytest.mark.asyncio
+    async def test_open_probe_and_close(self):
+        clock = Clock()
+        backend = FakeBackend(latency_ms=1, error_rate=1.0)
+        engine = ModerationEngine(backend, breaker=CircuitBreaker(3, 30.0, clock=clock))
+
+        for i in range(3):
+            assert await engine.check(f"failing {i}") is None
+        assert engine.breaker.state == "open" and backend.calls == 3
+        # Open: no call reaches the model
+        assert await engine.check("skipped") is None
+        assert await engine.generate_reply("post", "comment") == "Thank you for your comment!"
+        with pytest.raises(CircuitOpenError):
+            await engine.generate_reply("post", "comment", fallback=None)
+        assert backend.calls == 3 and engine.breaker.short_circuits == 3
+
+        # Half-open: a single probe goes through; a failed probe reopens at once
+        clock.now = 30.0
+        assert engine.breaker.state == "half_open"
+        assert await engine.check("probe") is None
+        assert engine.breaker.state == "open" and backend.calls == 4
+
+        clock.now = 60.0
+        backend.error_rate = 0.0
+        backend.latency_ms = 20
+        verdicts = await asyncio.gather(engine.check("probe toxic"), engine.check("meanwhile"))
+        assert verdicts == [True, None] and backend.calls == 5
+        assert engine.breaker.stats()["state"] == "closed"
+        assert await engine.check("hello") is False
+
+    @pytest.mark.asyncio
+    async def test_fallback_policies(self, client: AsyncClient, auth_headers, db_session, monkeypatch):
+        breaker = CircuitBreaker(1, 60.0)
+        breaker.record_failure()
+        monkeypatch.setattr(ai_moderation.engine, "breaker", breaker)
+
+        async def create(content: str) -> dict:
+            resp = await client.post("/posts/", json={"content": content}, headers=auth_headers)
+            assert resp.status_code == 200, resp.text
+            return resp.json()
+
+        monkeypatch.setattr(ai_moderation, "MODERATION_CHECK_FALLBACK", "closed")
+        assert (await create(f"unchecked {uuid.uuid4().hex}"))["is_blocked"] is True
+
+        monkeypatch.setattr(ai_moderation, "MODERATION_CHECK_FALLBACK", "queue")
+        post = await create(f"unchecked toxic {uuid.uuid4().hex}")
+        assert post["is_blocked"] is False
+        [payload] = (await db_session.execute(
+            select(Job.payload).where(Job.kind == REMODERATE_JOB, Job.payload["id"].as_integer() == post["id"])
+        )).scalars().all()
+
+        # Still down: the job fails and is retried later
+        with pytest.raises(RuntimeError):
+            await run_remoderation(payload, db_session)
+        breaker.record_success()
+        await run_remoderation(payload, db_session)
+        await db_session.commit()
+        assert (await db_session.execute(select(Post.is_blocked).where(Post.id == post["id"]))).scalar_one() is True
+
+        monkeypatch.setattr(ai_moderation, "MODERATION_REPLY_FALLBACK", "retry")
+        breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            await ai_moderation.generate_reply("post", "comment")
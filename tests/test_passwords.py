@@ -0,0 +1,80 @@
+# tests/test_passwords.py
+
+import asyncio
+import time
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.passwords import BCRYPT_ROUNDS, PasswordHasher
+from app.core.security import hash_password, verify_and_update_password, verify_password
+from app.models.user import User
+
+
+class TestPasswordHasher:
+    """bcrypt off the event loop, queue limit and rehash on login."""
+
+    @pytest.mark.asyncio
+    async def test_hashing_does_not_block_event_loop(self):
+        hasher = PasswordHasher(rounds=12, workers=2)
+        gaps: list[float] = []
+        done = asyncio.Event()
+
+        async def ticker():
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(0.005)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        tick = asyncio.create_task(ticker())
+        hashes = await asyncio.gather(*(hasher.hash(f"password{i}") for i in range(4)))
+        done.set()
+        await tick
+
+        assert await hasher.verify("password3", hashes[3])
+        hasher.close()
+        # One bcrypt call at cost 12 takes ~250 ms; the loop kept ticking meanwhile
+        assert max(gaps) < 0.1
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_rejected(self):
+        hasher = PasswordHasher(rounds=10, workers=1, max_queue=0)
+        results = await asyncio.gather(hasher.hash("a"), hasher.hash("b"), return_exceptions=True)
+        hasher.close()
+
+        rejected = [r for r in results if isinstance(r, HTTPException)]
+        assert len(rejected) == 1
+        assert rejected[0].status_code == 503
+        assert hasher.rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_verify_password_returns_bool(self):
+        hashed = await hash_password("secret123")
+        assert await verify_password("secret123", hashed) is True
+        assert await verify_password("wrong", hashed) is False
+        assert await verify_and_update_password("wrong", hashed) == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_login_rehashes_old_cost(self, client: AsyncClient, db_session):
+        email = f"rehash_{uuid.uuid4().hex[:8]}@example.com"
+        old_rounds = BCRYPT_ROUNDS + 1
+        user = User(email=email, hashed_password=await PasswordHasher(rounds=old_rounds).hash("secret123"))
+        db_session.add(user)
+        await db_session.commit()
+        assert user.hashed_password.startswith(f"$2b${old_rounds:02d}$")
+
+        resp = await client.post("/auth/login", data={"username": email, "password": "secret123"})
+        assert resp.status_code == 200, resp.text
+
+        stored = (await db_session.execute(
+            select(User.hashed_password).where(User.email == email)
+        )).scalar_one()
+        assert stored.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+
+        resp = await client.post("/auth/login", data={"username": email, "password": "wrong"})
+        assert resp.status_code == 401
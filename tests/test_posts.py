@@ -25,3 +25,31 @@ class TestPosts:
         payload = {"content": "Should fail"}
         resp = await client.post("/posts/", json=payload)
         assert resp.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_list_posts_keyset_pagination(self, client: AsyncClient, auth_headers: dict):
+        for i in range(5):
+            resp = await client.post("/posts/", json={"content": f"Post {i}"}, headers=auth_headers)
+            assert resp.status_code == 200, resp.text
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            resp = await client.get("/posts/", params=params, headers=auth_headers)
+            assert resp.status_code == 200, resp.text
+            page = resp.json()
+            assert len(page) <= 2
+            seen.extend(post["content"] for post in page)
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        # Newest first, every post exactly once
+        assert seen == [f"Post {i}" for i in reversed(range(5))]
+
+    @pytest.mark.asyncio
+    async def test_list_posts_rejects_bad_cursor(self, client: AsyncClient, auth_headers: dict):
+        resp = await client.get("/posts/", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+        assert resp.status_code == 400
+        resp = await client.get("/posts/", params={"limit": 10_000}, headers=auth_headers)
+        assert resp.status_code == 422
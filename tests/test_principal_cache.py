@@ -0,0 +1,80 @@
+# tests/test_principal_cache.py
+
+import time
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.core.db import engine
+from app.core.principals import cache_principal, principal_cache, principal_key
+from app.core.security import create_access_token, user_claims
+
+
+def _queries(statements: list[str]):
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    return before_cursor_execute
+
+
+class TestPrincipalCache:
+    """get_current_user serves repeat tokens from the principal cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_requests_skip_database(self, client: AsyncClient, test_user):
+        headers = {"Authorization": f"Bearer {create_access_token(user_claims(test_user))}"}
+        resp = await client.get("/auth/me", headers=headers)
+        assert resp.status_code == 200
+        assert principal_cache.get(principal_key(test_user.id)) is not None
+
+        statements: list[str] = []
+        listener = _queries(statements)
+        event.listen(engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            resp = await client.get("/auth/me", headers=headers)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", listener)
+        assert resp.status_code == 200
+        assert resp.json()["email"] == test_user.email
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_email_only_tokens_still_work(self, client: AsyncClient, test_user):
+        token = create_access_token({"sub": test_user.email})
+        resp = await client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert resp.status_code == 200
+        assert principal_cache.get(principal_key(email=test_user.email)) is not None
+
+    @pytest.mark.asyncio
+    async def test_user_change_invalidates_after_commit(self, client: AsyncClient, db_session, test_user):
+        old_email = test_user.email
+        for claims in (user_claims(test_user), {"sub": old_email}):
+            token = create_access_token(claims)
+            assert (await client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})).status_code == 200
+
+        test_user.email = f"renamed_{uuid.uuid4().hex[:8]}@example.com"
+        await db_session.flush()
+        # Still cached until the change is committed
+        assert principal_cache.get(principal_key(test_user.id)) is not None
+        await db_session.commit()
+        assert principal_cache.get(principal_key(test_user.id)) is None
+        assert principal_cache.get(principal_key(email=old_email)) is None
+
+        token = create_access_token(user_claims(test_user))
+        resp = await client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert resp.json()["email"] == test_user.email
+
+    @pytest.mark.asyncio
+    async def test_deleted_user_is_rejected(self, client: AsyncClient, db_session, test_user):
+        headers = {"Authorization": f"Bearer {create_access_token(user_claims(test_user))}"}
+        assert (await client.get("/auth/me", headers=headers)).status_code == 200
+
+        await db_session.delete(test_user)
+        await db_session.commit()
+        assert (await client.get("/auth/me", headers=headers)).status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_entry_does_not_outlive_token(self, test_user):
+        cache_principal(principal_key(test_user.id), test_user, expires_at=time.time() - 1)
+        assert principal_cache.get(principal_key(test_user.id)) is None
@@ -0,0 +1,196 @@
+# tests/test_query_plans.py
+# Query-plan regression suite: runs each hot service query, captures the SQL it
+# sends, and EXPLAINs it with sequential scans disabled. If the planner still
+# picks a Seq Scan (or walks a whole index whose leading column is not in the
+# index condition), no index can serve the query and the test fails.
+
+import json
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import engine
+from app.models.comment import Comment
+from app.services.comment import get_comment_tree, get_comments_by_post
+from app.services.comment_stats import get_daily_breakdown
+from app.services.feed import merge_feed
+from app.services.jobs import claim_jobs, enqueue_job
+from app.services.post import get_post, get_posts_by_user
+from app.services.search import search_comments, search_posts
+from app.services.user import get_user_by_email
+from app.utils.pagination import decode_cursor, decode_rank_cursor, encode_rank_cursor
+
+HOT_TABLES = {"users", "posts", "comments", "jobs"}
+
+
+@contextmanager
+def capture_sql():
+    statements: list[tuple[str, tuple]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+async def _leading_columns(conn) -> dict[str, str]:
+    result = await conn.execute(text("""
+        SELECT i.relname, a.attname
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = x.indkey[0]
+    """))
+    return dict(result.all())
+
+
+async def assert_no_seq_scan(statements: list[tuple[str, tuple]], plan_cache_mode: str = "force_generic_plan"):
+    queries = [
+        (sql, params) for sql, params in statements
+        if sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH"))
+    ]
+    assert queries, "no query captured"
+    async with engine.connect() as conn:
+        leading = await _leading_columns(conn)
+        await conn.execute(text("SET enable_seqscan = off"))
+        # Plan as a cached prepared statement would after a few executions
+        await conn.execute(text(f"SET plan_cache_mode = {plan_cache_mode}"))
+        try:
+            for sql, params in queries:
+                result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = result.scalar()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                for node in _plan_nodes(plan[0]["Plan"]):
+                    if node.get("Relation Name") not in HOT_TABLES and "Index Name" not in node:
+                        continue
+                    if node["Node Type"] == "Seq Scan":
+                        pytest.fail(f"Seq Scan on {node['Relation Name']} for query:\n{sql}")
+                    # With seq scans disabled the planner may instead walk a whole index
+                    # that does not lead with the filtered column
+                    if "Index Name" in node:
+                        cond = node.get("Index Cond", "")
+                        if leading.get(node["Index Name"], "") not in cond:
+                            pytest.fail(f"Full scan of {node['Index Name']} for query:\n{sql}")
+        finally:
+            await conn.execute(text("RESET plan_cache_mode"))
+            await conn.execute(text("RESET enable_seqscan"))
+
+
+@pytest_asyncio.fixture
+async def seeded(db_session: AsyncSession, make_user, make_post):
+    user = await make_user()
+    posts = [await make_post(user, content=f"post {i}") for i in range(20)]
+    db_session.add_all(
+        Comment(post_id=posts[i % 20].id, user_id=user.id, content=f"comment {i}", is_blocked=i % 7 == 0)
+        for i in range(200)
+    )
+    await db_session.commit()
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE users, posts, comments, jobs"))
+    return user, posts
+
+
+class TestQueryPlans:
+    """Hot service queries must be served by an index."""
+
+    @pytest.mark.asyncio
+    async def test_get_user_by_email(self, seeded, db_session):
+        user, _ = seeded
+        with capture_sql() as statements:
+            await get_user_by_email(user.email, db_session)
+        await assert_no_seq_scan(statements)
+
+    @pytest.mark.asyncio
+    async def test_list_posts_by_user(self, seeded, db_session):
+        user, _ = seeded
+        with capture_sql() as statements:
+            _, cursor = await get_posts_by_user(user.id, db_session, 5)
+            await get_posts_by_user(user.id, db_session, 5, decode_cursor(cursor))
+        await assert_no_seq_scan(statements)
+
+    @pytest.mark.asyncio
+    async def test_get_post(self, seeded, db_session):
+        user, posts = seeded
+        with capture_sql() as statements:
+            await get_post(posts[0].id, user.id, db_session)
+        await assert_no_seq_scan(statements)
+
+    @pytest.mark.asyncio
+    async def test_list_comments_by_post(self, seeded, db_session):
+        _, posts = seeded
+        with capture_sql() as statements:
+            _, cursor = await get_comments_by_post(posts[0].id, db_session, 3)
+            await get_comments_by_post(posts[0].id, db_session, 3, decode_cursor(cursor))
+        await assert_no_seq_scan(statements)
+
+    @pytest.mark.asyncio
+    async def test_comment_tree(self, seeded, db_session):
+        _, posts = seeded
+        with capture_sql() as statements:
+            await get_comment_tree(posts[0].id, db_session, 3, 3, 3)
+            await get_comment_tree(posts[0].id, db_session, 3, 3, 3, parent_id=posts[0].id, cursor=10)
+        await assert_no_seq_scan(statements)
+
+    @pytest.mark.asyncio
+    async def test_feed_merge(self, seeded, db_session):
+        user, posts = seeded
+        with capture_sql() as statements:
+            await merge_feed(db_session, [user.id, user.id + 1], 5)
+            await merge_feed(db_session, [user.id], 5, (posts[10].created_at, posts[10].id))
+        await assert_no_seq_scan(statements)
+
+    @pytest.mark.asyncio
+    async def test_comments_daily_breakdown(self, seeded, db_session):
+        with capture_sql() as statements:
+            await get_daily_breakdown(db_session, date(2020, 1, 1), date(2100, 1, 1))
+        await assert_no_seq_scan(statements)
+
+    @pytest.mark.asyncio
+    async def test_claim_jobs(self, seeded, db_session, monkeypatch):
+        # Due before any real job, so it is the one claimed; never committed, so no
+        # worker sees it and no real job changes state
+        job = await enqueue_job(db_session, "test_plan", {}, delay_sec=-10**6)
+        await db_session.flush()
+        monkeypatch.setattr(db_session, "commit", db_session.flush)
+        with capture_sql() as statements:
+            [claimed] = await claim_jobs(db_session, 1)
+        assert claimed.id == job.id
+        await db_session.rollback()
+        await assert_no_seq_scan(statements)
+
+    @pytest.mark.asyncio
+    async def test_search(self, seeded, db_session):
+        user, posts = seeded
+        # Rare terms ("17" is in one comment and one post) must come from the GIN index;
+        # search is always planned for its own terms
+        with capture_sql() as statements:
+            await search_comments(db_session, "17", 3)
+            await search_comments(db_session, "17", 3, decode_rank_cursor(encode_rank_cursor(0.5, 10**9)), posts[0].id)
+            await search_posts(db_session, "17", 3, user_id=user.id)
+        await assert_no_seq_scan(statements, plan_cache_mode="force_custom_plan")
+
+    @pytest.mark.asyncio
+    async def test_user_delete_cascade_lookups(self, seeded):
+        user, _ = seeded
+        # What ON DELETE CASCADE runs for each deleted user
+        statements = [
+            ("SELECT 1 FROM comments WHERE user_id = $1", (user.id,)),
+            ("SELECT 1 FROM posts WHERE user_id = $1", (user.id,)),
+            ("SELECT 1 FROM comments WHERE post_id = $1", (user.id,)),
+            # ... and for each deleted comment's replies
+            ("SELECT 1 FROM comments WHERE parent_id = $1", (user.id,)),
+        ]
+        await assert_no_seq_scan(statements)
@@ -0,0 +1,93 @@
+# tests/test_rate_limit.py
+
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException, Request
+from httpx import AsyncClient
+
+from app.core import rate_limit
+from app.core.rate_limit import AdmissionLimit, MemoryBucketStore, RateLimiter
+from app.core.security import create_access_token
+from app.services import ai_moderation
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRateLimit:
+    """Token buckets per user and address, and admission in front of the model."""
+
+    @pytest.mark.asyncio
+    async def test_token_bucket(self):
+        clock = Clock()
+        store = MemoryBucketStore(clock=clock)
+        user, ip = ("user", 1.0, 2.0), ("ip", 0.5, 10.0)
+
+        assert await store.take([user, ip], 1) == 0
+        assert await store.take([user, ip], 1) == 0
+        assert await store.take([user, ip], 1) == pytest.approx(1.0)
+        # All or nothing: the refused request left the address bucket alone
+        assert store.buckets.get("ip")[0] == 8
+
+        clock.now = 0.5
+        assert await store.take([user], 1) == pytest.approx(0.5)
+        clock.now = 1.0
+        assert await store.take([user], 1) == 0
+        # A cost above the capacity spends the whole (full) bucket
+        clock.now = 10.0
+        assert await store.take([user], 5) == 0
+        assert await store.take([user], 1) == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_write_endpoints_are_limited(self, client: AsyncClient, auth_headers, db_session, make_user, monkeypatch):
+        limiter = RateLimiter(MemoryBucketStore(), user_per_min=1, user_burst=2, ip_per_min=1, ip_burst=3)
+        monkeypatch.setattr(rate_limit, "rate_limiter", limiter)
+
+        for i in range(2):
+            resp = await client.post("/posts/", json={"content": f"limited {i}"}, headers=auth_headers)
+            assert resp.status_code == 200, resp.text
+        resp = await client.post("/comments/", json={"post_id": resp.json()["id"], "content": "x"}, headers=auth_headers)
+        assert resp.status_code == 429
+        assert int(resp.headers["Retry-After"]) >= 1
+
+        # Another user from the same address has one token left there
+        other = await make_user()
+        await db_session.commit()
+        other_headers = {"Authorization": f"Bearer {create_access_token(data={'sub': other.email})}"}
+        assert (await client.post("/posts/", json={"content": "a"}, headers=other_headers)).status_code == 200
+        assert (await client.post("/posts/", json={"content": "b"}, headers=other_headers)).status_code == 429
+        assert limiter.stats()["limited"] == 2
+
+    @pytest.mark.asyncio
+    async def test_store_failure_lets_requests_through(self):
+        class BrokenStore(MemoryBucketStore):
+            async def take(self, buckets, cost):
+                raise ConnectionError("store down")
+
+        limiter = RateLimiter(BrokenStore())
+        await limiter.check(Request({"type": "http", "headers": [], "client": ("10.0.0.1", 1234)}), 1)
+        assert limiter.errors == 1
+
+    @pytest.mark.asyncio
+    async def test_saturated_moderation_is_refused(self, client: AsyncClient, auth_headers, monkeypatch):
+        admission = AdmissionLimit(1)
+        monkeypatch.setattr(ai_moderation, "moderation_admission", admission)
+        texts = [f"admission {uuid.uuid4().hex}" for _ in range(2)]
+
+        results = await asyncio.gather(*(ai_moderation.is_text_toxic(text) for text in texts), return_exceptions=True)
+        [refused] = [r for r in results if isinstance(r, HTTPException)]
+        assert refused.status_code == 429 and refused.headers["Retry-After"] == "1"
+        assert admission.stats() == {"pending": 0, "admitted": 1, "rejected": 1}
+
+        # Cached verdicts and the blacklist need no slot
+        monkeypatch.setattr(admission, "max_pending", 0)
+        assert await ai_moderation.is_text_toxic(texts[results.index(False)]) is False
+        resp = await client.post("/posts/", json={"content": f"new {uuid.uuid4().hex}"}, headers=auth_headers)
+        assert resp.status_code == 429
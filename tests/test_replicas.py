@@ -0,0 +1,61 @@
+# tests/test_replicas.py
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import DATABASE_URL, create_engine_from_settings, engine
+from app.core.replicas import ReplicaRouter, RoutingSession
+from app.models.user import User
+
+
+@pytest.fixture
+def replicas():
+    # Two "replicas" pointing at the test database are enough to check the routing
+    engines = {
+        "r0": create_engine_from_settings(DATABASE_URL, "test_r0"),
+        "r1": create_engine_from_settings(DATABASE_URL, "test_r1"),
+    }
+    yield engines
+
+
+class TestReplicaRouting:
+    """Replica selection, health checks and primary fallback."""
+
+    def test_round_robin(self, replicas):
+        router = ReplicaRouter(replicas, strategy="round_robin")
+        assert [router.pick().name for _ in range(4)] == ["r0", "r1", "r0", "r1"]
+
+    def test_falls_back_to_primary_when_all_down(self, replicas):
+        router = ReplicaRouter(replicas)
+        for replica in router.replicas:
+            router.mark_down(replica, "down")
+        assert router.pick() is None
+
+    @pytest.mark.asyncio
+    async def test_health_check(self, replicas, setup_test_environment):
+        missing_db = make_url(DATABASE_URL).set(database="missing_db_for_tests")
+        broken = create_engine_from_settings(missing_db.render_as_string(hide_password=False), "test_broken")
+        router = ReplicaRouter({**replicas, "broken": broken})
+        await router.check_all()
+        status = {row["name"]: row for row in router.status()}
+        assert status["r0"]["healthy"] and status["r0"]["lag_sec"] == 0
+        assert not status["broken"]["healthy"]
+        assert [router.pick().name for _ in range(3)] == ["r0", "r1", "r0"]
+
+    def test_reads_go_to_replica_writes_to_primary(self, replicas):
+        router = ReplicaRouter(replicas)
+        replica = router.pick()
+        session = RoutingSession(bind=engine.sync_engine, replica=replica)
+        assert session.get_bind(clause=select(User)) is replica.engine.sync_engine
+        assert session.get_bind(clause=text("SELECT 1")) is replica.engine.sync_engine
+        assert session.get_bind(clause=update(User).values(email="x")) is engine.sync_engine
+        assert session.get_bind(clause=select(User).with_for_update()) is engine.sync_engine
+        assert RoutingSession(bind=engine.sync_engine).get_bind(clause=select(User)) is engine.sync_engine
+
+    @pytest.mark.asyncio
+    async def test_routed_session_queries(self, replicas, setup_test_environment):
+        router = ReplicaRouter(replicas)
+        async with AsyncSession(bind=engine, sync_session_class=RoutingSession, replica=router.pick()) as session:
+            assert (await session.execute(text("SELECT 1"))).scalar() == 1
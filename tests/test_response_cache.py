@@ -0,0 +1,192 @@
+# tests/test_response_cache.py
+
+import time
+from contextlib import contextmanager
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import MemoryBackend, RedisBackend, response_cache
+from app.core.db import DATABASE_URL, create_engine_from_settings, engine
+from app.core.replicas import ReplicaState, RoutingSession, get_read_db
+from app.main import app
+from app.schemas.post import PostCreate
+from app.services.post import delete_post, update_post
+
+
+class FakeRedis:
+    """The slice of redis.asyncio.Redis that RedisBackend uses."""
+
+    def __init__(self):
+        self.data: dict[str, tuple[float | None, bytes]] = {}
+
+    def _get(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    async def mget(self, keys):
+        return [self._get(key) for key in keys]
+
+    async def set(self, key, value, px=None, nx=False):
+        if nx and self._get(key) is not None:
+            return None
+        self.data[key] = (None if px is None else time.monotonic() + px / 1000, value)
+        return True
+
+    async def aclose(self):
+        pass
+
+
+class BrokenBackend(MemoryBackend):
+    async def get_many(self, keys):
+        raise ConnectionError("cache down")
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache_backend(request, monkeypatch):
+    backend = MemoryBackend() if request.param == "memory" else RedisBackend(FakeRedis())
+    monkeypatch.setattr(response_cache, "backend", backend)
+    return backend
+
+
+@pytest_asyncio.fixture
+async def post_id(client: AsyncClient, auth_headers: dict) -> int:
+    resp = await client.post("/posts/", json={"content": "Cached post"}, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    return resp.json()["id"]
+
+
+@contextmanager
+def capture_sql():
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestResponseCache:
+    """Response cache on public listings: hits, ETags and tag invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_database(self, cache_backend, client: AsyncClient, post_id: int):
+        url = f"/comments/post/{post_id}"
+        first = await client.get(url)
+        assert first.status_code == 200
+        assert first.headers["X-Cache"] == "MISS"
+
+        with capture_sql() as statements:
+            second = await client.get(url)
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.content == first.content
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_if_none_match_returns_304(self, cache_backend, client: AsyncClient, post_id: int):
+        url = f"/comments/post/{post_id}"
+        etag = (await client.get(url)).headers["ETag"]
+
+        resp = await client.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["ETag"] == etag
+
+        resp = await client.get(url, headers={"If-None-Match": '"something-else"'})
+        assert resp.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_new_comment_invalidates_listing(
+        self, cache_backend, client: AsyncClient, auth_headers: dict, post_id: int
+    ):
+        url = f"/comments/post/{post_id}"
+        before = await client.get(url)
+        assert before.json() == []
+
+        resp = await client.post("/comments/", json={"post_id": post_id, "content": "Nice"}, headers=auth_headers)
+        assert resp.status_code == 200, resp.text
+
+        after = await client.get(url, headers={"If-None-Match": before.headers["ETag"]})
+        assert after.status_code == 200
+        assert after.headers["X-Cache"] == "MISS"
+        assert [c["content"] for c in after.json()] == ["Nice"]
+
+    @pytest.mark.asyncio
+    async def test_post_writes_invalidate(
+        self, cache_backend, client: AsyncClient, db_session, test_user, post_id: int
+    ):
+        listing = f"/comments/post/{post_id}"
+        stats = "/api/comments-daily-breakdown?date_from=2020-01-01&date_to=2100-01-01"
+        await client.get(listing)
+        await client.get(stats)
+
+        await update_post(post_id, test_user.id, PostCreate(content="Edited"), db_session)
+        assert (await client.get(listing)).headers["X-Cache"] == "MISS"
+        assert (await client.get(stats)).headers["X-Cache"] == "HIT"
+
+        await delete_post(post_id, test_user.id, db_session)
+        assert (await client.get(listing)).headers["X-Cache"] == "MISS"
+        assert (await client.get(stats)).headers["X-Cache"] == "MISS"
+
+    @pytest.mark.asyncio
+    async def test_backend_failure_falls_back_to_database(self, monkeypatch, client: AsyncClient, post_id: int):
+        monkeypatch.setattr(response_cache, "backend", BrokenBackend())
+        resp = await client.get(f"/comments/post/{post_id}")
+        assert resp.status_code == 200
+        assert resp.headers["X-Cache"] == "BYPASS"
+        assert "ETag" in resp.headers
+
+    @pytest.mark.asyncio
+    async def test_lagging_replica_does_not_fill_cache(
+        self, cache_backend, client: AsyncClient, auth_headers: dict, post_id: int
+    ):
+        url = f"/comments/post/{post_id}"
+        assert (await client.get(url)).json() == []
+
+        # The "replica" reads the primary as of this snapshot, i.e. before the comment below
+        async with engine.connect() as snapshot_conn:
+            await snapshot_conn.execution_options(isolation_level="REPEATABLE READ")
+            snapshot = (await snapshot_conn.execute(text("SELECT pg_export_snapshot()"))).scalar()
+            lagging = create_engine_from_settings(DATABASE_URL, "test_lagging").execution_options(
+                isolation_level="REPEATABLE READ"
+            )
+
+            @event.listens_for(lagging.sync_engine, "begin")
+            def use_snapshot(conn):
+                conn.exec_driver_sql(f"SET TRANSACTION SNAPSHOT '{snapshot}'")
+
+            async def read_from_lagging_replica():
+                replica = ReplicaState("lagging", lagging)
+                async with AsyncSession(bind=engine, sync_session_class=RoutingSession, replica=replica) as session:
+                    yield session
+
+            app.dependency_overrides[get_read_db] = read_from_lagging_replica
+            try:
+                resp = await client.post("/comments/", json={"post_id": post_id, "content": "Nice"}, headers=auth_headers)
+                assert resp.status_code == 200, resp.text
+                async with lagging.connect() as conn:
+                    stale = (await conn.execute(
+                        text("SELECT COUNT(*) FROM comments WHERE post_id = :id"), {"id": post_id}
+                    )).scalar()
+                assert stale == 0
+
+                miss = await client.get(url)
+                hit = await client.get(url)
+            finally:
+                await lagging.dispose()
+        assert miss.headers["X-Cache"] == "MISS" and hit.headers["X-Cache"] == "HIT"
+        assert [c["content"] for c in hit.json()] == ["Nice"]
@@ -0,0 +1,119 @@
+# tests/test_round_trips.py
+# SQL statements per endpoint. A write is one statement (INSERT/UPDATE ... RETURNING),
+# never a write followed by a refresh SELECT.
+
+import uuid
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import Job
+from app.schemas.post import PostCreate
+from app.services.auto_reply import AUTO_REPLY_JOB
+from app.services.post import create_post, delete_post, update_post
+
+
+@pytest_asyncio.fixture
+async def warm_client(client: AsyncClient, auth_headers):
+    # The first authenticated request loads the principal; later ones hit the cache
+    assert (await client.get("/auth/me", headers=auth_headers)).status_code == 200
+    return client
+
+
+@pytest_asyncio.fixture
+async def auto_reply_post(db_session: AsyncSession, make_post):
+    post = await make_post(content="replies", auto_reply_enabled=True, reply_delay_sec=30)
+    await db_session.commit()
+    return post
+
+
+class TestRoundTrips:
+    """Statement budgets of the API endpoints (BEGIN/COMMIT not counted)."""
+
+    @pytest.mark.asyncio
+    async def test_register_and_login(self, client: AsyncClient, count_statements):
+        credentials = {"email": f"trips_{uuid.uuid4().hex[:8]}@example.com", "password": "password123"}
+        with count_statements() as statements:
+            resp = await client.post("/auth/register", json=credentials)
+        assert resp.status_code == 200, resp.text
+        assert resp.json()["id"]
+        # Existence check, INSERT
+        assert len(statements) == 2
+
+        with count_statements() as statements:
+            resp = await client.post(
+                "/auth/login", data={"username": credentials["email"], "password": credentials["password"]}
+            )
+        assert resp.status_code == 200, resp.text
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_posts(self, warm_client: AsyncClient, auth_headers, count_statements):
+        with count_statements() as statements:
+            resp = await warm_client.post("/posts/", json={"content": "budget"}, headers=auth_headers)
+        assert resp.status_code == 200, resp.text
+        assert resp.json()["created_at"] and resp.json()["comment_count"] == 0
+        assert len(statements) == 1
+        post_id = resp.json()["id"]
+
+        with count_statements() as statements:
+            assert (await warm_client.get(f"/posts/{post_id}", headers=auth_headers)).status_code == 200
+        assert len(statements) == 1
+
+        with count_statements() as statements:
+            assert (await warm_client.get("/posts/", headers=auth_headers)).status_code == 200
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_update_and_delete_post(self, db_session, test_user, count_statements):
+        post_id = (await create_post(test_user.id, PostCreate(content="to edit"), db_session)).id
+
+        with count_statements() as statements:
+            post = await update_post(post_id, test_user.id, PostCreate(content="edited", reply_delay_sec=3), db_session)
+        assert (post.content, post.reply_delay_sec) == ("edited", 3)
+        assert len(statements) == 1
+
+        with count_statements() as statements:
+            await delete_post(post_id, test_user.id, db_session)
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_create_comment(
+        self, warm_client: AsyncClient, auth_headers, db_session, auto_reply_post, count_statements
+    ):
+        with count_statements() as statements:
+            resp = await warm_client.post(
+                "/comments/", json={"post_id": auto_reply_post.id, "content": "hello"}, headers=auth_headers
+            )
+        assert resp.status_code == 200, resp.text
+        assert resp.json()["created_at"]
+        # Comment with the post's auto-reply settings, then the auto-reply job
+        assert len(statements) == 2
+
+        jobs = (await db_session.execute(
+            select(Job.payload).where(Job.kind == AUTO_REPLY_JOB, Job.payload["comment_id"].as_integer() == resp.json()["id"])
+        )).scalars().all()
+        assert len(jobs) == 1
+
+        auto_reply_post.auto_reply_enabled = False
+        await db_session.commit()
+        with count_statements() as statements:
+            resp = await warm_client.post(
+                "/comments/", json={"post_id": auto_reply_post.id, "content": "again"}, headers=auth_headers
+            )
+        assert resp.status_code == 200, resp.text
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_list_comments(self, client: AsyncClient, auto_reply_post, count_statements):
+        with count_statements() as statements:
+            assert (await client.get(f"/comments/post/{auto_reply_post.id}")).status_code == 200
+        assert len(statements) == 1
+
+        # Served from the response cache
+        with count_statements() as statements:
+            assert (await client.get(f"/comments/post/{auto_reply_post.id}")).status_code == 200
+        assert len(statements) == 0
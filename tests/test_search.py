@@ -0,0 +1,85 @@
+# tests/test_search.py
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.comment import Comment
+
+
+@pytest_asyncio.fixture
+async def search_post(db_session: AsyncSession, test_user, make_user, make_post):
+    other = await make_user()
+    post = await make_post(test_user, content="Gardening notes: growing tomatoes on a balcony")
+    await make_post(test_user, content="Tomato soup recipe")
+    await make_post(other, content="Someone else's tomatoes")
+    db_session.add_all([
+        Comment(post_id=post.id, user_id=other.id, content="Tomatoes need sun. Lots of sun, tomatoes love it"),
+        Comment(post_id=post.id, user_id=other.id, content="My tomato plants died"),
+        Comment(post_id=post.id, user_id=other.id, content="tomatoes are for idiots", is_blocked=True),
+        Comment(post_id=post.id, user_id=other.id, content="Try peppers instead"),
+    ])
+    await db_session.commit()
+    return post
+
+
+class TestSearch:
+    """GET /search/posts and /search/comments: stemming, ranking, blocked content, paging."""
+
+    @pytest.mark.asyncio
+    async def test_comments_ranked_and_stemmed(self, client: AsyncClient, search_post):
+        resp = await client.get("/search/comments", params={"q": "tomato", "post_id": search_post.id})
+        assert resp.status_code == 200, resp.text
+        # "tomatoes" matches "tomato"; two mentions outrank one; blocked is hidden
+        assert [c["content"] for c in resp.json()] == [
+            "Tomatoes need sun. Lots of sun, tomatoes love it",
+            "My tomato plants died",
+        ]
+
+        resp = await client.get("/search/comments", params={
+            "q": "tomato", "post_id": search_post.id, "include_blocked": True,
+        })
+        assert len(resp.json()) == 3
+
+    @pytest.mark.asyncio
+    async def test_websearch_syntax(self, client: AsyncClient, search_post):
+        resp = await client.get("/search/comments", params={"q": "tomato -sun", "post_id": search_post.id})
+        assert [c["content"] for c in resp.json()] == ["My tomato plants died"]
+        resp = await client.get("/search/comments", params={"q": "peppers or died", "post_id": search_post.id})
+        assert len(resp.json()) == 2
+
+    @pytest.mark.asyncio
+    async def test_keyset_pages(self, client: AsyncClient, search_post):
+        params = {"q": "tomato", "post_id": search_post.id, "include_blocked": True, "limit": 2}
+        first = await client.get("/search/comments", params=params)
+        assert len(first.json()) == 2
+        cursor = first.headers["X-Next-Cursor"]
+        second = await client.get("/search/comments", params={**params, "cursor": cursor})
+        assert len(second.json()) == 1
+        assert "X-Next-Cursor" not in second.headers
+        ids = [c["id"] for c in first.json() + second.json()]
+        assert len(set(ids)) == 3
+
+        bad = await client.get("/search/comments", params={**params, "cursor": "nope"})
+        assert bad.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_posts_are_own_only(self, client: AsyncClient, auth_headers, search_post):
+        resp = await client.get("/search/posts", params={"q": "tomatoes"}, headers=auth_headers)
+        assert resp.status_code == 200, resp.text
+        # Equal ranks fall back to id, newest first
+        assert [p["content"] for p in resp.json()] == [
+            "Tomato soup recipe",
+            "Gardening notes: growing tomatoes on a balcony",
+        ]
+        assert (await client.get("/search/posts", params={"q": "tomatoes"})).status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_search_vector_follows_edits(self, client: AsyncClient, auth_headers, db_session, search_post):
+        search_post.content = "Now about cucumbers"
+        await db_session.commit()
+        resp = await client.get("/search/posts", params={"q": "cucumber"}, headers=auth_headers)
+        assert [p["id"] for p in resp.json()] == [search_post.id]
+        resp = await client.get("/search/posts", params={"q": "balcony"}, headers=auth_headers)
+        assert resp.json() == []
@@ -0,0 +1,60 @@
+# tests/test_serialization.py
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from pydantic import TypeAdapter
+from sqlalchemy import literal, select
+
+from app.models.comment import Comment
+from app.models.post import Post
+from app.schemas.comment import CommentRead
+from app.schemas.post import PostRead
+from app.services import comment as comment_service
+from app.services import post as post_service
+from app.utils.serialization import RowEncoder
+
+
+class TestRowEncoder:
+    """List endpoints encode rows with orjson instead of Pydantic models."""
+
+    @pytest.mark.asyncio
+    async def test_matches_pydantic_output(self, db_session, test_user):
+        created_at = datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        posts = [
+            Post(user_id=test_user.id, content="ünïcödé \"quoted\" \n 🚀", created_at=created_at),
+            Post(user_id=test_user.id, content="plain", is_blocked=True, created_at=created_at + timedelta(seconds=1)),
+        ]
+        db_session.add_all(posts)
+        await db_session.flush()
+        db_session.add(Comment(post_id=posts[0].id, user_id=test_user.id, content="c"))
+        await db_session.commit()
+
+        rows = (await db_session.execute(
+            select(*post_service.LIST_COLUMNS).where(Post.user_id == test_user.id).order_by(Post.id)
+        )).fetchall()
+        expected = TypeAdapter(list[PostRead]).dump_json([PostRead.model_validate(row) for row in rows])
+        assert RowEncoder(PostRead).encode(rows) == expected
+
+        # Extra columns are ignored, missing optional ones take their default
+        columns = [c for c in comment_service.LIST_COLUMNS if c.key != "parent_id"]
+        rows = (await db_session.execute(
+            select(literal(0.5).label("rank"), *reversed(columns)).where(Comment.post_id == posts[0].id)
+        )).fetchall()
+        expected = TypeAdapter(list[CommentRead]).dump_json([CommentRead.model_validate(row) for row in rows])
+        assert RowEncoder(CommentRead).encode(rows) == expected
+        assert RowEncoder(CommentRead).encode([]) == b"[]"
+
+        with pytest.raises(ValueError):
+            RowEncoder(PostRead).encode(rows)
+
+    @pytest.mark.asyncio
+    async def test_list_endpoint_keeps_cursor(self, client: AsyncClient, auth_headers, db_session, test_user):
+        db_session.add_all(Post(user_id=test_user.id, content=f"page {i}") for i in range(3))
+        await db_session.commit()
+
+        resp = await client.get("/posts/", params={"limit": 2}, headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/json"
+        assert len(resp.json()) == 2 and resp.headers["X-Next-Cursor"]
@@ -0,0 +1,142 @@
+# tests/test_tokens.py
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jose import JWTError, jwt
+
+from app.core.tokens import KeySet, KeySetFile, SigningKey, TokenService
+
+
+def _pem_pair(private_key) -> tuple[str, str]:
+    private = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private, public
+
+
+def _write_keyset(path, active_kid: str, keys: list[dict]) -> None:
+    path.write_text(json.dumps({"active_kid": active_kid, "keys": keys}))
+    # Make sure the reload sees a new mtime even on coarse filesystems
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _claims(minutes: int = 5) -> dict:
+    return {"sub": "a@example.com", "uid": 1, "exp": datetime.now(timezone.utc) + timedelta(minutes=minutes)}
+
+
+@pytest.fixture(scope="module")
+def rsa_pem():
+    return _pem_pair(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+
+
+@pytest.fixture(scope="module")
+def ed25519_pem():
+    return _pem_pair(ed25519.Ed25519PrivateKey.generate())
+
+
+class TestTokenService:
+    """Verified-token memo and kid-indexed keysets."""
+
+    def test_repeat_token_is_verified_once(self):
+        service = TokenService(KeySet.from_secret("s3cret", "HS256"))
+        token = service.encode(_claims())
+        assert "kid" not in jwt.get_unverified_header(token)
+
+        for _ in range(3):
+            assert service.decode(token)["sub"] == "a@example.com"
+        assert (service.misses, service.hits) == (1, 2)
+
+    def test_expired_and_tampered_tokens_are_rejected(self):
+        service = TokenService(KeySet.from_secret("s3cret", "HS256"))
+        with pytest.raises(JWTError):
+            service.decode(service.encode(_claims(minutes=-1)))
+        token = service.encode(_claims())
+        with pytest.raises(JWTError):
+            service.decode(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
+        with pytest.raises(JWTError):
+            service.decode(jwt.encode(_claims(), "other", algorithm="HS256"))
+
+    @pytest.mark.parametrize("alg", ["RS256", "EdDSA"])
+    def test_asymmetric_keys(self, tmp_path, alg, rsa_pem, ed25519_pem):
+        private, public = rsa_pem if alg == "RS256" else ed25519_pem
+        (tmp_path / "key.pem").write_text(private)
+        path = tmp_path / "keyset.json"
+        _write_keyset(path, "k1", [{"kid": "k1", "alg": alg, "private_key": "key.pem", "public_key": public}])
+
+        service = TokenService(KeySetFile(path))
+        token = service.encode(_claims())
+        assert jwt.get_unverified_header(token) == {"alg": alg, "typ": "JWT", "kid": "k1"}
+        assert service.decode(token)["uid"] == 1
+
+        # A verify-only copy of the keyset accepts it too
+        _write_keyset(path, "k1", [{"kid": "k1", "alg": alg, "public_key": public}])
+        verifier = TokenService(KeySetFile(path))
+        assert verifier.decode(token)["uid"] == 1
+        with pytest.raises(RuntimeError):
+            verifier.encode(_claims())
+        with pytest.raises(JWTError):
+            verifier.decode(service.encode(_claims(minutes=-1)))
+
+    def test_token_cannot_pick_its_algorithm(self, tmp_path, rsa_pem):
+        private, public = rsa_pem
+        path = tmp_path / "keyset.json"
+        _write_keyset(path, "k1", [{"kid": "k1", "alg": "RS256", "private_key": private}])
+        service = TokenService(KeySetFile(path))
+        # HS256 signed with the public key, the classic confusion attack
+        header = _b64(json.dumps({"alg": "HS256", "typ": "JWT", "kid": "k1"}).encode())
+        payload = _b64(json.dumps({"sub": "a@example.com", "uid": 1}).encode())
+        signature = hmac.new(public.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+        forged = f"{header}.{payload}.{_b64(signature)}"
+        with pytest.raises(JWTError):
+            service.decode(forged)
+
+    def test_rotation_without_restart(self, tmp_path, rsa_pem, ed25519_pem):
+        path = tmp_path / "keyset.json"
+        old = {"kid": "old", "alg": "RS256", "private_key": rsa_pem[0]}
+        new = {"kid": "new", "alg": "EdDSA", "private_key": ed25519_pem[0]}
+        _write_keyset(path, "old", [old])
+        legacy = SigningKey(None, "HS256", "s3cret")
+        service = TokenService(KeySetFile(path, legacy=legacy, reload_sec=0))
+        old_token = service.encode(_claims())
+        legacy_token = jwt.encode(_claims(), "s3cret", algorithm="HS256")
+        assert service.decode(old_token)
+        assert service.decode(legacy_token)
+
+        # Phase 1: sign with the new key, keep verifying the old one
+        _write_keyset(path, "new", [new, old])
+        new_token = service.encode(_claims())
+        assert jwt.get_unverified_header(new_token)["kid"] == "new"
+        assert service.decode(old_token) and service.decode(new_token)
+
+        # Phase 2: retire the old key; its memoized tokens stop working too
+        _write_keyset(path, "new", [new])
+        with pytest.raises(JWTError):
+            service.decode(old_token)
+        assert service.decode(new_token)
+        assert service.decode(legacy_token)
+
+    def test_broken_keyset_file_keeps_previous_keys(self, tmp_path):
+        path = tmp_path / "keyset.json"
+        _write_keyset(path, "k1", [{"kid": "k1", "alg": "HS256", "secret": "one"}])
+        service = TokenService(KeySetFile(path, reload_sec=0))
+        token = service.encode(_claims())
+
+        path.write_text("{not json")
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 2_000_000_000))
+        assert service.decode(token)["sub"] == "a@example.com"